@@ -0,0 +1,475 @@
+import io
+import os
+import threading
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import dataclass, fields
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Union
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .bot_rules import BotDetector as BotRulesDetector, BotDetectionConfig, EmailAnalysis, EMAIL_STATUSES
+from .parallel import ParallelScorer
+from .pipeline import ScoringPipeline
+from .models import BotStatus, EmailStatus, ProcessingOptions
+
+# BOT and EMAIL_STATUS are Categoricals over the model enums, backed by int8 codes
+BOT_DTYPE = pd.CategoricalDtype([status.value for status in BotStatus])
+EMAIL_STATUS_DTYPE = pd.CategoricalDtype([status.value for status in EmailStatus])
+_BOT_TRUE, _BOT_FALSE, _BOT_UNKNOWN = (BOT_DTYPE.categories.get_loc(status.value)
+                                       for status in (BotStatus.TRUE, BotStatus.FALSE, BotStatus.UNKNOWN))
+_EMAIL_UNKNOWN = EMAIL_STATUS_DTYPE.categories.get_loc(EmailStatus.UNKNOWN.value)
+# Rules status codes (positions in EMAIL_STATUSES) -> EMAIL_STATUS_DTYPE codes
+_STATUS_CODES = np.array([EMAIL_STATUS_DTYPE.categories.get_loc(status) for status in EMAIL_STATUSES],
+                         dtype=np.int8)
+
+# Rows accepted by validate_csv_data for in-memory detection; larger files are streamed
+MAX_IN_MEMORY_ROWS = 1_000_000
+
+# Files written by the streaming detector
+OUTPUT_FILES = ('clean.csv', 'bots.csv', 'annotated.csv')
+
+# Worker processes used to score large files; 1 keeps scoring in the request's process
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', '1'))
+
+# Server-wide pattern files (one entry per line) extending the built-in lists, by settings field
+LIST_FILES = {
+    'bot_localparts_file': os.getenv('BOT_LOCALPARTS_FILE') or None,
+    'disposable_domains_file': os.getenv('DISPOSABLE_DOMAINS_FILE') or None,
+    'role_accounts_file': os.getenv('ROLE_ACCOUNTS_FILE') or None,
+}
+
+@dataclass(frozen=True)
+class DetectionSettings:
+    """Immutable, hashable snapshot of the processing options and server lists that shape a rules detector."""
+    enable_syntax_check: bool
+    enable_mx_check: bool
+    treat_invalid_as_bots: bool
+    mx_check_timeout: float
+    mx_concurrency: int
+    bot_threshold: float
+    bot_localparts_file: Optional[str] = None
+    disposable_domains_file: Optional[str] = None
+    role_accounts_file: Optional[str] = None
+
+    @classmethod
+    def from_options(cls, options: Optional[ProcessingOptions] = None) -> 'DetectionSettings':
+        """Derive settings from processing options and the server's LIST_FILES."""
+        options = options or ProcessingOptions()
+        values = {field.name: getattr(options, field.name) for field in fields(cls)
+                  if field.name in ProcessingOptions.model_fields}
+        return cls(**values, **LIST_FILES)
+
+    def to_config(self) -> BotDetectionConfig:
+        """Build the rules configuration for these settings."""
+        config = BotDetectionConfig()
+        config.ENABLE_SYNTAX_CHECK = self.enable_syntax_check
+        config.ENABLE_MX_CHECK = self.enable_mx_check
+        config.TREAT_INVALID_AS_BOTS = self.treat_invalid_as_bots
+        config.MX_CHECK_TIMEOUT = self.mx_check_timeout
+        config.MX_CONCURRENCY = self.mx_concurrency
+        config.BOT_THRESHOLD = self.bot_threshold
+        config.BOT_LOCALPARTS_FILE = self.bot_localparts_file
+        config.DISPOSABLE_DOMAINS_FILE = self.disposable_domains_file
+        config.ROLE_ACCOUNTS_FILE = self.role_accounts_file
+        return config
+
+
+_detectors_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _build_rules_detector(settings: DetectionSettings) -> BotRulesDetector:
+    return BotRulesDetector(settings.to_config())
+
+
+def get_rules_detector(settings: DetectionSettings) -> BotRulesDetector:
+    """
+    Return a shared rules detector for these settings, building it on first use.
+    
+    Detectors are read-only after construction, so one instance serves every
+    request and thread with the same settings; callers must not mutate it.
+    """
+    with _detectors_lock:
+        return _build_rules_detector(settings)
+
+
+@lru_cache(maxsize=None)
+def get_parallel_scorer(workers: int) -> ParallelScorer:
+    """
+    Return the process-wide scorer with this many workers.
+    
+    Its pool starts on the first large batch and stays warm for later jobs,
+    whatever their settings; workers build one detector per configuration.
+    """
+    return ParallelScorer(workers)
+
+
+class RowPartition:
+    """
+    Rows of a frame selected by an index array, taken from it only when written.
+    
+    Stands in for the clean and bot DataFrames so that results cost one
+    index array each instead of a copy of every selected row.
+    """
+
+    def __init__(self, frame: pd.DataFrame, rows: np.ndarray):
+        self.frame = frame
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.frame.columns
+
+    @property
+    def empty(self) -> bool:
+        return len(self.rows) == 0 or len(self.frame.columns) == 0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize the rows as a DataFrame."""
+        return self.frame.take(self.rows)
+
+    def to_csv(self, path_or_buf=None, chunk_rows: int = 100_000, **kwargs) -> Optional[str]:
+        """
+        Write the rows like DataFrame.to_csv, copying at most chunk_rows of them at a time.
+        
+        Returns the CSV text if path_or_buf is None.
+        """
+        if path_or_buf is None:
+            buffer = io.StringIO()
+            self.to_csv(buffer, chunk_rows, **kwargs)
+            return buffer.getvalue()
+        if isinstance(path_or_buf, (str, os.PathLike)):
+            with open(path_or_buf, 'w', encoding=kwargs.pop('encoding', 'utf-8'), newline='') as handle:
+                return self.to_csv(handle, chunk_rows, **kwargs)
+        header = kwargs.pop('header', True)
+        for start in range(0, max(len(self.rows), 1), chunk_rows):
+            chunk = self.frame.take(self.rows[start:start + chunk_rows])
+            chunk.to_csv(path_or_buf, header=header if start == 0 else False, **kwargs)
+        return None
+
+
+# Clean or bot rows as returned by detect_bots
+Rows = Union[RowPartition, pd.DataFrame]
+
+
+class BotDetector:
+    """Bot detection logic for CSV data analysis using scoring-based rules."""
+
+    def __init__(self, options: Optional[ProcessingOptions] = None):
+        # Reuse the compiled patterns of an existing detector with the same options
+        self.options = options or ProcessingOptions()
+        self.settings = DetectionSettings.from_options(self.options)
+        self.bot_rules_detector = get_rules_detector(self.settings)
+
+    def is_bot_email(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> bool:
+        """Check if an email address matches bot patterns using scoring rules."""
+        return self.bot_rules_detector.is_bot_email(email, first_name, last_name)
+
+    def get_email_status(self, email: str) -> str:
+        """Get the email verification status."""
+        return self.bot_rules_detector.get_email_status(email)
+
+    def analyze(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> EmailAnalysis:
+        """Validate and score an email once; see BotRulesDetector.analyze."""
+        return self.bot_rules_detector.analyze(email, first_name, last_name)
+
+    def detect_bots(self, df: pd.DataFrame, email_column: str,
+                   first_name_column: Optional[str] = None,
+                   last_name_column: Optional[str] = None,
+                   vectorized: bool = True,
+                   workers: Optional[int] = None,
+                   as_frames: bool = False) -> Tuple[Rows, Rows, pd.DataFrame, Dict]:
+        """
+        Detect bots in CSV data and return clean rows, bot rows and the annotated DataFrame.
+        
+        Args:
+            df: Input DataFrame
+            email_column: Name of the email column
+            first_name_column: Optional name of the first name column
+            last_name_column: Optional name of the last name column
+            vectorized: Score the whole email column at once instead of row by row
+            workers: Processes scoring chunks of large vectorized files in parallel
+                (defaults to SCORING_WORKERS)
+            as_frames: Return the clean and bot rows as DataFrames instead of RowPartitions
+            
+        Returns:
+            Tuple of (clean rows, bot rows, annotated_df, summary). The clean and bot
+            rows are RowPartitions over annotated_df unless as_frames is set; call
+            to_frame() on one to get a DataFrame.
+        """
+        if email_column not in df.columns:
+            raise ValueError(f"Email column '{email_column}' not found in CSV")
+
+        email_rows, rows = self._email_rows(df, email_column, first_name_column, last_name_column)
+        
+        # Classify each distinct (email, first name, last name) once and scatter the
+        # results back to every duplicate row
+        codes, first_rows = self.bot_rules_detector.group_rows(
+            rows[email_column].tolist(),
+            self._name_list(rows, first_name_column),
+            self._name_list(rows, last_name_column)
+        )
+        workers = workers or SCORING_WORKERS
+        if not vectorized:
+            classify = self._classify_rows
+        elif workers > 1:
+            classify = partial(self._classify_parallel, get_parallel_scorer(workers))
+        else:
+            classify = self._classify_vectorized
+        is_bot, status_codes = classify(rows.iloc[first_rows], email_column, first_name_column, last_name_column)
+        annotated_df, bot_mask, email_status_codes = self._annotate_results(df, email_rows, codes, is_bot, status_codes)
+
+        # Clean and bot rows stay index arrays into the annotated frame until written
+        clean_rows = RowPartition(annotated_df, np.flatnonzero(~bot_mask))
+        bot_rows = RowPartition(annotated_df, np.flatnonzero(bot_mask))
+
+        summary = self._summary(len(df), len(email_rows), len(first_rows), len(bot_rows),
+                                np.bincount(email_status_codes, minlength=len(EMAIL_STATUS_DTYPE.categories)))
+        if as_frames:
+            return clean_rows.to_frame(), bot_rows.to_frame(), annotated_df, summary
+        return clean_rows, bot_rows, annotated_df, summary
+
+    def detect_bots_csv(self, csv_source, email_column: str, output_dir: str,
+                        first_name_column: Optional[str] = None,
+                        last_name_column: Optional[str] = None,
+                        chunk_rows: int = 100_000,
+                        progress: Optional[Callable[[int], None]] = None,
+                        workers: Optional[int] = None,
+                        **read_csv_kwargs) -> Tuple[Dict[str, str], Dict]:
+        """
+        Detect bots in a CSV file of any size, reading and writing chunk_rows rows at a time.
+        
+        Args:
+            csv_source: Path or file object accepted by pandas.read_csv
+            email_column: Name of the email column
+            output_dir: Directory receiving clean.csv, bots.csv and annotated.csv
+            first_name_column: Optional name of the first name column
+            last_name_column: Optional name of the last name column
+            chunk_rows: Rows parsed, classified and written per chunk
+            progress: Optional callback given the rows written so far after each chunk
+            workers: Processes scoring each chunk in parallel (defaults to SCORING_WORKERS)
+            **read_csv_kwargs: Passed to pandas.read_csv (dtype, encoding, ...)
+            
+        Returns:
+            Tuple of (output paths by file name, summary)
+        """
+        with pd.read_csv(csv_source, chunksize=chunk_rows, **read_csv_kwargs) as chunks:
+            return self.detect_bots_chunks(chunks, email_column, output_dir, first_name_column, last_name_column,
+                                           progress=progress, workers=workers)
+
+    def detect_bots_chunks(self, chunks: Iterable[pd.DataFrame], email_column: str, output_dir: str,
+                           first_name_column: Optional[str] = None,
+                           last_name_column: Optional[str] = None,
+                           progress: Optional[Callable[[int], None]] = None,
+                           workers: Optional[int] = None) -> Tuple[Dict[str, str], Dict]:
+        """
+        Detect bots in a stream of DataFrame chunks, appending each chunk's results to
+        clean.csv, bots.csv and annotated.csv in output_dir and summing the summary.
+        
+        Chunks are parsed and scored while earlier chunks' domains resolve, and only
+        the few chunks between those stages are held in memory at once. With more than
+        one worker (workers defaults to SCORING_WORKERS), each chunk is instead scored
+        across the process pool, one chunk at a time. Duplicate rows are classified
+        once per chunk, so dedup_ratio is measured within chunks. If given, progress
+        is called with the rows written so far after each chunk.
+        """
+        paths = {name: os.path.join(output_dir, name) for name in OUTPUT_FILES}
+        pending: deque = deque()
+        total_rows = rows_with_email = unique_rows = bots_count = 0
+        status_counts = np.zeros(len(EMAIL_STATUS_DTYPE.categories), dtype=np.int64)
+
+        def unique_columns():
+            # Runs on the pipeline's scoring thread, so parsing overlaps DNS as well
+            for chunk in chunks:
+                if email_column not in chunk.columns:
+                    raise ValueError(f"Email column '{email_column}' not found in CSV")
+                email_rows, rows = self._email_rows(chunk, email_column, first_name_column, last_name_column)
+                codes, first_rows = self.bot_rules_detector.group_rows(
+                    rows[email_column].tolist(),
+                    self._name_list(rows, first_name_column),
+                    self._name_list(rows, last_name_column)
+                )
+                pending.append((chunk, email_rows, codes))
+                unique = rows.iloc[first_rows]
+                yield (unique[email_column].tolist(), self._name_list(unique, first_name_column),
+                       self._name_list(unique, last_name_column))
+
+        with ExitStack() as stack:
+            outputs = {name: stack.enter_context(open(path, 'w', encoding='utf-8', newline=''))
+                       for name, path in paths.items()}
+            workers = workers or SCORING_WORKERS
+            if workers > 1:
+                scorer = get_parallel_scorer(workers)
+                scored = (scorer.score_batch(self.bot_rules_detector, *columns, deduplicate=False)
+                          for columns in unique_columns())
+            else:
+                scored = ScoringPipeline(self.bot_rules_detector).run(unique_columns(), deduplicate=False)
+            for status_codes, _, is_bot in scored:
+                chunk, email_rows, codes = pending.popleft()
+                annotated, bot_mask, email_status_codes = self._annotate_results(
+                    chunk, email_rows, codes, is_bot, status_codes
+                )
+                header = total_rows == 0
+                annotated[~bot_mask].to_csv(outputs['clean.csv'], index=False, header=header)
+                annotated[bot_mask].to_csv(outputs['bots.csv'], index=False, header=header)
+                annotated.to_csv(outputs['annotated.csv'], index=False, header=header)
+
+                total_rows += len(chunk)
+                rows_with_email += len(email_rows)
+                unique_rows += int(codes.max()) + 1 if len(codes) else 0
+                bots_count += int(bot_mask.sum())
+                status_counts += np.bincount(email_status_codes, minlength=len(status_counts))
+                if progress is not None:
+                    progress(total_rows)
+
+        return paths, self._summary(total_rows, rows_with_email, unique_rows, bots_count, status_counts)
+
+    @staticmethod
+    def _email_rows(df: pd.DataFrame, email_column: str, first_name_column: Optional[str],
+                    last_name_column: Optional[str]) -> Tuple[np.ndarray, pd.DataFrame]:
+        """Return the positions of rows with an email and just the mapped columns of those rows."""
+        emails = df[email_column]
+        email_rows = np.flatnonzero((emails.notna() & (emails.str.strip() != '')).to_numpy())
+        mapped = list(dict.fromkeys(c for c in (email_column, first_name_column, last_name_column)
+                                    if c and c in df.columns))
+        return email_rows, df[mapped].take(email_rows)
+
+    def _annotate_results(self, df: pd.DataFrame, email_rows: np.ndarray, codes: np.ndarray,
+                          is_bot: np.ndarray,
+                          status_codes: np.ndarray) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """
+        Scatter per-group results back to every row and annotate df with them.
+        
+        Returns the annotated frame, the bot row mask and the EMAIL_STATUS codes.
+        """
+        # One set of int8 codes per column drives the partitions and the counts
+        total_rows = len(df)
+        bot_codes = np.full(total_rows, _BOT_UNKNOWN, dtype=np.int8)
+        bot_codes[email_rows] = np.where(is_bot[codes], _BOT_TRUE, _BOT_FALSE)
+        email_status_codes = np.full(total_rows, _EMAIL_UNKNOWN, dtype=np.int8)
+        email_status_codes[email_rows] = _STATUS_CODES[status_codes[codes]]
+        bot = pd.Categorical.from_codes(bot_codes, dtype=BOT_DTYPE)
+        email_status = pd.Categorical.from_codes(email_status_codes, dtype=EMAIL_STATUS_DTYPE)
+        return self._annotate(df, bot, email_status), bot_codes == _BOT_TRUE, email_status_codes
+
+    def _summary(self, total_rows: int, rows_with_email: int, unique_rows: int, bots_count: int,
+                 status_counts: np.ndarray) -> Dict:
+        """Build the summary from row totals and EMAIL_STATUS code counts."""
+        dedup_ratio = 1 - unique_rows / rows_with_email if rows_with_email else 0.0
+
+        def status_count(status: EmailStatus) -> int:
+            return int(status_counts[EMAIL_STATUS_DTYPE.categories.get_loc(status.value)])
+
+        return {
+            'total_rows': total_rows,
+            'rows_with_email': rows_with_email,
+            'rows_without_email': total_rows - rows_with_email,
+            'bots_count': bots_count,
+            'clean_count': total_rows - bots_count,
+            'valid_emails': status_count(EmailStatus.VALID),
+            'invalid_syntax_emails': status_count(EmailStatus.INVALID_SYNTAX),
+            'no_mx_emails': status_count(EmailStatus.NO_MX),
+            'unknown_emails': status_count(EmailStatus.UNKNOWN),
+            'unchecked_emails': status_count(EmailStatus.UNCHECKED),
+            'dedup_ratio': round(float(dedup_ratio), 4),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'processing_options': self.options
+        }
+
+    @staticmethod
+    def _annotate(df: pd.DataFrame, bot: pd.Categorical, email_status: pd.Categorical) -> pd.DataFrame:
+        """Return df with BOT and EMAIL_STATUS columns, sharing the input's column data."""
+        annotations = pd.DataFrame({'BOT': bot, 'EMAIL_STATUS': email_status}, index=df.index)
+        if 'BOT' in df.columns or 'EMAIL_STATUS' in df.columns:
+            # Overwrite existing columns in place, as a plain assignment would
+            annotated = df.copy()
+            annotated[annotations.columns] = annotations
+            return annotated
+        return pd.concat([df, annotations], axis=1, copy=False)
+
+    def _classify_rows(self, rows: pd.DataFrame, email_column: str, first_name_column: Optional[str],
+                       last_name_column: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify rows one at a time, analyzing each email exactly once."""
+        analyses = self.bot_rules_detector.analyze_many(
+            rows[email_column].tolist(),
+            self._name_list(rows, first_name_column),
+            self._name_list(rows, last_name_column)
+        )
+
+        # Both columns come from the same analysis of each row
+        is_bot = np.fromiter((a.is_bot for a in analyses), dtype=bool, count=len(analyses))
+        status_codes = np.fromiter((EMAIL_STATUSES.index(a.status) for a in analyses), dtype=np.int8,
+                                   count=len(analyses))
+        return is_bot, status_codes
+
+    def _classify_vectorized(self, rows: pd.DataFrame, email_column: str, first_name_column: Optional[str],
+                             last_name_column: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify all rows with emails in chunks, scoring each while earlier chunks resolve MX."""
+        status_codes, _, is_bot = ScoringPipeline(self.bot_rules_detector).score_batch(
+            rows[email_column].tolist(),
+            self._name_list(rows, first_name_column),
+            self._name_list(rows, last_name_column),
+            deduplicate=False
+        )
+        return is_bot, status_codes
+
+    def _classify_parallel(self, scorer: ParallelScorer, rows: pd.DataFrame, email_column: str,
+                           first_name_column: Optional[str],
+                           last_name_column: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify all rows with emails in chunks across the scorer's worker processes."""
+        status_codes, _, is_bot = scorer.score_batch(
+            self.bot_rules_detector,
+            rows[email_column].tolist(),
+            self._name_list(rows, first_name_column),
+            self._name_list(rows, last_name_column),
+            deduplicate=False
+        )
+        return is_bot, status_codes
+
+    @staticmethod
+    def _name_column(rows: pd.DataFrame, column: Optional[str]) -> Optional[pd.Series]:
+        """Return a name column with missing values blanked, or None if not mapped."""
+        if not column or column not in rows.columns:
+            return None
+        return rows[column].fillna('')
+
+    @classmethod
+    def _name_list(cls, rows: pd.DataFrame, column: Optional[str]) -> Optional[List[str]]:
+        """Return a name column as a list with missing values blanked, or None if not mapped."""
+        names = cls._name_column(rows, column)
+        return names.tolist() if names is not None else None
+
+    def validate_csv_data(self, df: pd.DataFrame, required_columns: List[str],
+                          max_rows: Optional[int] = MAX_IN_MEMORY_ROWS) -> List[str]:
+        """
+        Validate CSV data structure and content.
+        
+        max_rows caps files classified in one DataFrame; pass None for files
+        streamed with detect_bots_csv, whose memory does not grow with rows.
+        """
+        errors = []
+        
+        # Check required columns exist
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        if missing_columns:
+            errors.append(f"Missing required columns: {', '.join(missing_columns)}")
+        
+        # Check for empty DataFrame
+        if df.empty:
+            errors.append("CSV file is empty")
+        
+        # Check for reasonable row count
+        if max_rows is not None and len(df) > max_rows:
+            errors.append(f"CSV file too large (max {max_rows:,} rows)")
+        
+        return errors
+
+    def get_detection_details(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None,
+                              analysis: Optional[EmailAnalysis] = None) -> Dict:
+        """Get detailed bot detection analysis for debugging and tuning."""
+        return self.bot_rules_detector.get_detection_details(email, first_name, last_name, analysis)
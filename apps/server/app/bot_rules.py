@@ -1,9 +1,177 @@
 import re
 import string
-from typing import Optional, List, Tuple, Dict
-from email_validator import validate_email, EmailNotValidError
-import dns.resolver
-import dns.exception
+from functools import lru_cache
+from typing import Optional, List, Tuple, Dict, Iterable, Sequence
+import numpy as np
+
+from . import columns
+from .columns import PackedStrings, SubstringMatcher
+from .email_syntax import normalize_email
+from .matchers import AhoCorasick, DomainSuffixSet, LookupSet, load_list_file
+from .mx_cache import MXCache, default_mx_cache
+
+# Email statuses in EmailStatus order; score_batch returns indexes into this tuple.
+# 'unchecked' is a syntax-valid email whose MX lookup was skipped because no MX
+# answer could change its verdict; 'valid' means every enabled check passed
+EMAIL_STATUSES = ('valid', 'invalid_syntax', 'no_mx', 'unknown', 'unchecked')
+STATUS_VALID, STATUS_INVALID_SYNTAX, STATUS_NO_MX, STATUS_UNKNOWN, STATUS_UNCHECKED = range(len(EMAIL_STATUSES))
+# Statuses of syntax-valid emails, which are scored by the rules
+SCORED_STATUSES = ('valid', 'unchecked')
+
+_VOWELS = frozenset('aeiou')
+_PUNCTUATION = frozenset(string.punctuation)
+
+# Packed per-byte weights so one pass counts several character classes
+_LOCAL_PART_FIELDS = (
+    columns.DIGITS.astype(np.int64) |
+    (columns.PUNCTUATION.astype(np.int64) << 21) |
+    (columns.VOWELS.astype(np.int64) << 42)
+)
+_NAME_FIELDS = (
+    columns.LETTERS.astype(np.int64) |
+    (~(columns.LETTERS | columns.byte_table("-' ")) & (np.arange(256) != columns.SEPARATOR)).astype(np.int64) << 32
+)
+_FIELD_MASK = (1 << 21) - 1
+
+
+class LocalPartFeatures:
+    """Character-class counts of a local-part, shared by every rule that reads them."""
+    
+    __slots__ = ('length', 'digits', 'specials', 'vowels', 'max_consonant_run')
+    
+    def __init__(self, length: int, digits: int, specials: int, vowels: int, max_consonant_run: int):
+        self.length = length
+        self.digits = digits
+        self.specials = specials
+        self.vowels = vowels
+        self.max_consonant_run = max_consonant_run
+    
+    def as_dict(self) -> Dict[str, int]:
+        """Return the features as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@lru_cache(maxsize=65536)
+def extract_local_part_features(local_part: str) -> LocalPartFeatures:
+    """Compute all local-part character features in a single scan."""
+    digits = specials = vowels = run = max_run = 0
+    for c in local_part:
+        lower = c.lower()
+        if lower in _VOWELS:
+            vowels += 1
+            run = 0
+        elif c.isalpha():
+            run += 1
+            if run > max_run:
+                max_run = run
+        else:
+            run = 0
+            if c.isdigit():
+                digits += 1
+            elif c in _PUNCTUATION:
+                specials += 1
+    return LocalPartFeatures(len(local_part), digits, specials, vowels, max_run)
+
+
+# Rule cost classes, cheapest first
+COST_LOOKUP = 0   # hash or set lookups
+COST_SCAN = 1     # linear scans of the local-part or names
+COST_NETWORK = 2  # DNS queries
+
+
+class Rule:
+    """A scoring rule with its cost class and the weights it can contribute."""
+    
+    __slots__ = ('name', 'cost', 'weights', 'evaluate')
+    
+    def __init__(self, name: str, cost: int, weights: Tuple[str, ...], evaluate):
+        self.name = name
+        self.cost = cost
+        self.weights = weights
+        self.evaluate = evaluate
+    
+    def bounds(self, config: 'BotDetectionConfig') -> Tuple[float, float]:
+        """Return the smallest and largest contribution under config (not firing adds 0)."""
+        weights = [getattr(config, weight) for weight in self.weights]
+        return min(0.0, *weights), max(0.0, *weights)
+    
+    def __repr__(self) -> str:
+        return f'Rule({self.name!r}, cost={self.cost})'
+
+
+class RuleInput:
+    """The parts of one normalized email that rules look at; features are extracted on first use."""
+    
+    __slots__ = ('local_part', 'domain', 'first_name', 'last_name', '_features')
+    
+    def __init__(self, local_part: str, domain: str, first_name: Optional[str], last_name: Optional[str]):
+        self.local_part = local_part
+        self.domain = domain
+        self.first_name = first_name
+        self.last_name = last_name
+        self._features = None
+    
+    @property
+    def features(self) -> LocalPartFeatures:
+        if self._features is None:
+            self._features = extract_local_part_features(self.local_part)
+        return self._features
+
+
+class PendingBatch:
+    """A batch scored by every check except MX, waiting for the answers of its undecided domains."""
+    
+    __slots__ = ('readable', 'syntax_valid', 'domain_codes', 'domains', 'scores', 'verdicts',
+                 'undecided', 'to_resolve')
+    
+    def __init__(self, readable: np.ndarray, syntax_valid: np.ndarray, domain_codes: np.ndarray,
+                 domains: List[str], scores: np.ndarray, verdicts: np.ndarray, undecided: Optional[np.ndarray]):
+        self.readable = readable
+        self.syntax_valid = syntax_valid
+        self.domain_codes = domain_codes
+        self.domains = domains
+        self.scores = scores
+        self.verdicts = verdicts
+        # Rows whose status depends on MX; None when the MX check is disabled
+        self.undecided = undecided
+        self.to_resolve = np.unique(domain_codes[undecided]).tolist() if undecided is not None else []
+    
+    @property
+    def mx_domains(self) -> List[str]:
+        """The distinct domains that still need an MX lookup."""
+        return [self.domains[code] for code in self.to_resolve]
+
+
+@lru_cache(maxsize=8)
+def _disposable_index(builtin: frozenset, path: Optional[str]) -> DomainSuffixSet:
+    """Build the disposable domain index once per process for each list file."""
+    domains = list(builtin)
+    if path:
+        domains.extend(load_list_file(path))
+    return DomainSuffixSet(domains)
+
+
+class EmailAnalysis:
+    """Outcome of analyzing one email, computed once and reused by every consumer."""
+    
+    __slots__ = ('email', 'normalized', 'status', 'score', 'is_bot', 'rules', 'mx_checked')
+    
+    def __init__(self, email: Optional[str], normalized: Optional[str], status: str,
+                 score: float = 0.0, is_bot: bool = False, rules: Optional[Dict[str, float]] = None,
+                 mx_checked: bool = False):
+        self.email = email
+        self.normalized = normalized
+        self.status = status
+        self.score = score
+        self.is_bot = is_bot
+        self.rules = rules or {}
+        # False when the MX stage did not run; with MX checking on, the status is then 'unchecked'
+        self.mx_checked = mx_checked
+    
+    def __repr__(self) -> str:
+        return (f'EmailAnalysis(normalized={self.normalized!r}, status={self.status!r}, '
+                f'score={self.score:.2f}, is_bot={self.is_bot}, rules={self.rules!r})')
+
 
 class BotDetectionConfig:
     """Configuration for bot detection with email verification options."""
@@ -29,13 +197,23 @@ class BotDetectionConfig:
     ENABLE_MX_CHECK = True
     TREAT_INVALID_AS_BOTS = True
     MX_CHECK_TIMEOUT = 5.0  # seconds
+    MX_CONCURRENCY = 50  # MX queries in flight when resolving a batch of domains
+    SHORT_CIRCUIT = True  # Stop evaluating rules and skip MX once the verdict cannot change
+    
+    # Optional pattern files (one entry per line) extending the built-in lists
+    BOT_LOCALPARTS_FILE: Optional[str] = None
+    DISPOSABLE_DOMAINS_FILE: Optional[str] = None
+    ROLE_ACCOUNTS_FILE: Optional[str] = None
 
 class BotDetector:
     """Enhanced bot detection with email verification capabilities."""
     
-    def __init__(self, config: Optional[BotDetectionConfig] = None):
+    def __init__(self, config: Optional[BotDetectionConfig] = None, mx_cache: Optional[MXCache] = None):
         self.config = config or BotDetectionConfig()
+        # MX results are shared process-wide unless a dedicated cache is given
+        self.mx_cache = mx_cache if mx_cache is not None else default_mx_cache
         self._init_patterns()
+        self._init_rules()
     
     def _init_patterns(self):
         """Initialize detection patterns."""
@@ -50,6 +228,10 @@ class BotDetector:
             'mailinator.co', 'mailinator.io', 'mailinator.me', 'mailinator.tv',
             'mailinator.us', 'mailinator.ws', 'mailinator.mobi', 'mailinator.name'
         }
+        # Matches listed domains and their subdomains; shared by detectors in the process
+        self.disposable_index = _disposable_index(
+            frozenset(self.disposable_domains), self.config.DISPOSABLE_DOMAINS_FILE
+        )
         
         # Obvious bot local-parts
         self.bot_localparts = {
@@ -60,178 +242,453 @@ class BotDetector:
             'guest', 'demo', 'sample', 'trial', 'temp', 'temporary', 'fake',
             'spam', 'junk', 'trash', 'invalid', 'error', 'null', 'void'
         }
-        
-        # Role account patterns
-        self.role_patterns = [
-            r'^admin@',
-            r'^support@',
-            r'^info@',
-            r'^contact@',
-            r'^help@',
-            r'^service@',
-            r'^sales@',
-            r'^marketing@',
-            r'^hr@',
-            r'^finance@',
-            r'^legal@',
-            r'^pr@',
-            r'^media@',
-            r'^press@',
-            r'^news@',
-            r'^blog@',
-            r'^webmaster@',
-            r'^postmaster@',
-            r'^hostmaster@',
-            r'^abuse@',
-            r'^security@',
-            r'^noreply@',
-            r'^no-reply@',
-            r'^donotreply@',
-            r'^noreply@'
+        if self.config.BOT_LOCALPARTS_FILE:
+            self.bot_localparts.update(load_list_file(self.config.BOT_LOCALPARTS_FILE))
+        
+        # Compiled once so every local-part is scanned in a single pass
+        self.bot_localpart_matcher = AhoCorasick(self.bot_localparts)
+        self.bot_localpart_index = SubstringMatcher(self.bot_localpart_matcher.patterns)
+        
+        # Role account local-parts; entries may use * and ? wildcards
+        self.role_localparts = {
+            'admin', 'support', 'info', 'contact', 'help', 'service', 'sales',
+            'marketing', 'hr', 'finance', 'legal', 'pr', 'media', 'press', 'news',
+            'blog', 'webmaster', 'postmaster', 'hostmaster', 'abuse', 'security',
+            'noreply', 'no-reply', 'donotreply'
+        }
+        if self.config.ROLE_ACCOUNTS_FILE:
+            self.role_localparts.update(load_list_file(self.config.ROLE_ACCOUNTS_FILE))
+        self._build_role_index()
+    
+    def _init_rules(self):
+        """Build the scoring pipeline, ordered from cheapest to most expensive rule."""
+        rules = [
+            Rule('disposable_domain', COST_LOOKUP, ('DISPOSABLE_DOMAIN_WEIGHT',), self._rule_disposable_domain),
+            Rule('obvious_bot_localpart', COST_SCAN, ('OBVIOUS_BOT_LOCALPART_WEIGHT',),
+                 self._rule_obvious_bot_localpart),
+            Rule('high_randomness', COST_SCAN, ('HIGH_RANDOMNESS_WEIGHT',), self._rule_high_randomness),
+            Rule('role_account', COST_LOOKUP, ('ROLE_ACCOUNT_WEIGHT',), self._rule_role_account),
+            Rule('names', COST_SCAN, ('MISSING_NAMES_WEIGHT', 'HUMAN_NAMES_WEIGHT'), self._rule_names),
         ]
+        self.rules = sorted(rules, key=lambda rule: rule.cost)
     
-    def is_bot_email(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> bool:
-        """Check if an email address matches bot patterns using scoring rules."""
+    def set_role_accounts(self, role_localparts: Iterable[str]):
+        """Replace the role account list, e.g. with a customer supplied one."""
+        self.role_localparts = set(role_localparts)
+        self._build_role_index()
+    
+    def _build_role_index(self):
+        """Compile the role account lookup set and its column-wide wildcard pattern."""
+        self.role_index = LookupSet(self.role_localparts)
+        self.role_wildcard_bytes_pattern = None
+        if self.role_index.wildcards:
+            alternatives = b'|'.join(
+                re.escape(w.encode('utf-8')).replace(b'\\*', b'.*').replace(b'\\?', b'.')
+                for w in self.role_index.wildcards
+            )
+            self.role_wildcard_bytes_pattern = re.compile(b'(?m)^(?:' + alternatives + b')$')
+    
+    def analyze(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None,
+                mx_results: Optional[Dict[str, bool]] = None, full: bool = False) -> EmailAnalysis:
+        """
+        Validate and score an email once, returning everything callers need.
+        
+        Rules run from cheapest to most expensive and stop once the verdict can
+        no longer change; the MX stage then runs only if its outcome could still
+        flip the verdict. Pass full=True to run every rule and check.
+        """
+        analysis = self._analyze_offline(email, first_name, last_name, full)
+        if self._needs_mx(analysis, full):
+            domain = analysis.normalized.rpartition('@')[2]
+            has_mx = self._mx_result(mx_results, domain)
+            self._apply_mx(analysis, self._has_mx_record(domain) if has_mx is None else has_mx)
+        else:
+            self._skip_mx(analysis)
+        return analysis
+    
+    def analyze_many(self, emails: Sequence[Optional[str]],
+                     first_names: Optional[Sequence[Optional[str]]] = None,
+                     last_names: Optional[Sequence[Optional[str]]] = None,
+                     full: bool = False) -> List[EmailAnalysis]:
+        """Analyze emails one by one, resolving the MX stage of all undecided ones concurrently."""
+        size = len(emails)
+        analyses = [
+            self._analyze_offline(email, first_name, last_name, full)
+            for email, first_name, last_name in zip(
+                emails,
+                first_names if first_names is not None else [None] * size,
+                last_names if last_names is not None else [None] * size
+            )
+        ]
+        pending = []
+        for analysis in analyses:
+            if self._needs_mx(analysis, full):
+                pending.append(analysis)
+            else:
+                self._skip_mx(analysis)
+        if pending:
+            mx_results = self.resolve_mx(analysis.normalized.rpartition('@')[2] for analysis in pending)
+            for analysis in pending:
+                self._apply_mx(analysis, self._mx_result(mx_results, analysis.normalized.rpartition('@')[2], False))
+        return analyses
+    
+    def _analyze_offline(self, email: str, first_name: Optional[str], last_name: Optional[str],
+                         full: bool) -> EmailAnalysis:
+        """Run the syntax check and scoring rules, leaving the MX stage to the caller."""
         if not email or not isinstance(email, str):
-            return False
-        
-        # Check email syntax and MX records if enabled
-        email_status = self._verify_email(email)
+            return EmailAnalysis(email, None, 'unknown')
         
-        # If invalid emails should be treated as bots and email is invalid
-        if self.config.TREAT_INVALID_AS_BOTS and email_status != 'valid':
-            return True
+        normalized = self._check_syntax(email)
+        # Invalid emails are bots only if configured; they are never scored
+        if normalized is None:
+            return EmailAnalysis(email, None, 'invalid_syntax', is_bot=self.config.TREAT_INVALID_AS_BOTS)
         
-        # Only proceed with bot detection for valid emails
-        if email_status != 'valid':
+        score, rules = self._evaluate_rules(normalized, first_name, last_name, full=full)
+        return EmailAnalysis(email, normalized, 'valid', score, score >= self.config.BOT_THRESHOLD, rules)
+    
+    def _needs_mx(self, analysis: EmailAnalysis, full: bool) -> bool:
+        """Check if the MX stage still has to run for an analysis."""
+        if analysis.status != 'valid' or not self.config.ENABLE_MX_CHECK:
             return False
-        
-        try:
-            validated_email = validate_email(email)
-            email = validated_email.normalized
-        except EmailNotValidError:
+        if full or not self.config.SHORT_CIRCUIT:
             return True
-        
-        score = self._calculate_bot_score(email, first_name, last_name)
-        return score >= self.config.BOT_THRESHOLD
+        # A missing MX record makes the verdict TREAT_INVALID_AS_BOTS; skip it if that is the verdict already
+        return analysis.is_bot != self.config.TREAT_INVALID_AS_BOTS
+    
+    def _skip_mx(self, analysis: EmailAnalysis):
+        """Mark a syntax-valid analysis whose MX stage was skipped as unchecked."""
+        if analysis.status == 'valid' and self.config.ENABLE_MX_CHECK:
+            analysis.status = 'unchecked'
+    
+    def _apply_mx(self, analysis: EmailAnalysis, has_mx: bool):
+        """Record the outcome of the MX stage on an analysis."""
+        analysis.mx_checked = True
+        if not has_mx:
+            analysis.status = 'no_mx'
+            analysis.score = 0.0
+            analysis.rules = {}
+            analysis.is_bot = self.config.TREAT_INVALID_AS_BOTS
+    
+    def is_bot_email(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> bool:
+        """Check if an email address matches bot patterns using scoring rules."""
+        return self.analyze(email, first_name, last_name).is_bot
     
     def get_email_status(self, email: str) -> str:
         """Get the email verification status."""
         if not email or not isinstance(email, str):
             return 'unknown'
         
-        return self._verify_email(email)
+        return self.check_email(email)[0]
     
-    def _verify_email(self, email: str) -> str:
-        """Verify email syntax and MX records."""
+    def check_email(self, email: str, mx_results: Optional[Dict[str, bool]] = None) -> Tuple[str, Optional[str]]:
+        """
+        Verify email syntax and MX records, returning (status, normalized email).
+        
+        mx_results is an optional domain -> has MX map from resolve_mx; domains
+        missing from it are looked up individually.
+        """
         # Syntax check
-        try:
-            validated_email = validate_email(email)
-            email = validated_email.normalized
-        except EmailNotValidError:
-            return 'invalid_syntax'
+        normalized = self._check_syntax(email)
+        if normalized is None:
+            return 'invalid_syntax', None
         
-        # MX record check
+        return self._check_mx(normalized, mx_results), normalized
+    
+    def _check_mx(self, normalized: str, mx_results: Optional[Dict[str, bool]] = None) -> str:
+        """Return the status of a syntax-valid email after the optional MX check."""
+        # MX record check; this is the only place the detector touches DNS
         if self.config.ENABLE_MX_CHECK:
-            try:
-                domain = email.split('@')[1]
-                if not self._has_mx_record(domain):
-                    return 'no_mx'
-            except (IndexError, Exception):
-                return 'invalid_syntax'
+            domain = normalized.rpartition('@')[2]
+            has_mx = self._mx_result(mx_results, domain)
+            if has_mx is None:
+                has_mx = self._has_mx_record(domain)
+            if not has_mx:
+                return 'no_mx'
         
         return 'valid'
     
+    def _check_syntax(self, email: str) -> Optional[str]:
+        """
+        Return the normalized email, or None if it cannot be parsed.
+        
+        Validation is syntax-only: email_validator's own deliverability lookups
+        are disabled so DNS is resolved only through _has_mx_record. Plain
+        ASCII addresses are decided by the fast path in email_syntax. With
+        ENABLE_SYNTAX_CHECK off the address is just split at its last '@'.
+        """
+        if not self.config.ENABLE_SYNTAX_CHECK:
+            local_part, at, domain = email.strip().rpartition('@')
+            if not at or not local_part or not domain:
+                return None
+            return f"{local_part}@{domain.lower()}"
+        
+        return normalize_email(email)
+    
+    def _verify_email(self, email: str) -> str:
+        """Verify email syntax and MX records."""
+        return self.check_email(email)[0]
+    
     def _has_mx_record(self, domain: str) -> bool:
-        """Check if domain has MX records."""
-        try:
-            resolver = dns.resolver.Resolver()
-            resolver.timeout = self.config.MX_CHECK_TIMEOUT
-            resolver.lifetime = self.config.MX_CHECK_TIMEOUT
+        """Check if domain has MX records, using the shared TTL-aware cache."""
+        return self.mx_cache.has_mx(domain, self.config.MX_CHECK_TIMEOUT)
+    
+    @staticmethod
+    def _mx_result(mx_results: Optional[Dict[str, bool]], domain: str,
+                   default: Optional[bool] = None) -> Optional[bool]:
+        """Look up a domain in a resolve_mx map, whose keys are lowercase, or return default."""
+        return mx_results.get(domain.lower(), default) if mx_results else default
+    
+    def resolve_mx(self, domains: Iterable[str]) -> Dict[str, bool]:
+        """Resolve the distinct domains of a job concurrently, returning domain -> has MX."""
+        return self.mx_cache.resolve_many(domains, self.config.MX_CHECK_TIMEOUT, self.config.MX_CONCURRENCY)
+    
+    def score_batch(self, emails: Sequence[Optional[str]],
+                    first_names: Optional[Sequence[Optional[str]]] = None,
+                    last_names: Optional[Sequence[Optional[str]]] = None,
+                    deduplicate: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Validate, resolve and score a batch of emails with the same results as analyze.
+        
+        Duplicate (email, first name, last name) rows are classified once, each
+        unique domain is checked once, and the rules run column-wide.
+        
+        Args:
+            emails: Raw email addresses
+            first_names: Optional first names aligned with emails
+            last_names: Optional last names aligned with emails
+            deduplicate: Classify duplicate rows once; disable if rows are known unique
             
-            mx_records = resolver.resolve(domain, 'MX')
-            return len(mx_records) > 0
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.Timeout, 
-                dns.exception.DNSException, Exception):
-            return False
+        Returns:
+            Tuple of (int8 status codes indexing EMAIL_STATUSES, float scores, boolean verdicts)
+        """
+        emails = list(emails)
+        first_names = list(first_names) if first_names is not None else None
+        last_names = list(last_names) if last_names is not None else None
+        if not deduplicate:
+            return self._score_unique(emails, first_names, last_names)
+        
+        codes, first_rows = self.group_rows(emails, first_names, last_names)
+        
+        def pick(values):
+            return [values[i] for i in first_rows] if values is not None else None
+        
+        status_codes, scores, verdicts = self._score_unique(pick(emails), pick(first_names), pick(last_names))
+        return status_codes[codes], scores[codes], verdicts[codes]
+    
+    @staticmethod
+    def group_rows(emails: Sequence[Optional[str]],
+                   first_names: Optional[Sequence[Optional[str]]] = None,
+                   last_names: Optional[Sequence[Optional[str]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Group rows that classify identically by their email and names.
+        
+        Returns the group code of every row and the index of each group's first row.
+        ASCII emails are lowercased: statuses and verdicts do not depend on letter
+        case, and this avoids validating an address just to normalize it.
+        """
+        def email_key(email):
+            if not isinstance(email, str):
+                return None
+            return email.lower() if email.isascii() else email
+        
+        def name_keys(names):
+            if names is None:
+                return [''] * len(emails)
+            return [name if isinstance(name, str) else '' for name in names]
+        
+        groups: Dict[tuple, int] = {}
+        first_rows = []
+        codes = np.empty(len(emails), dtype=np.int64)
+        for i, key in enumerate(zip(map(email_key, emails), name_keys(first_names), name_keys(last_names))):
+            code = groups.setdefault(key, len(groups))
+            if code == len(first_rows):
+                first_rows.append(i)
+            codes[i] = code
+        return codes, np.asarray(first_rows, dtype=np.int64)
+    
+    def _score_unique(self, emails: List[Optional[str]], first_names: Optional[List[Optional[str]]],
+                      last_names: Optional[List[Optional[str]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Classify a batch row by row in status, column-wide in scoring."""
+        batch = self.prepare_batch(emails, first_names, last_names)
+        return self.complete_batch(batch, self.resolve_mx(batch.mx_domains))
+    
+    def prepare_batch(self, emails: List[Optional[str]], first_names: Optional[List[Optional[str]]],
+                      last_names: Optional[List[Optional[str]]]) -> 'PendingBatch':
+        """
+        Run the CPU-bound stages of batch scoring: syntax, domain factorization and rules.
+        
+        The returned batch lists the domains whose MX records could still change a
+        verdict; resolve them and pass the answers to complete_batch.
+        """
+        size = len(emails)
+        readable = np.fromiter((bool(email) and isinstance(email, str) for email in emails), dtype=bool, count=size)
+        normalized = [self._check_syntax(email) if ok else None for email, ok in zip(emails, readable)]
+        syntax_valid = np.fromiter((address is not None for address in normalized), dtype=bool, count=size)
+        normalized = [address or '' for address in normalized]
+        
+        # Domain-level checks run once per unique domain and broadcast through the codes
+        domain_codes, domains = self.factorize_domains(address.rpartition('@')[2] for address in normalized)
+        scores, verdicts = self.score_columns(normalized, first_names, last_names, domain_codes, domains)
+        
+        # The MX stage runs last, and only for domains of rows whose verdict it could flip
+        undecided = None
+        if self.config.ENABLE_MX_CHECK:
+            undecided = syntax_valid
+            if self.config.SHORT_CIRCUIT:
+                undecided = undecided & (verdicts != self.config.TREAT_INVALID_AS_BOTS)
+        return PendingBatch(readable, syntax_valid, domain_codes, domains, scores, verdicts, undecided)
+    
+    def complete_batch(self, batch: 'PendingBatch',
+                       mx_results: Optional[Dict[str, bool]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply MX answers (domain -> has MX) to a prepared batch and settle statuses and verdicts."""
+        treat_invalid = self.config.TREAT_INVALID_AS_BOTS
+        no_mx = np.zeros(len(batch.readable), dtype=bool)
+        if batch.undecided is not None:
+            domains = batch.domains
+            has_mx = np.ones(len(domains), dtype=bool)
+            has_mx[batch.to_resolve] = [self._mx_result(mx_results, domains[code], False) for code in batch.to_resolve]
+            no_mx = batch.undecided & ~has_mx[batch.domain_codes]
+        
+        status_codes = np.full(len(batch.readable), STATUS_UNKNOWN, dtype=np.int8)
+        status_codes[batch.readable] = STATUS_INVALID_SYNTAX
+        status_codes[batch.syntax_valid] = STATUS_VALID
+        if batch.undecided is not None:
+            status_codes[batch.syntax_valid & ~batch.undecided] = STATUS_UNCHECKED
+        status_codes[no_mx] = STATUS_NO_MX
+        scored = batch.syntax_valid & ~no_mx
+        
+        # Invalid emails are bots only if configured; they are never scored
+        scores = np.where(scored, batch.scores, 0.0)
+        verdicts = np.where(scored, batch.verdicts, batch.readable & treat_invalid)
+        return status_codes, scores, verdicts
     
     def _calculate_bot_score(self, email: str, first_name: Optional[str], last_name: Optional[str]) -> float:
         """Calculate bot probability score."""
+        return self._evaluate_rules(email, first_name, last_name)[0]
+    
+    def _evaluate_rules(self, email: str, first_name: Optional[str], last_name: Optional[str],
+                        checks: Optional[Dict] = None, full: bool = True) -> Tuple[float, Dict[str, float]]:
+        """
+        Run the scoring rules on a normalized email, cheapest first.
+        
+        Returns the score and the contribution of every rule that fired. Unless
+        full is set (or a checks dictionary is given), evaluation stops as soon as
+        the remaining rules cannot move the score across the threshold, so the
+        score is then only a lower or upper bound with a settled verdict. When a
+        checks dictionary is given it is filled with the detailed breakdown used
+        by get_detection_details.
+        """
+        config = self.config
+        threshold = config.BOT_THRESHOLD
+        short_circuit = config.SHORT_CIRCUIT and not full and checks is None
         score = 0.0
-        local_part, domain = email.split('@', 1)
-        
-        # Check disposable domains
-        if self._is_disposable_domain(domain):
-            score += self.config.DISPOSABLE_DOMAIN_WEIGHT
-        
-        # Check obvious bot local-parts
-        if self._is_obvious_bot_localpart(local_part):
-            score += self.config.OBVIOUS_BOT_LOCALPART_WEIGHT
-        
-        # Check high randomness
-        if self._is_high_randomness(local_part):
-            score += self.config.HIGH_RANDOMNESS_WEIGHT
-        
-        # Check role accounts
-        if self._is_role_account(email):
-            score += self.config.ROLE_ACCOUNT_WEIGHT
-        
-        # Calculate name score
-        name_score = self._calculate_name_score(first_name, last_name, local_part)
-        score += name_score
+        rules = {}
+        local_part, _, domain = email.rpartition('@')
+        row = RuleInput(local_part, domain, first_name, last_name)
+        
+        bounds = [rule.bounds(config) for rule in self.rules]
+        remaining_low = sum(low for low, _ in bounds)
+        remaining_high = sum(high for _, high in bounds)
+        
+        for rule, (low, high) in zip(self.rules, bounds):
+            remaining_low -= low
+            remaining_high -= high
+            fired = rule.evaluate(row, checks is not None)
+            if fired is not None:
+                name, weight, extra = fired
+                score += weight
+                rules[name] = weight
+                if checks is not None and rule.name != 'names':
+                    checks[name] = {'result': True, 'weight': weight, 'score': score, **extra}
+            if short_circuit and (score + remaining_low >= threshold or score + remaining_high < threshold):
+                break
+        
+        if checks is not None:
+            checks['name_analysis'] = {
+                'first_name': first_name,
+                'last_name': last_name,
+                'name_score': rules.get('missing_names', rules.get('human_names', 0.0)),
+                'final_score': score
+            }
         
-        return score
+        return score, rules
+    
+    def _rule_disposable_domain(self, row: RuleInput, details: bool):
+        """Rule: disposable email domain."""
+        if self._is_disposable_domain(row.domain):
+            return 'disposable_domain', self.config.DISPOSABLE_DOMAIN_WEIGHT, {}
+        return None
+    
+    def _rule_obvious_bot_localpart(self, row: RuleInput, details: bool):
+        """Rule: local-part contains an obvious bot indicator."""
+        if details:
+            indicators = self._match_bot_indicators(row.local_part)
+            if indicators:
+                return 'obvious_bot_localpart', self.config.OBVIOUS_BOT_LOCALPART_WEIGHT, {'indicators': indicators}
+        elif self._is_obvious_bot_localpart(row.local_part):
+            return 'obvious_bot_localpart', self.config.OBVIOUS_BOT_LOCALPART_WEIGHT, {}
+        return None
+    
+    def _rule_high_randomness(self, row: RuleInput, details: bool):
+        """Rule: local-part looks randomly generated."""
+        if self._is_high_randomness(row.local_part, row.features):
+            return 'high_randomness', self.config.HIGH_RANDOMNESS_WEIGHT, {}
+        return None
+    
+    def _rule_role_account(self, row: RuleInput, details: bool):
+        """Rule: local-part is a role account."""
+        if self._is_role_localpart(row.local_part):
+            return 'role_account', self.config.ROLE_ACCOUNT_WEIGHT, {}
+        return None
+    
+    def _rule_names(self, row: RuleInput, details: bool):
+        """Rule: missing names with a random local-part, or human-looking names."""
+        name_score = self._calculate_name_score(row.first_name, row.last_name, row.local_part, row.features)
+        if name_score:
+            missing = not row.first_name and not row.last_name
+            return ('missing_names' if missing else 'human_names'), name_score, {}
+        return None
     
     def _is_disposable_domain(self, domain: str) -> bool:
-        """Check if domain is in disposable domains list."""
-        return domain.lower() in self.disposable_domains
+        """Check if domain, or a domain it is a subdomain of, is a disposable domain."""
+        return domain in self.disposable_index
     
     def _is_obvious_bot_localpart(self, local_part: str) -> bool:
         """Check if local-part contains obvious bot indicators."""
-        local_part_lower = local_part.lower()
-        return any(bot_indicator in local_part_lower for bot_indicator in self.bot_localparts)
+        return self.bot_localpart_matcher.search(local_part.lower())
+    
+    def _match_bot_indicators(self, local_part: str) -> List[str]:
+        """Return every bot indicator found in the local-part."""
+        return self.bot_localpart_matcher.find_all(local_part.lower())
     
-    def _is_high_randomness(self, local_part: str) -> bool:
+    def _is_high_randomness(self, local_part: str, features: Optional[LocalPartFeatures] = None) -> bool:
         """Check if local-part shows high randomness characteristics."""
-        if len(local_part) < self.config.MIN_LENGTH_FOR_RANDOMNESS:
+        if features is None:
+            features = extract_local_part_features(local_part)
+        
+        length = features.length
+        if length < self.config.MIN_LENGTH_FOR_RANDOMNESS:
             return False
         
-        # Count digits and special characters
-        digit_count = sum(1 for c in local_part if c.isdigit())
-        special_count = sum(1 for c in local_part if c in string.punctuation)
-        vowel_count = sum(1 for c in local_part.lower() if c in 'aeiou')
-        
-        # Calculate ratios
-        digit_ratio = digit_count / len(local_part)
-        special_ratio = special_count / len(local_part)
-        vowel_ratio = vowel_count / len(local_part)
-        
-        # Check for long consonant runs
-        consonant_run = 0
-        max_consonant_run = 0
-        for c in local_part.lower():
-            if c not in 'aeiou' and c.isalpha():
-                consonant_run += 1
-                max_consonant_run = max(max_consonant_run, consonant_run)
-            else:
-                consonant_run = 0
-        
-        # Determine if high randomness
-        high_randomness = (
-            digit_ratio > self.config.HIGH_DIGIT_RATIO or
-            special_ratio > self.config.HIGH_SPECIAL_RATIO or
-            vowel_ratio < self.config.LOW_VOWEL_RATIO or
-            max_consonant_run >= self.config.MIN_CONSONANT_RUN
+        # Determine if high randomness from digit, special and vowel ratios and consonant runs
+        return (
+            features.digits / length > self.config.HIGH_DIGIT_RATIO or
+            features.specials / length > self.config.HIGH_SPECIAL_RATIO or
+            features.vowels / length < self.config.LOW_VOWEL_RATIO or
+            features.max_consonant_run >= self.config.MIN_CONSONANT_RUN
         )
-        
-        return high_randomness
     
     def _is_role_account(self, email: str) -> bool:
         """Check if email is a role account."""
-        email_lower = email.lower()
-        return any(re.search(pattern, email_lower) for pattern in self.role_patterns)
+        local_part, at, _ = email.rpartition('@')
+        return bool(at) and self._is_role_localpart(local_part)
+    
+    def _is_role_localpart(self, local_part: str) -> bool:
+        """Check if local-part is a role account with a single set lookup."""
+        return local_part.strip().lower() in self.role_index
     
-    def _calculate_name_score(self, first_name: Optional[str], last_name: Optional[str], local_part: str) -> float:
+    def _calculate_name_score(self, first_name: Optional[str], last_name: Optional[str], local_part: str,
+                              features: Optional[LocalPartFeatures] = None) -> float:
         """Calculate score based on name presence and characteristics."""
         score = 0.0
         
@@ -240,7 +697,7 @@ class BotDetector:
         
         if names_missing:
             # If local-part is high-entropy, slightly increase score
-            if self._is_high_randomness(local_part):
+            if self._is_high_randomness(local_part, features):
                 score += self.config.MISSING_NAMES_WEIGHT
         else:
             # If names exist and look human, slightly reduce score
@@ -269,7 +726,145 @@ class BotDetector:
         
         return first_human and last_human
     
-    def get_detection_details(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> Dict:
+    def score_columns(self, emails: Sequence[Optional[str]],
+                      first_names: Optional[Sequence[Optional[str]]] = None,
+                      last_names: Optional[Sequence[Optional[str]]] = None,
+                      domain_codes: Optional[np.ndarray] = None,
+                      domains: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a whole column of syntax-valid emails with the non-DNS rules at once.
+        
+        Mirrors _calculate_bot_score, but works on the packed column with NumPy
+        table lookups; rows with non-ASCII text use the exact per-row rules.
+        
+        Args:
+            emails: Normalized email addresses
+            first_names: Optional first names aligned with emails
+            last_names: Optional last names aligned with emails
+            domain_codes: Optional integer code of each row's domain into domains
+            domains: Unique domains for domain_codes, e.g. from factorize_domains
+            
+        Returns:
+            Tuple of (float score array, boolean verdict array)
+        """
+        config = self.config
+        emails = list(emails)
+        packed = PackedStrings(emails)
+        size = len(packed)
+        
+        # Split every row at its last '@' into local-part and domain spans
+        at = packed.last_index_of('@')
+        has_at = at >= 0
+        in_local = packed.span_mask(packed.starts, np.where(has_at, at, packed.starts))
+        in_domain = ~in_local & (packed.data != columns.SEPARATOR)
+        in_domain[at[has_at]] = False
+        lowered = packed.lower()
+        local = lowered.extract(in_local)
+        
+        # Domain-level rules run once per unique domain and broadcast through the codes
+        if domain_codes is None:
+            domain_codes, domains = self.factorize_domains(lowered.extract(in_domain).to_list())
+        scores = self.score_domains(domains)[domain_codes]
+        
+        # Obvious bot local-parts
+        bot_localpart = self.bot_localpart_index.search(local)
+        scores += np.where(bot_localpart, config.OBVIOUS_BOT_LOCALPART_WEIGHT, 0.0)
+        
+        # High randomness from digit, special and vowel ratios and consonant runs
+        length = local.lengths
+        safe_length = np.maximum(length, 1)
+        fields = local.count(_LOCAL_PART_FIELDS)
+        digits = fields & _FIELD_MASK
+        specials = (fields >> 21) & _FIELD_MASK
+        vowels = fields >> 42
+        consonant_run = local.has_run(columns.CONSONANTS[local.data], config.MIN_CONSONANT_RUN)
+        high_randomness = (length >= config.MIN_LENGTH_FOR_RANDOMNESS) & (
+            (digits / safe_length > config.HIGH_DIGIT_RATIO) |
+            (specials / safe_length > config.HIGH_SPECIAL_RATIO) |
+            (vowels / safe_length < config.LOW_VOWEL_RATIO) |
+            consonant_run
+        )
+        scores += np.where(high_randomness, config.HIGH_RANDOMNESS_WEIGHT, 0.0)
+        
+        # Role accounts
+        local_parts = local.to_list()
+        role_account = np.fromiter(map(self.role_index.exact.__contains__, local_parts), dtype=bool, count=size)
+        if self.role_wildcard_bytes_pattern is not None:
+            role_account |= local.search(self.role_wildcard_bytes_pattern)
+        # _is_role_localpart ignores surrounding whitespace; such local-parts are rare
+        for i in np.flatnonzero(local.padded()):
+            role_account[i] = self._is_role_localpart(local_parts[i])
+        scores += np.where(role_account, config.ROLE_ACCOUNT_WEIGHT, 0.0)
+        
+        # Name plausibility
+        first = PackedStrings(first_names) if first_names is not None else None
+        last = PackedStrings(last_names) if last_names is not None else None
+        first_present, first_human = self._name_columns(first, size)
+        last_present, last_human = self._name_columns(last, size)
+        names_missing = ~first_present & ~last_present
+        scores += np.where(
+            names_missing,
+            np.where(high_randomness, config.MISSING_NAMES_WEIGHT, 0.0),
+            np.where(first_human & last_human, config.HUMAN_NAMES_WEIGHT, 0.0)
+        )
+        
+        # Character classes of non-ASCII text need the exact per-row rules
+        irregular = packed.irregular.copy()
+        for names in (first, last):
+            if names is not None:
+                irregular |= names.irregular
+        for i in np.flatnonzero(irregular):
+            email = emails[i] if isinstance(emails[i], str) else ''
+            scores[i] = self._calculate_bot_score(
+                email if '@' in email else '@' + email,
+                self._name_or_none(first_names, i),
+                self._name_or_none(last_names, i)
+            )
+        
+        return scores, scores >= config.BOT_THRESHOLD
+    
+    @staticmethod
+    def factorize_domains(domains: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+        """Encode domains as integer codes into a list of unique domains."""
+        domains = list(domains)
+        # dict.fromkeys keeps first-seen order; both passes run in C
+        unique = list(dict.fromkeys(domains))
+        index = dict(zip(unique, range(len(unique))))
+        codes = np.fromiter(map(index.__getitem__, domains), dtype=np.int64, count=len(domains))
+        return codes, unique
+    
+    def score_domains(self, domains: Sequence[str]) -> np.ndarray:
+        """Return the summed weight of the domain-level rules for each unique domain."""
+        weight = self.config.DISPOSABLE_DOMAIN_WEIGHT
+        return np.array(
+            [weight if self._is_disposable_domain(domain.lower()) else 0.0 for domain in domains],
+            dtype=np.float64
+        )
+    
+    @staticmethod
+    def _name_or_none(names: Optional[Sequence[Optional[str]]], i: int) -> Optional[str]:
+        """Return the i-th name if it is a string, otherwise None."""
+        if names is None:
+            return None
+        name = names[i]
+        return name if isinstance(name, str) else None
+    
+    @staticmethod
+    def _name_columns(names: Optional[PackedStrings], size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (present, looks human or absent) arrays for a packed name column."""
+        if names is None:
+            return np.zeros(size, dtype=bool), np.ones(size, dtype=bool)
+        
+        length = names.lengths
+        present = length > 0
+        fields = names.count(_NAME_FIELDS)
+        letters = fields & 0xFFFFFFFF
+        alphabetic = (letters > 0) & (fields >> 32 == 0)
+        human = alphabetic & (length >= 2) & (length <= 20)
+        return present, ~present | human
+    
+    def get_detection_details(self, email: str, first_name: Optional[str] = None, last_name: Optional[str] = None,
+                              analysis: Optional[EmailAnalysis] = None) -> Dict:
         """Get detailed bot detection analysis for debugging and tuning."""
         if not email or not isinstance(email, str):
             return {
@@ -281,11 +876,14 @@ class BotDetector:
                 'details': {}
             }
         
-        # Get email status
-        email_status = self._verify_email(email)
+        # Reuse an existing analysis of this row instead of validating again
+        if analysis is None:
+            email_status, normalized = self.check_email(email)
+        else:
+            email_status, normalized = analysis.status, analysis.normalized
         
         # If email is invalid and should be treated as bots
-        if self.config.TREAT_INVALID_AS_BOTS and email_status != 'valid':
+        if self.config.TREAT_INVALID_AS_BOTS and email_status not in SCORED_STATUSES:
             return {
                 'email': email,
                 'is_bot': True,
@@ -299,7 +897,7 @@ class BotDetector:
             }
         
         # Only proceed with bot detection for valid emails
-        if email_status != 'valid':
+        if email_status not in SCORED_STATUSES:
             return {
                 'email': email,
                 'is_bot': False,
@@ -312,82 +910,22 @@ class BotDetector:
                 }
             }
         
-        try:
-            validated_email = validate_email(email)
-            email = validated_email.normalized
-        except EmailNotValidError:
-            return {
-                'email': email,
-                'is_bot': True,
-                'email_status': 'invalid_syntax',
-                'reason': 'Email syntax validation failed',
-                'score': 0.0,
-                'details': {
-                    'email_status': 'invalid_syntax',
-                    'treat_invalid_as_bots': self.config.TREAT_INVALID_AS_BOTS
-                }
-            }
-        
         # Calculate detailed score
-        local_part, domain = email.split('@', 1)
-        score = 0.0
+        local_part, _, domain = normalized.rpartition('@')
         details = {
             'email_status': email_status,
             'local_part': local_part,
             'domain': domain,
+            'features': extract_local_part_features(local_part).as_dict(),
             'checks': {}
         }
-        
-        # Check disposable domains
-        if self._is_disposable_domain(domain):
-            score += self.config.DISPOSABLE_DOMAIN_WEIGHT
-            details['checks']['disposable_domain'] = {
-                'result': True,
-                'weight': self.config.DISPOSABLE_DOMAIN_WEIGHT,
-                'score': score
-            }
-        
-        # Check obvious bot local-parts
-        if self._is_obvious_bot_localpart(local_part):
-            score += self.config.OBVIOUS_BOT_LOCALPART_WEIGHT
-            details['checks']['obvious_bot_localpart'] = {
-                'result': True,
-                'weight': self.config.OBVIOUS_BOT_LOCALPART_WEIGHT,
-                'score': score
-            }
-        
-        # Check high randomness
-        if self._is_high_randomness(local_part):
-            score += self.config.HIGH_RANDOMNESS_WEIGHT
-            details['checks']['high_randomness'] = {
-                'result': True,
-                'weight': self.config.HIGH_RANDOMNESS_WEIGHT,
-                'score': score
-            }
-        
-        # Check role accounts
-        if self._is_role_account(email):
-            score += self.config.ROLE_ACCOUNT_WEIGHT
-            details['checks']['role_account'] = {
-                'result': True,
-                'weight': self.config.ROLE_ACCOUNT_WEIGHT,
-                'score': score
-            }
-        
-        # Calculate name score
-        name_score = self._calculate_name_score(first_name, last_name, local_part)
-        score += name_score
-        details['checks']['name_analysis'] = {
-            'first_name': first_name,
-            'last_name': last_name,
-            'name_score': name_score,
-            'final_score': score
-        }
+        score, rules = self._evaluate_rules(normalized, first_name, last_name, details['checks'])
+        details['rules'] = rules
         
         is_bot = score >= self.config.BOT_THRESHOLD
         
         return {
-            'email': email,
+            'email': normalized,
             'is_bot': is_bot,
             'email_status': email_status,
             'reason': f'Bot score {score:.2f} {"exceeds" if is_bot else "below"} threshold {self.config.BOT_THRESHOLD}',
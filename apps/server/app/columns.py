@@ -0,0 +1,238 @@
+"""
+Byte-level column kernels for scoring whole email columns at once.
+A column of strings is packed into one newline separated buffer so that
+character-class checks become NumPy table lookups and cumulative sums.
+"""
+
+import re
+import string
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+SEPARATOR = ord('\n')
+
+
+def byte_table(chars: str) -> np.ndarray:
+    """Return a 256-entry boolean lookup table for the given ASCII characters."""
+    table = np.zeros(256, dtype=bool)
+    table[list(chars.encode('ascii'))] = True
+    return table
+
+
+DIGITS = byte_table(string.digits)
+PUNCTUATION = byte_table(string.punctuation)
+LETTERS = byte_table(string.ascii_letters)
+VOWELS = byte_table('aeiouAEIOU')
+# The ASCII characters str.strip removes, other than the separator
+WHITESPACE = byte_table(' \t\r\x0b\x0c\x1c\x1d\x1e\x1f')
+CONSONANTS = LETTERS & ~VOWELS
+LOWERCASE = np.arange(256, dtype=np.uint8)
+LOWERCASE[ord('A'):ord('Z') + 1] += ord('a') - ord('A')
+
+
+class PackedStrings:
+    """A column of strings packed into one newline separated byte buffer."""
+
+    __slots__ = ('data', 'starts', 'ends', 'size', 'irregular')
+
+    def __init__(self, values: Sequence[Optional[str]]):
+        values = list(values)
+        self.size = len(values)
+        self.irregular = np.zeros(self.size, dtype=bool)
+
+        try:
+            joined = '\n'.join(values)
+        except TypeError:
+            # Missing values are usually None, which is cheaper to test for than any non-string
+            values = ['' if v is None else v for v in values]
+            try:
+                joined = '\n'.join(values)
+            except TypeError:
+                values = [v if isinstance(v, str) else '' for v in values]
+                joined = '\n'.join(values)
+        if joined.count('\n') != max(self.size - 1, 0):
+            # Embedded newlines would shift row boundaries; blank them out and
+            # let callers fall back to the exact per-row path for those rows
+            for i, value in enumerate(values):
+                if '\n' in value:
+                    values[i] = value.replace('\n', ' ')
+                    self.irregular[i] = True
+            joined = '\n'.join(values)
+
+        self.data = np.frombuffer(joined.encode('utf-8', 'surrogatepass'), dtype=np.uint8)
+        separators = np.flatnonzero(self.data == SEPARATOR)
+        self.starts = np.concatenate(([0], separators + 1))
+        self.ends = np.concatenate((separators, [len(self.data)]))
+
+        # Non-ASCII bytes mean character and byte offsets no longer agree
+        high = np.flatnonzero(self.data >= 0x80)
+        if len(high):
+            self.irregular[self.row_of(high)] = True
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def row_of(self, positions: np.ndarray) -> np.ndarray:
+        """Map byte positions to row numbers."""
+        return np.searchsorted(self.ends, positions, side='left')
+
+    def last_index_of(self, char: str) -> np.ndarray:
+        """Return the position of the last occurrence of char per row, or -1."""
+        positions = np.flatnonzero(self.data == ord(char))
+        result = np.full(self.size, -1, dtype=np.int64)
+        if len(positions):
+            rows = self.row_of(positions)
+            last = np.concatenate((rows[1:] != rows[:-1], [True]))
+            result[rows[last]] = positions[last]
+        return result
+
+    def span_mask(self, begin: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Return a per-byte mask that is True inside [begin, end) of each row."""
+        delta = np.zeros(len(self.data) + 1, dtype=np.int8)
+        delta[begin] += 1
+        delta[end] -= 1
+        return np.cumsum(delta[:-1], dtype=np.int8).astype(bool)
+
+    def count(self, table: np.ndarray) -> np.ndarray:
+        """
+        Sum a 256-entry lookup table over the bytes of each row.
+        
+        Boolean tables give per-row counts; integer tables can pack several
+        counts into bit fields of one sum. The separator must map to zero.
+        """
+        if not self.size:
+            return np.zeros(0, dtype=np.int64)
+        values = table[self.data]
+        if self.starts[-1] >= len(values):
+            values = np.append(values, values.dtype.type(0))
+        return np.add.reduceat(values, self.starts, dtype=np.int64)
+
+    def has_run(self, mask: np.ndarray, length: int) -> np.ndarray:
+        """Return rows containing at least `length` consecutive True bytes of mask."""
+        result = np.zeros(self.size, dtype=bool)
+        if length <= 0:
+            result[:] = True
+            return result
+        if len(mask) < length:
+            return result
+        # windows[i] holds when the `span` bytes from i are all set; doubling span
+        # reaches `length` in log2(length) boolean ANDs
+        windows, span = mask, 1
+        while span < length:
+            step = min(span, length - span)
+            windows = windows[:-step] & windows[step:]
+            span += step
+        windows = np.flatnonzero(windows)
+        if len(windows):
+            result[self.row_of(windows)] = True
+        return result
+
+    def padded(self) -> np.ndarray:
+        """Return rows that start or end with ASCII whitespace."""
+        if not len(self.data):
+            return np.zeros(self.size, dtype=bool)
+        first = WHITESPACE[self.data[np.minimum(self.starts, len(self.data) - 1)]]
+        last = WHITESPACE[self.data[np.maximum(self.ends - 1, 0)]]
+        return (self.ends > self.starts) & (first | last)
+
+    def lower(self) -> 'PackedStrings':
+        """Return the column with ASCII letters lowercased; row boundaries are unchanged."""
+        packed = PackedStrings.__new__(PackedStrings)
+        packed.size = self.size
+        packed.irregular = self.irregular
+        packed.data = LOWERCASE[self.data]
+        packed.starts = self.starts
+        packed.ends = self.ends
+        return packed
+
+    def extract(self, mask: np.ndarray) -> 'PackedStrings':
+        """Return a new column keeping only the masked bytes of each row."""
+        kept = self.data[mask | (self.data == SEPARATOR)]
+        packed = PackedStrings.__new__(PackedStrings)
+        packed.size = self.size
+        packed.irregular = self.irregular
+        packed.data = kept
+        separators = np.flatnonzero(kept == SEPARATOR)
+        packed.starts = np.concatenate(([0], separators + 1))
+        packed.ends = np.concatenate((separators, [len(kept)]))
+        return packed
+
+    def to_list(self) -> List[str]:
+        """Decode the buffer back into one string per row."""
+        if not self.size:
+            return []
+        return self.data.tobytes().decode('utf-8', 'surrogatepass').split('\n')
+
+    def search(self, pattern: 're.Pattern[bytes]') -> np.ndarray:
+        """Return rows where a bytes regex matches; matches never span rows."""
+        result = np.zeros(self.size, dtype=bool)
+        starts = [m.start() for m in pattern.finditer(self.data.tobytes())]
+        if starts:
+            result[self.row_of(np.asarray(starts))] = True
+        return result
+
+
+class SubstringMatcher:
+    """
+    Column-wide multi-pattern substring search over a PackedStrings buffer.
+    
+    Every position's leading trigram is looked up in a bit table built from the
+    pattern prefixes, so the whole buffer is screened in a few NumPy passes and
+    only candidate positions are verified against their patterns.
+    """
+
+    __slots__ = ('_short', '_trigram_bits', '_by_trigram')
+
+    def __init__(self, patterns: Iterable[str]):
+        encoded = {p.encode('utf-8') for p in patterns if p and '\n' not in p}
+        self._short = [np.frombuffer(p, dtype=np.uint8) for p in sorted(encoded) if len(p) < 3]
+        self._trigram_bits = np.zeros(1 << 21, dtype=np.uint8)
+        self._by_trigram: Dict[int, List[np.ndarray]] = {}
+        for pattern in sorted(p for p in encoded if len(p) >= 3):
+            trigram = (pattern[0] << 16) | (pattern[1] << 8) | pattern[2]
+            self._trigram_bits[trigram >> 3] |= 1 << (trigram & 7)
+            self._by_trigram.setdefault(trigram, []).append(np.frombuffer(pattern, dtype=np.uint8))
+
+    def search(self, packed: PackedStrings) -> np.ndarray:
+        """Return rows containing at least one pattern."""
+        data = packed.data
+        matched = [self._verify(data, np.arange(len(data)), p) for p in self._short]
+
+        if self._by_trigram and len(data) >= 3:
+            trigrams = (
+                (data[:-2].astype(np.uint32) << 16) |
+                (data[1:-1].astype(np.uint32) << 8) |
+                data[2:]
+            )
+            bits = self._trigram_bits[trigrams >> 3] >> (trigrams & 7).astype(np.uint8)
+            candidates = np.flatnonzero(bits & 1)
+            if len(candidates):
+                candidate_trigrams = trigrams[candidates]
+                order = np.argsort(candidate_trigrams, kind='stable')
+                candidates, candidate_trigrams = candidates[order], candidate_trigrams[order]
+                present, first = np.unique(candidate_trigrams, return_index=True)
+                bounds = np.append(first, len(candidates))
+                for i, trigram in enumerate(present.tolist()):
+                    positions = candidates[bounds[i]:bounds[i + 1]]
+                    for pattern in self._by_trigram[trigram]:
+                        matched.append(self._verify(data, positions, pattern))
+
+        result = np.zeros(packed.size, dtype=bool)
+        if matched:
+            positions = np.concatenate(matched)
+            if len(positions):
+                result[packed.row_of(positions)] = True
+        return result
+
+    @staticmethod
+    def _verify(data: np.ndarray, positions: np.ndarray, pattern: np.ndarray) -> np.ndarray:
+        """Return the positions where pattern occurs in data."""
+        positions = positions[positions + len(pattern) <= len(data)]
+        for offset, byte in enumerate(pattern.tolist()):
+            positions = positions[data[positions + offset] == byte]
+        return positions
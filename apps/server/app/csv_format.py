@@ -0,0 +1,79 @@
+"""
+Encoding and delimiter detection for uploaded CSV files.
+Both are decided once from a bounded prefix of the file, so the file itself
+is parsed a single time with the chosen codec. Encodings that the prefix did
+not rule out are kept as fallbacks for a file whose later bytes fail to decode.
+"""
+
+import codecs
+import csv
+from dataclasses import dataclass
+from typing import Tuple
+
+# Bytes read from the start of the file to decide its format
+SAMPLE_BYTES = 64 * 1024
+
+# Tried in order; latin-1 decodes any byte sequence, so it is always last
+ENCODINGS = ('utf-8', 'cp1252', 'latin-1')
+DELIMITERS = ',;\t|'
+
+
+@dataclass(frozen=True)
+class CsvFormat:
+    """How to read a CSV file: codec, delimiter and the codecs to retry with."""
+    encoding: str
+    delimiter: str = ','
+    fallbacks: Tuple[str, ...] = ()
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """The chosen codec followed by its fallbacks."""
+        return (self.encoding,) + self.fallbacks
+
+
+def _decode_prefix(sample: bytes, encoding: str, final: bool) -> str:
+    # A prefix may end inside a multi-byte character, which is not an error
+    # unless the sample is the whole file
+    return codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+
+
+def sniff_delimiter(text: str) -> str:
+    """Return the delimiter of a CSV sample, or ',' if it cannot be told."""
+    # Only whole lines are sniffed; the last one may be cut off by the sample
+    lines = text.splitlines()
+    if len(lines) > 1:
+        lines = lines[:-1]
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+def detect_format(sample: bytes, final: bool = False) -> CsvFormat:
+    """
+    Detect the format of a CSV file from a prefix of its bytes.
+
+    Pass final=True when the sample is the complete file. UTF-8 wins when the
+    prefix decodes as UTF-8 (as utf-8-sig with a byte order mark), then cp1252,
+    then latin-1.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        candidates = ('utf-8-sig',) + ENCODINGS[1:]
+    else:
+        candidates = ENCODINGS
+    for index, encoding in enumerate(candidates):
+        try:
+            text = _decode_prefix(sample, encoding, final)
+        except UnicodeDecodeError:
+            continue
+        return CsvFormat(encoding, sniff_delimiter(text), candidates[index + 1:])
+    # Unreachable while latin-1 is a candidate
+    raise ValueError("Could not decode CSV sample")
+
+
+def detect_file_format(path: str, sample_bytes: int = SAMPLE_BYTES) -> CsvFormat:
+    """Detect the format of a CSV file from its first sample_bytes bytes."""
+    with open(path, 'rb') as handle:
+        sample = handle.read(sample_bytes + 1)
+    final = len(sample) <= sample_bytes
+    return detect_format(sample[:sample_bytes], final=final)
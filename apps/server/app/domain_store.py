@@ -0,0 +1,109 @@
+"""
+On-disk store of domain MX results shared by every worker process on a node.
+Backed by SQLite in WAL mode so concurrent readers never block the writer and
+results survive restarts; expired rows are ignored and pruned on open.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_PARAMS = 500
+
+
+class DomainStatusStore:
+    """Persistent domain -> (has MX, expiry) table used behind the in-memory MX cache."""
+
+    def __init__(self, path: str, timeout: float = 5.0, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.timeout = timeout
+        # Wall-clock time, since expiries are shared across processes and restarts
+        self._clock = clock
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS domain_status ('
+            'domain TEXT PRIMARY KEY, has_mx INTEGER NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS domain_status_expires ON domain_status (expires_at)')
+        self.prune()
+
+    @classmethod
+    def from_env(cls) -> Optional['DomainStatusStore']:
+        """Open the store at DOMAIN_CACHE_PATH, or return None if it is unset or unusable."""
+        path = os.getenv('DOMAIN_CACHE_PATH')
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Domain cache disabled, cannot open %s: %s", path, e)
+            return None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection; SQLite connections are not shared across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, domains: Iterable[str]) -> Dict[str, Tuple[bool, float]]:
+        """Return domain -> (has MX, remaining TTL) for the unexpired domains found."""
+        domains = list(domains)
+        now = self._clock()
+        found = {}
+        try:
+            conn = self._connection()
+            for i in range(0, len(domains), _MAX_PARAMS):
+                chunk = domains[i:i + _MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT domain, has_mx, expires_at FROM domain_status "
+                    f"WHERE expires_at > ? AND domain IN ({','.join('?' * len(chunk))})",
+                    [now, *chunk]
+                )
+                for domain, has_mx, expires_at in rows:
+                    found[domain] = (bool(has_mx), expires_at - now)
+        except sqlite3.Error as e:
+            # The store is only a cache; a locked or broken file means a DNS lookup
+            logger.warning("Domain cache read failed: %s", e)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, bool, float]]):
+        """Store (domain, has MX, TTL seconds) results in one transaction."""
+        now = self._clock()
+        rows: List[Tuple[str, int, float]] = [
+            (domain, int(has_mx), now + ttl) for domain, has_mx, ttl in entries if ttl > 0
+        ]
+        if not rows:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('INSERT OR REPLACE INTO domain_status VALUES (?, ?, ?)', rows)
+        except sqlite3.Error as e:
+            logger.warning("Domain cache write failed: %s", e)
+
+    def prune(self) -> int:
+        """Delete expired rows, returning how many were removed."""
+        try:
+            with self._connection() as conn:
+                return conn.execute('DELETE FROM domain_status WHERE expires_at <= ?', [self._clock()]).rowcount
+        except sqlite3.Error as e:
+            logger.warning("Domain cache prune failed: %s", e)
+            return 0
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM domain_status').fetchone()[0]
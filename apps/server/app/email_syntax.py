@@ -0,0 +1,68 @@
+"""
+Email syntax validation with a fast path for plain ASCII addresses.
+Addresses inside a strict subset of the grammar are normalized with one
+precompiled regex; everything else (internationalized, Punycode, quoted,
+special-use or over-long addresses) goes through email_validator.
+"""
+
+import re
+from typing import Optional
+
+from email_validator import validate_email, EmailNotValidError, SPECIAL_USE_DOMAIN_NAMES
+from email_validator.rfc_constants import CASE_INSENSITIVE_MAILBOX_NAMES
+
+# Limits from RFC 5321 4.5.3.1, as enforced by email_validator
+EMAIL_MAX_LENGTH = 254
+
+_ATEXT = r"a-zA-Z0-9_!#$%&'*+\-/=?^`{|}~"
+_LABEL = r'[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?'
+# Every TLD currently ends with a letter
+_TLD = r'(?:[a-zA-Z0-9][a-zA-Z0-9\-]{0,61})?[a-zA-Z]'
+
+# Dot-atom local part of at most 64 characters, then a dotted hostname
+_ASCII_EMAIL = re.compile(
+    rf'(?=[^@]{{1,64}}@)(?P<local>[{_ATEXT}]+(?:\.[{_ATEXT}]+)*)'
+    rf'@(?P<domain>(?:{_LABEL}\.)+{_TLD})'
+)
+
+_SPECIAL_USE_SUFFIXES = tuple('.' + name for name in SPECIAL_USE_DOMAIN_NAMES)
+_CASE_INSENSITIVE_MAILBOXES = frozenset(CASE_INSENSITIVE_MAILBOX_NAMES)
+
+
+def ascii_normalize(email: str) -> Optional[str]:
+    """
+    Return the normalized form of a plain ASCII address, or None if the fast
+    path cannot decide it.
+
+    None does not mean invalid: the caller must fall back to the full
+    validator. Addresses accepted here normalize exactly as email_validator
+    would, with the domain lowercased and case-insensitive role mailboxes
+    (postmaster, abuse, ...) lowercased.
+    """
+    if len(email) > EMAIL_MAX_LENGTH:
+        return None
+    match = _ASCII_EMAIL.fullmatch(email)
+    if match is None:
+        return None
+    local_part, domain = match.group('local', 'domain')
+    domain = domain.lower()
+    # '--' may be Punycode or an invalid R-LDH label, which only IDNA can decide
+    if '--' in domain or domain.endswith(_SPECIAL_USE_SUFFIXES):
+        return None
+    if local_part.lower() in _CASE_INSENSITIVE_MAILBOXES:
+        local_part = local_part.lower()
+    return f"{local_part}@{domain}"
+
+
+def normalize_email(email: str) -> Optional[str]:
+    """Return the normalized email, or None if its syntax is invalid."""
+    normalized = ascii_normalize(email)
+    if normalized is not None:
+        return normalized
+    # Every form email_validator accepts has an '@'
+    if '@' not in email:
+        return None
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
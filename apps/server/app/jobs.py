@@ -0,0 +1,162 @@
+"""
+Persistent queue of /process jobs shared by every worker process on a node.
+Backed by SQLite in WAL mode like the domain cache: the endpoint inserts a
+queued job, any worker claims it atomically, and status polls read progress
+from whichever process serves them. A running job's worker renews its claim
+with heartbeats and progress updates; a job whose worker stopped beating is
+claimed again. Each claim bumps the job's attempt number, which serves as the
+claim's token: updates carrying an older attempt are ignored, so a worker that
+lost its claim cannot overwrite the new holder's progress or outcome.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+
+class ClaimLost(Exception):
+    """Raised by a worker whose claim on a job has been taken over by another worker."""
+
+
+class JobStore:
+    """Persistent table of processing jobs with their state, progress and result."""
+
+    def __init__(self, path: str, timeout: float = 5.0, stale_after: float = 900.0,
+                 max_attempts: int = 3, retention: float = 7 * 24 * 3600,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.timeout = timeout
+        # Seconds without a heartbeat after which a running job's worker is presumed dead
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        # Finished jobs are kept this long for status polls
+        self.retention = retention
+        self._clock = clock
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, user_id TEXT NOT NULL, filename TEXT NOT NULL, '
+            'work_dir TEXT NOT NULL, params TEXT NOT NULL, state TEXT NOT NULL, '
+            'rows_processed INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0, '
+            'result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)')
+        self.prune()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection; SQLite connections are not shared across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create(self, user_id: str, filename: str, work_dir: str, params: Dict) -> str:
+        """Queue a job for the upload in work_dir and return its ID."""
+        job_id = str(uuid.uuid4())
+        now = self._clock()
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, user_id, filename, work_dir, params, state, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [job_id, user_id, filename, work_dir, json.dumps(params), JOB_QUEUED, now, now]
+            )
+        return job_id
+
+    def claim(self) -> Optional[Dict]:
+        """Mark the oldest runnable job as running and return it, or None if there is none."""
+        now = self._clock()
+        stale = now - self.stale_after
+        conn = self._connection()
+        with conn:
+            # Take the write lock first so two workers never claim the same job
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'UPDATE jobs SET state = ?, error = ?, updated_at = ? '
+                'WHERE state = ? AND updated_at < ? AND attempts >= ?',
+                [JOB_FAILED, 'Processing stopped unexpectedly', now, JOB_RUNNING, stale, self.max_attempts]
+            )
+            row = conn.execute(
+                'SELECT id FROM jobs WHERE state = ? OR (state = ? AND updated_at < ?) '
+                'ORDER BY created_at LIMIT 1',
+                [JOB_QUEUED, JOB_RUNNING, stale]
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                'UPDATE jobs SET state = ?, attempts = attempts + 1, rows_processed = 0, updated_at = ? '
+                'WHERE id = ?',
+                [JOB_RUNNING, now, row['id']]
+            )
+        return self.get(row['id'])
+
+    def progress(self, job_id: str, attempt: int, rows_processed: int) -> bool:
+        """Record rows processed so far and renew the claim; False if the claim was lost."""
+        return self._renew(job_id, attempt, rows_processed=rows_processed)
+
+    def heartbeat(self, job_id: str, attempt: int) -> bool:
+        """Renew the claim on a running job; False if the claim was lost."""
+        return self._renew(job_id, attempt)
+
+    def finish(self, job_id: str, attempt: int, result: Dict) -> bool:
+        """Mark a job succeeded with its result; False if the claim was lost."""
+        return self._settle(job_id, attempt, JOB_SUCCEEDED, result=json.dumps(result))
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        """Mark a job failed with an error message; False if the claim was lost."""
+        return self._settle(job_id, attempt, JOB_FAILED, error=error)
+
+    def release(self, job_id: str, attempt: int) -> bool:
+        """Return a running job to the queue, e.g. when its worker shuts down; False if the claim was lost."""
+        return self._settle(job_id, attempt, JOB_QUEUED)
+
+    def _renew(self, job_id: str, attempt: int, rows_processed: Optional[int] = None) -> bool:
+        with self._connection() as conn:
+            return conn.execute(
+                'UPDATE jobs SET rows_processed = COALESCE(?, rows_processed), updated_at = ? '
+                'WHERE id = ? AND attempts = ? AND state = ?',
+                [rows_processed, self._clock(), job_id, attempt, JOB_RUNNING]
+            ).rowcount == 1
+
+    def _settle(self, job_id: str, attempt: int, state: str, result: Optional[str] = None,
+                error: Optional[str] = None) -> bool:
+        with self._connection() as conn:
+            return conn.execute(
+                'UPDATE jobs SET state = ?, result = ?, error = ?, updated_at = ? '
+                'WHERE id = ? AND attempts = ? AND state = ?',
+                [state, result, error, self._clock(), job_id, attempt, JOB_RUNNING]
+            ).rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job with its params and result decoded, or None if it does not exist."""
+        row = self._connection().execute('SELECT * FROM jobs WHERE id = ?', [job_id]).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the retention period, returning how many were removed."""
+        with self._connection() as conn:
+            return conn.execute(
+                'DELETE FROM jobs WHERE state IN (?, ?) AND updated_at <= ?',
+                [JOB_SUCCEEDED, JOB_FAILED, self._clock() - self.retention]
+            ).rowcount
@@ -4,17 +4,28 @@ import zipfile
 import uuid
 import jwt
 import os
-from typing import Optional
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile, Query, Depends, Header
+import shutil
+import sqlite3
+import logging
+import tempfile
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import pandas as pd
 from datetime import datetime
 
-from .bot_detection import BotDetector
+from .bot_detection import BotDetector, OUTPUT_FILES
+from .csv_format import CsvFormat, detect_file_format
+from .jobs import ClaimLost, JobStore, JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED
 from .models import ColumnMapping, ProcessingSummary, ProcessingOptions
 from .supabase import supabase_service
-from .stripe_service import stripe_service
+from .stripe_service import stripe_service, supabase_client
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Bot Cleaner API",
@@ -31,6 +42,151 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Upload bytes read per await while spooling, and CSV rows classified per chunk
+SPOOL_CHUNK_BYTES = 1024 * 1024
+CSV_CHUNK_ROWS = 100_000
+
+# Parsing, scoring, CSV writing and compression run on this pool so the event loop keeps
+# serving other requests while a large file is processed
+PROCESSING_THREADS = int(os.getenv('PROCESSING_THREADS', '2'))
+processing_executor = ThreadPoolExecutor(max_workers=PROCESSING_THREADS, thread_name_prefix='csv-processing')
+
+# Uploads larger than this are queued as background jobs instead of processed inline.
+# JOB_DIR holds the job queue and pending uploads; every server process polling the
+# queue must see the same directory
+INLINE_MAX_BYTES = int(os.getenv('INLINE_MAX_BYTES', str(5 * 1024 * 1024)))
+JOB_DIR = os.getenv('JOB_DIR') or os.path.join(tempfile.gettempdir(), 'bot-cleaner-jobs')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_POLL_SECONDS = 2.0
+# Running jobs renew their claim this often, well within JobStore's stale_after
+JOB_HEARTBEAT_SECONDS = 30.0
+job_store = JobStore(os.path.join(JOB_DIR, 'jobs.sqlite3'))
+# Jobs get one thread per worker of their own, so queued files never hold up inline requests
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='csv-jobs')
+# Set when this process queues a job; created on startup, inside the server's event loop
+job_available: Optional[asyncio.Event] = None
+job_workers: List[asyncio.Task] = []
+
+async def run_blocking(func, *args, executor: Optional[Executor] = None, **kwargs):
+    """Run a blocking call on executor, the processing executor by default, and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or processing_executor, partial(func, *args, **kwargs))
+
+async def spool_upload(file: UploadFile, directory: str) -> str:
+    """Copy an upload to a file in directory in bounded chunks and return its path."""
+    path = os.path.join(directory, 'upload.csv')
+    # Disk writes go to the processing threads like the rest of the file handling
+    spool = await run_blocking(open, path, 'wb')
+    try:
+        while chunk := await file.read(SPOOL_CHUNK_BYTES):
+            await run_blocking(spool.write, chunk)
+    finally:
+        await run_blocking(spool.close)
+    return path
+
+def check_upload(upload_path: str, column_mapping: ColumnMapping) -> CsvFormat:
+    """Detect a spooled upload's format and check its header has the mapped columns."""
+    # Encoding and delimiter are decided once from the start of the file; the
+    # remaining candidates are only tried if a later byte fails to decode
+    csv_format = detect_file_format(upload_path)
+    try:
+        columns = pd.read_csv(upload_path, nrows=0, encoding=csv_format.encoding,
+                              sep=csv_format.delimiter).columns
+    except pd.errors.EmptyDataError:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+    
+    # Check required columns exist
+    required_columns = [column_mapping.email]
+    missing_columns = [col for col in required_columns if col not in columns]
+    if missing_columns:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing_columns)}")
+    return csv_format
+
+def count_upload_rows(upload_path: str, column_mapping: ColumnMapping) -> int:
+    """Count a spooled upload's rows without classifying them, so credits can be checked first."""
+    csv_format = check_upload(upload_path, column_mapping)
+    for encoding in csv_format.encodings:
+        # Every column is parsed, not just the email column: with usecols pandas keeps
+        # rows with too many fields, which detection skips, and would overcount them
+        try:
+            with pd.read_csv(upload_path, chunksize=CSV_CHUNK_ROWS, dtype=str, encoding=encoding,
+                             sep=csv_format.delimiter, on_bad_lines='skip') as chunks:
+                return sum(len(chunk) for chunk in chunks)
+        except UnicodeDecodeError:
+            continue
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not read CSV file: {str(e)}")
+    raise HTTPException(status_code=400, detail="Could not read CSV file with any supported encoding")
+
+def detect_upload(upload_path: str, work_dir: str, column_mapping: ColumnMapping,
+                  processing_options: ProcessingOptions,
+                  progress: Optional[Callable[[int], None]] = None) -> Tuple[Dict[str, str], Dict]:
+    """Classify a spooled upload into result CSVs in work_dir; returns (paths, summary)."""
+    # Initialize bot detector with options
+    bot_detector = BotDetector(processing_options)
+    
+    csv_format = check_upload(upload_path, column_mapping)
+    
+    paths = summary = None
+    for encoding in csv_format.encodings:
+        # Process data for bot detection
+        try:
+            paths, summary = bot_detector.detect_bots_csv(
+                upload_path,
+                email_column=column_mapping.email,
+                output_dir=work_dir,
+                first_name_column=column_mapping.firstName,
+                last_name_column=column_mapping.lastName,
+                chunk_rows=CSV_CHUNK_ROWS,
+                progress=progress,
+                dtype=str, encoding=encoding, sep=csv_format.delimiter, on_bad_lines='skip'
+            )
+            break
+        except UnicodeDecodeError:
+            continue
+        except ClaimLost:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error during bot detection: {str(e)}")
+    
+    if summary is None:
+        raise HTTPException(status_code=400, detail="Could not read CSV file with any supported encoding")
+    return paths, summary
+
+def check_credits(user_id: str, emails_to_process: Optional[int] = None):
+    """
+    Raise 402 unless the user has credits for emails_to_process emails, or any
+    credits at all when the row count is not known yet. Nothing is deducted.
+    """
+    try:
+        # Check credit balance without deducting yet
+        result = supabase_client.table('users').select('credits_balance').eq('id', user_id).execute()
+        current_balance = result.data[0]['credits_balance'] if result.data else 0
+        
+        if emails_to_process is None:
+            if current_balance <= 0:
+                raise Exception("Insufficient credits. Buy more credits to process this file.")
+        elif current_balance < emails_to_process:
+            raise Exception(f"Insufficient credits. You need {emails_to_process} credits to process this file.")
+            
+    except Exception as e:
+        raise HTTPException(status_code=402, detail=str(e))
+
+def build_zip(paths: Dict[str, str], summary: ProcessingSummary, zip_path: str) -> bytes:
+    """Compress the result files and summary into a ZIP at zip_path and return its bytes."""
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        # clean.csv (non-bot rows), bots.csv (bot rows only) and annotated.csv
+        # (all rows with BOT and EMAIL_STATUS columns)
+        for name in OUTPUT_FILES:
+            zip_file.write(paths[name], arcname=name)
+        
+        # Add summary.json
+        summary_json = summary.model_dump_json(indent=2)
+        zip_file.writestr('summary.json', summary_json)
+    
+    with open(zip_path, 'rb') as zip_handle:
+        return zip_handle.read()
+
 def get_current_user(authorization: str = Header(None)) -> str:
     """Extract user ID from JWT token in Authorization header."""
     if not authorization or not authorization.startswith("Bearer "):
@@ -53,6 +209,23 @@ def get_current_user(authorization: str = Header(None)) -> str:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the workers that run queued processing jobs."""
+    global job_available
+    job_available = asyncio.Event()
+    job_workers.extend(asyncio.create_task(job_worker()) for _ in range(JOB_WORKERS))
+
+@app.on_event("shutdown")
+async def shutdown_processing():
+    """Stop the job workers, returning their jobs to the queue, and the job and processing threads."""
+    for task in job_workers:
+        task.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_workers.clear()
+    job_executor.shutdown(wait=False, cancel_futures=True)
+    processing_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/")
 async def root():
     """Root endpoint providing API information."""
@@ -62,6 +235,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "process": "/process",
+            "jobs": "/jobs/{job_id}",
             "docs": "/docs"
         }
     }
@@ -79,6 +253,7 @@ async def process_csv(
     enable_mx_check: bool = Query(True, description="Enable MX record checking"),
     treat_invalid_as_bots: bool = Query(True, description="Treat invalid emails as bots"),
     mx_check_timeout: float = Query(5.0, description="MX check timeout in seconds"),
+    mx_concurrency: int = Query(50, ge=1, description="Maximum concurrent MX lookups"),
     bot_threshold: float = Query(1.0, description="Bot detection threshold"),
     user_id: str = Depends(get_current_user)
 ):
@@ -92,6 +267,7 @@ async def process_csv(
         enable_mx_check: Enable MX record checking
         treat_invalid_as_bots: Treat invalid emails as bots
         mx_check_timeout: MX check timeout in seconds
+        mx_concurrency: Maximum concurrent MX lookups
         bot_threshold: Bot detection threshold
         
     Returns:
@@ -113,89 +289,97 @@ async def process_csv(
         enable_mx_check=enable_mx_check,
         treat_invalid_as_bots=treat_invalid_as_bots,
         mx_check_timeout=mx_check_timeout,
+        mx_concurrency=mx_concurrency,
         bot_threshold=bot_threshold
     )
     
-    # Read CSV file with memory-safe approach and encoding attempts
-    content = await file.read()
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    df = None
-    
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(io.BytesIO(content), dtype=str, encoding=encoding, on_bad_lines='skip')
-            break
-        except UnicodeDecodeError:
-            continue
+    # Spool the upload to disk in bounded chunks; it is parsed and classified from
+    # there chunk by chunk, so memory does not grow with the file size
+    work_dir = tempfile.mkdtemp(prefix='process-', dir=JOB_DIR)
+    try:
+        upload_path = await spool_upload(file, work_dir)
+        
+        # Large files become background jobs so the request does not outlive proxy timeouts;
+        # the header and credit balance are still checked first so a bad mapping or an
+        # empty balance fails right away
+        if os.path.getsize(upload_path) > INLINE_MAX_BYTES:
+            await run_blocking(check_upload, upload_path, column_mapping)
+            await asyncio.to_thread(check_credits, user_id)
+            job_id = await asyncio.to_thread(
+                job_store.create, user_id, file.filename, work_dir,
+                {"mapping": column_mapping.model_dump(), "options": processing_options.model_dump()}
+            )
+            # The job owns the directory from here on
+            work_dir = None
+            if job_available is not None:
+                job_available.set()
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "job_id": job_id,
+                "state": JOB_QUEUED,
+                "status_url": f"/jobs/{job_id}"
+            })
+        
+        return await process_upload(user_id, file.filename, upload_path, work_dir,
+                                    column_mapping, processing_options)
+    finally:
+        if work_dir is not None:
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+async def process_upload(
+    user_id: str,
+    filename: str,
+    upload_path: str,
+    work_dir: str,
+    column_mapping: ColumnMapping,
+    processing_options: ProcessingOptions,
+    progress: Optional[Callable[[int], None]] = None,
+    executor: Optional[Executor] = None,
+    checkpoint: Optional[Callable[[], Awaitable[None]]] = None
+) -> Dict:
+    """
+    Classify a spooled upload, store its ZIP, record the run and charge credits.
     
-    if df is None:
-        raise HTTPException(status_code=400, detail="Could not read CSV file with any supported encoding")
+    If given, checkpoint is awaited before the ZIP is built, before it is stored and
+    before the run is recorded and charged; it stops processing by raising ClaimLost.
+    """
+    async def step():
+        if checkpoint is not None:
+            await checkpoint()
     
-    # Validate CSV data
-    if df.empty:
+    # Users without credits for every row are turned away before any row is classified
+    rows_to_process = await run_blocking(count_upload_rows, upload_path, column_mapping, executor=executor)
+    if rows_to_process == 0:
         raise HTTPException(status_code=400, detail="CSV file is empty")
+    await asyncio.to_thread(check_credits, user_id, rows_to_process)
     
-    # Check required columns exist
-    required_columns = [column_mapping.email]
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing_columns)}")
+    paths, summary = await run_blocking(
+        detect_upload, upload_path, work_dir, column_mapping, processing_options, progress=progress,
+        executor=executor
+    )
     
-    # Initialize bot detector with options
-    bot_detector = BotDetector(processing_options)
+    # Validate CSV data
+    if summary['total_rows'] == 0:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
     
-    # Check if user has enough credits
-    emails_to_process = len(df)
-    try:
-        # Check credit balance without deducting yet
-        result = supabase_client.table('users').select('credits_balance').eq('id', user_id).execute()
-        current_balance = result.data[0]['credits_balance'] if result.data else 0
-        
-        if current_balance < emails_to_process:
-            raise Exception(f"Insufficient credits. You need {emails_to_process} credits to process this file.")
-            
-    except Exception as e:
-        raise HTTPException(status_code=402, detail=str(e))
-
-    # Process data for bot detection
-    try:
-        clean_df, bots_df, annotated_df, summary = bot_detector.detect_bots(
-            df=df,
-            email_column=column_mapping.email,
-            first_name_column=column_mapping.firstName,
-            last_name_column=column_mapping.lastName
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error during bot detection: {str(e)}")
+    # Check again before charging; the balance may have changed during detection
+    emails_to_process = summary['total_rows']
+    await asyncio.to_thread(check_credits, user_id, emails_to_process)
     
-    # Create ZIP file in memory
-    zip_buffer = io.BytesIO()
+    summary = ProcessingSummary(**summary)
+    await step()
     
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add clean.csv (non-bot rows)
-        clean_csv = clean_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('clean.csv', clean_csv)
-        
-        # Add bots.csv (bot rows only)
-        bots_csv = bots_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('bots.csv', bots_csv)
-        
-        # Add annotated.csv (all rows with BOT and EMAIL_STATUS columns)
-        annotated_csv = annotated_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('annotated.csv', annotated_csv)
-        
-        # Add summary.json
-        summary_json = summary.model_dump_json(indent=2)
-        zip_file.writestr('summary.json', summary_json)
-    
-    zip_buffer.seek(0)
-    zip_data = zip_buffer.getvalue()
+    # Build the ZIP on disk from the result files
+    zip_data = await run_blocking(build_zip, paths, summary, os.path.join(work_dir, 'processed.zip'),
+                                  executor=executor)
     
     # Upload ZIP to Supabase Storage
     try:
+        await step()
+        
         # Generate unique filename
         run_id = str(uuid.uuid4())
-        base_name = file.filename.rsplit('.', 1)[0] if '.' in file.filename else file.filename
+        base_name = filename.rsplit('.', 1)[0] if '.' in filename else filename
         zip_filename = f"{user_id}/{run_id}/{base_name}_processed.zip"
         
         # Upload to storage
@@ -206,13 +390,15 @@ async def process_csv(
             content_type="application/zip"
         )
         
+        await step()
+        
         # Save run to database
         run_id = await supabase_service.save_run_to_database(
             user_id=user_id,
-            filename=file.filename,
+            filename=filename,
             options={
-                "enableMxCheck": enable_mx_check,
-                "treatInvalidAsBots": treat_invalid_as_bots
+                "enableMxCheck": processing_options.enable_mx_check,
+                "treatInvalidAsBots": processing_options.treat_invalid_as_bots
             },
             counts=summary.model_dump(),
             zip_url=zip_url
@@ -228,9 +414,139 @@ async def process_csv(
             "summary": summary.model_dump()
         }
         
+    except ClaimLost:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save results: {str(e)}")
 
+async def keep_claim(job: Dict, processing: asyncio.Task, lost: asyncio.Event):
+    """Renew a job's claim until processing ends, cancelling it if another worker takes the job."""
+    while not processing.done():
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            held = await asyncio.to_thread(job_store.heartbeat, job['id'], job['attempts'])
+        except sqlite3.Error as e:
+            logger.warning("Job %s heartbeat not recorded: %s", job['id'], e)
+            continue
+        if not held:
+            lost.set()
+            processing.cancel()
+            return
+
+async def run_job(job: Dict):
+    """Process a claimed job and record its outcome while this worker still holds the claim."""
+    params = job['params']
+    job_id, attempt = job['id'], job['attempts']
+    
+    def progress(rows_processed: int):
+        try:
+            held = job_store.progress(job_id, attempt, rows_processed)
+        except sqlite3.Error as e:
+            # Progress is informational; a busy queue file must not fail the job
+            logger.warning("Job %s progress not recorded: %s", job_id, e)
+            return
+        if not held:
+            # Stop reading the file; the job belongs to another worker now
+            raise ClaimLost(job_id)
+    
+    async def checkpoint():
+        # Renewing the claim right before each side effect also keeps it from going
+        # stale between the charge and the recorded outcome
+        if not await asyncio.to_thread(job_store.heartbeat, job_id, attempt):
+            raise ClaimLost(job_id)
+    
+    # Threads of an attempt that lost its claim may still be writing; each attempt writes
+    # its results to a directory of its own next to the shared upload
+    attempt_dir = os.path.join(job['work_dir'], f'attempt-{attempt}')
+    os.makedirs(attempt_dir, exist_ok=True)
+    processing = asyncio.create_task(process_upload(
+        job['user_id'], job['filename'], os.path.join(job['work_dir'], 'upload.csv'), attempt_dir,
+        ColumnMapping(**params['mapping']), ProcessingOptions(**params['options']), progress=progress,
+        executor=job_executor, checkpoint=checkpoint
+    ))
+    lost = asyncio.Event()
+    heartbeat = asyncio.create_task(keep_claim(job, processing, lost))
+    try:
+        result = await processing
+        settle = partial(job_store.finish, job_id, attempt, result)
+    except asyncio.CancelledError:
+        if not lost.is_set():
+            # The server is stopping; leave the upload for the next worker
+            try:
+                job_store.release(job_id, attempt)
+            except sqlite3.Error as e:
+                logger.warning("Job %s not released, it is retried once stale: %s", job_id, e)
+            raise
+        settle = None
+    except ClaimLost:
+        settle = None
+    except HTTPException as e:
+        settle = partial(job_store.fail, job_id, attempt, str(e.detail))
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        settle = partial(job_store.fail, job_id, attempt, str(e))
+    finally:
+        heartbeat.cancel()
+    
+    try:
+        settled = settle is not None and await asyncio.to_thread(settle)
+    except sqlite3.Error as e:
+        # The job stays running with its upload in place and is retried once stale
+        logger.error("Job %s outcome not recorded: %s", job_id, e)
+        return
+    if not settled:
+        # Another worker reclaimed the job and owns its directory now
+        logger.warning("Job %s attempt %s lost its claim", job_id, attempt)
+        return
+    await asyncio.to_thread(shutil.rmtree, job['work_dir'], ignore_errors=True)
+
+async def job_worker():
+    """Claim and run queued jobs until the server stops."""
+    while True:
+        job_available.clear()
+        try:
+            job = await asyncio.to_thread(job_store.claim)
+        except Exception:
+            logger.exception("Job queue unavailable")
+            job = None
+        if job is None:
+            # Woken early by uploads to this process; jobs queued by other processes are
+            # picked up on the next poll
+            try:
+                await asyncio.wait_for(job_available.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            await run_job(job)
+        except Exception:
+            # One broken job must not stop this worker; the job is retried once stale
+            logger.exception("Job %s stopped unexpectedly", job['id'])
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user)
+):
+    """Report a processing job's state, rows processed so far and result link."""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None or job['user_id'] != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    response = {
+        "job_id": job['id'],
+        "state": job['state'],
+        "rows_processed": job['rows_processed'],
+        "created_at": datetime.utcfromtimestamp(job['created_at']).isoformat() + 'Z',
+        "updated_at": datetime.utcfromtimestamp(job['updated_at']).isoformat() + 'Z'
+    }
+    if job['state'] == JOB_SUCCEEDED:
+        # success, run_id, zip_url and summary, as an inline /process returns them
+        response.update(job['result'])
+    elif job['state'] == JOB_FAILED:
+        response['error'] = job['error']
+    return response
+
 @app.get("/runs")
 async def get_user_runs(
     user_id: str = Depends(get_current_user),
@@ -369,6 +685,11 @@ async def create_portal_session(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create portal session: {str(e)}")
 
+def write_csv_entry(zip_file: zipfile.ZipFile, name: str, table) -> None:
+    """Stream a DataFrame or row partition into a ZIP entry without building the CSV text in memory."""
+    with io.TextIOWrapper(zip_file.open(name, 'w'), encoding='utf-8', newline='') as handle:
+        table.to_csv(handle, index=False)
+
 def create_zip_response(
     clean_df: pd.DataFrame,
     bots_df: pd.DataFrame,
@@ -381,16 +702,13 @@ def create_zip_response(
     
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         # Add clean.csv (non-bot rows)
-        clean_csv = clean_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('clean.csv', clean_csv)
+        write_csv_entry(zip_file, 'clean.csv', clean_df)
         
         # Add bots.csv (bot rows only)
-        bots_csv = bots_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('bots.csv', bots_csv)
+        write_csv_entry(zip_file, 'bots.csv', bots_df)
         
         # Add annotated.csv (all rows with BOT and EMAIL_STATUS columns)
-        annotated_csv = annotated_df.to_csv(index=False, encoding='utf-8-sig')
-        zip_file.writestr('annotated.csv', annotated_csv)
+        write_csv_entry(zip_file, 'annotated.csv', annotated_df)
         
         # Add summary.json
         summary_json = summary.model_dump_json(indent=2)
@@ -0,0 +1,187 @@
+"""
+String matching structures used by the bot detection rules.
+Patterns are compiled once and shared by every row of a job.
+"""
+
+import fnmatch
+import re
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def load_list_file(path: str) -> List[str]:
+    """Load a newline separated list, skipping blank lines and # comments."""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = line.split('#', 1)[0].strip().lower()
+            if entry:
+                entries.append(entry)
+    return entries
+
+
+class LookupSet:
+    """Exact-match set with one combined regex for wildcard (* and ?) entries."""
+
+    __slots__ = ('exact', 'wildcards', '_wildcard_re')
+
+    def __init__(self, entries: Iterable[str]):
+        exact, wildcards = set(), set()
+        for entry in entries:
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            if '*' in entry or '?' in entry:
+                wildcards.add(entry)
+            else:
+                exact.add(entry)
+        self.exact = frozenset(exact)
+        self.wildcards = tuple(sorted(wildcards))
+        self._wildcard_re = (
+            re.compile('|'.join(fnmatch.translate(w) for w in self.wildcards))
+            if self.wildcards else None
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'LookupSet':
+        """Build a lookup set from a newline separated file."""
+        return cls(load_list_file(path))
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.wildcards)
+
+    def __contains__(self, key: str) -> bool:
+        """Check a key that is already normalized (stripped and lowercased)."""
+        if key in self.exact:
+            return True
+        return self._wildcard_re is not None and self._wildcard_re.match(key) is not None
+
+
+class DomainSuffixSet:
+    """
+    Compact domain list matching a domain or any of its parent domains.
+    
+    Domains are packed into one bytes buffer ordered by hash, with parallel
+    hash and offset arrays, so a 100k entry list costs a few megabytes instead
+    of one Python object per entry. Each suffix at a label boundary is found
+    with a C-level binary search on the hash array and verified against the
+    packed bytes.
+    """
+
+    __slots__ = ('_data', '_hashes', '_offsets')
+
+    def __init__(self, domains: Iterable[str]):
+        unique = {
+            d.strip().strip('.').lower().encode('utf-8') for d in domains if d and d.strip().strip('.')
+        }
+        domains = list(unique)
+        hashes = list(map(hash, domains))
+        order = sorted(range(len(domains)), key=hashes.__getitem__)
+        domains = [domains[i] for i in order]
+        self._data = b''.join(domains)
+        self._hashes = array('q', [hashes[i] for i in order])
+        self._offsets = array('Q', accumulate(map(len, domains), initial=0))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DomainSuffixSet':
+        """Build the set from a newline separated domain list."""
+        return cls(load_list_file(path))
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+
+    def match(self, domain: str) -> Optional[str]:
+        """Return the listed domain that domain equals or is a subdomain of, or None."""
+        key = domain.strip('.').lower().encode('utf-8')
+        while key:
+            if self._find(key):
+                return key.decode('utf-8')
+            dot = key.find(b'.')
+            if dot < 0:
+                return None
+            key = key[dot + 1:]
+        return None
+
+    def _find(self, key: bytes) -> bool:
+        """Look up an exact entry, checking every entry that shares its hash."""
+        hashes, offsets, data = self._hashes, self._offsets, self._data
+        key_hash = hash(key)
+        i = bisect_left(hashes, key_hash)
+        while i < len(hashes) and hashes[i] == key_hash:
+            if data[offsets[i]:offsets[i + 1]] == key:
+                return True
+            i += 1
+        return False
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher finding every pattern in one linear pass."""
+
+    __slots__ = ('_goto', '_fail', '_out', 'patterns')
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[dict] = [{}]
+        self._out: List[Tuple[str, ...]] = [()]
+        self.patterns = frozenset(p.lower() for p in patterns if p)
+
+        # Build the trie, sorted so the automaton is deterministic across runs
+        for pattern in sorted(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (pattern,)
+
+        # Breadth-first pass for failure links, merging outputs along the way
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                state = self._fail[node]
+                while state and ch not in self._goto[state]:
+                    state = self._fail[state]
+                fallback = self._goto[state].get(ch, 0)
+                self._fail[nxt] = fallback if fallback != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'AhoCorasick':
+        """Build a matcher from a newline separated pattern file."""
+        return cls(load_list_file(path))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[str]:
+        """Yield every pattern occurring in text (text must already be lowercased)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                yield from out[state]
+
+    def search(self, text: str) -> bool:
+        """Return True as soon as any pattern is found in text."""
+        for _ in self.iter_matches(text):
+            return True
+        return False
+
+    def find_all(self, text: str) -> List[str]:
+        """Return the distinct patterns found in text, in order of first match end."""
+        return list(dict.fromkeys(self.iter_matches(text)))
@@ -14,6 +14,7 @@ class EmailStatus(str, Enum):
     INVALID_SYNTAX = "invalid_syntax"
     NO_MX = "no_mx"
     UNKNOWN = "unknown"
+    UNCHECKED = "unchecked"
 
 class ColumnMapping(BaseModel):
     """Column mapping configuration for CSV processing."""
@@ -27,6 +28,7 @@ class ProcessingOptions(BaseModel):
     enable_mx_check: bool = Field(True, description="Enable MX record checking")
     treat_invalid_as_bots: bool = Field(True, description="Treat invalid emails as bots")
     mx_check_timeout: float = Field(5.0, description="MX check timeout in seconds")
+    mx_concurrency: int = Field(50, ge=1, description="Maximum concurrent MX lookups")
     bot_threshold: float = Field(1.0, description="Bot detection threshold")
 
 class ProcessingSummary(BaseModel):
@@ -42,6 +44,8 @@ class ProcessingSummary(BaseModel):
     invalid_syntax_emails: int = Field(..., description="Number of emails with invalid syntax")
     no_mx_emails: int = Field(..., description="Number of emails with no MX records")
     unknown_emails: int = Field(..., description="Number of emails with unknown status")
+    unchecked_emails: int = Field(0, description="Number of emails with valid syntax whose MX check was skipped because their verdict was already settled")
+    dedup_ratio: Optional[float] = Field(None, description="Share of rows with email that repeated an earlier (email, names) tuple")
     
     timestamp: str = Field(..., description="Processing timestamp in ISO format")
     processing_options: ProcessingOptions = Field(..., description="Options used for processing")
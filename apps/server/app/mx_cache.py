@@ -0,0 +1,233 @@
+"""
+In-process cache for MX lookups.
+Answers are kept for their record TTL, NXDOMAIN/NoAnswer results for the SOA
+minimum of the zone, and the least recently used domains are evicted first.
+Batches of domains are resolved concurrently with dnspython's async resolver.
+An optional on-disk DomainStatusStore behind the cache shares results between
+worker processes and keeps them across restarts.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+from .domain_store import DomainStatusStore
+
+T = TypeVar('T')
+
+
+def run_sync(coroutine: Awaitable[T]) -> T:
+    """Run a coroutine to completion, in a helper thread if a loop is already running."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def negative_ttl(response) -> Optional[int]:
+    """Return the negative caching TTL of a response from its SOA record (RFC 2308)."""
+    if response is None:
+        return None
+    for rrset in response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+            return min(rrset.ttl, rrset[0].minimum)
+    return None
+
+
+class MXCache:
+    """Size-bounded LRU cache of domain -> has MX records, honoring DNS TTLs."""
+
+    def __init__(self, max_entries: int = 100_000, default_negative_ttl: int = 300,
+                 max_ttl: int = 86_400, resolver: Optional[dns.resolver.Resolver] = None,
+                 async_resolver: Optional[dns.asyncresolver.Resolver] = None,
+                 store: Optional[DomainStatusStore] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.default_negative_ttl = default_negative_ttl
+        self.max_ttl = max_ttl
+        self._resolver = resolver
+        self._async_resolver = async_resolver
+        self.store = store
+        self._clock = clock
+        self._entries: 'OrderedDict[str, Tuple[bool, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store_hits = 0
+
+    @property
+    def resolver(self) -> dns.resolver.Resolver:
+        """The shared resolver, created on first use so importing never reads resolv.conf."""
+        if self._resolver is None:
+            self._resolver = dns.resolver.Resolver()
+        return self._resolver
+
+    @property
+    def async_resolver(self) -> dns.asyncresolver.Resolver:
+        """The shared async resolver used for concurrent batch lookups."""
+        if self._async_resolver is None:
+            self._async_resolver = dns.asyncresolver.Resolver()
+        return self._async_resolver
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, domain: str) -> Optional[bool]:
+        """Return the cached result for a domain, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[domain]
+                return None
+            self._entries.move_to_end(domain)
+            return entry[0]
+
+    def put(self, domain: str, has_mx: bool, ttl: float):
+        """Cache a result for ttl seconds, evicting the least recently used domains."""
+        if ttl <= 0:
+            return
+        expires_at = self._clock() + min(ttl, self.max_ttl)
+        with self._lock:
+            self._entries[domain] = (has_mx, expires_at)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def has_mx(self, domain: str, timeout: Optional[float] = None) -> bool:
+        """Check if domain has MX records, resolving only on a cache miss."""
+        domain = domain.lower()
+        cached = self._cached(domain)
+        if cached is None:
+            cached = self._load([domain]).get(domain)
+        if cached is not None:
+            return cached
+
+        try:
+            result = self._answer_result(self.resolver.resolve(domain, 'MX', lifetime=timeout))
+        except Exception as e:
+            result = self._failure_result(e)
+        self._remember({domain: result})
+        return result[0]
+
+    def resolve_many(self, domains: Iterable[str], timeout: Optional[float] = None,
+                     concurrency: int = 50) -> Dict[str, bool]:
+        """
+        Check many domains at once, returning a domain -> has MX map.
+        
+        Each distinct domain is looked up once; cache misses are resolved
+        concurrently with at most `concurrency` queries in flight, so wall-clock
+        time scales with unique domains / concurrency rather than row count.
+        """
+        results = {}
+        pending = []
+        for domain in dict.fromkeys(d.lower() for d in domains):
+            cached = self._cached(domain)
+            if cached is None:
+                pending.append(domain)
+            else:
+                results[domain] = cached
+        if pending:
+            stored = self._load(pending)
+            results.update(stored)
+            pending = [domain for domain in pending if domain not in stored]
+        if pending:
+            results.update(run_sync(self.resolve_async(pending, timeout, concurrency)))
+        return results
+
+    async def resolve_async(self, domains: Iterable[str], timeout: Optional[float] = None,
+                            concurrency: int = 50) -> Dict[str, bool]:
+        """Resolve domains concurrently under a bounded number of in-flight queries."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        resolver = self.async_resolver
+
+        async def lookup(domain: str) -> Tuple[bool, Optional[float]]:
+            async with semaphore:
+                try:
+                    return self._answer_result(await resolver.resolve(domain, 'MX', lifetime=timeout))
+                except Exception as e:
+                    return self._failure_result(e)
+
+        domains = list(domains)
+        results = dict(zip(domains, await asyncio.gather(*(lookup(domain) for domain in domains))))
+        self._remember(results)
+        return {domain: has_mx for domain, (has_mx, _) in results.items()}
+
+    def _cached(self, domain: str) -> Optional[bool]:
+        """Look up a normalized domain and count the hit or miss."""
+        cached = self.get(domain)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return cached
+
+    def _load(self, domains: List[str]) -> Dict[str, bool]:
+        """Fill the memory cache from the on-disk store, returning the domains found there."""
+        if self.store is None:
+            return {}
+        found = self.store.get_many(domains)
+        for domain, (has_mx, ttl) in found.items():
+            self.put(domain, has_mx, ttl)
+        with self._lock:
+            self.store_hits += len(found)
+        return {domain: has_mx for domain, (has_mx, _) in found.items()}
+
+    def _remember(self, results: Dict[str, Tuple[bool, Optional[float]]]):
+        """Cache fresh lookups in memory and write them through to the on-disk store."""
+        cacheable = [(domain, has_mx, ttl) for domain, (has_mx, ttl) in results.items() if ttl is not None]
+        for domain, has_mx, ttl in cacheable:
+            self.put(domain, has_mx, ttl)
+        if self.store is not None:
+            self.store.put_many((domain, has_mx, min(ttl, self.max_ttl)) for domain, has_mx, ttl in cacheable)
+
+    @staticmethod
+    def _answer_result(answer) -> Tuple[bool, Optional[float]]:
+        """Return (has MX, record TTL) for a successful MX answer."""
+        return len(answer) > 0, answer.rrset.ttl
+
+    def _failure_result(self, error: Exception) -> Tuple[bool, Optional[float]]:
+        """Return (False, SOA minimum) for NXDOMAIN/NoAnswer; transient failures get no TTL."""
+        if isinstance(error, dns.resolver.NXDOMAIN):
+            ttl = negative_ttl(error.response(error.qnames()[0])) if error.qnames() else None
+        elif isinstance(error, dns.resolver.NoAnswer):
+            ttl = negative_ttl(error.kwargs.get('response'))
+        else:
+            # Timeouts, SERVFAIL and other errors may succeed on a later lookup
+            return False, None
+        return False, self.default_negative_ttl if ttl is None else ttl
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters."""
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'store_hits': self.store_hits,
+        }
+
+    def clear(self):
+        """Drop every cached entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.store_hits = 0
+
+
+# Shared by every detector in the process so domains stay cached across jobs; with
+# DOMAIN_CACHE_PATH set, results are also shared by every worker on the node
+default_mx_cache = MXCache(store=DomainStatusStore.from_env())
@@ -0,0 +1,249 @@
+"""
+Parallel batch scoring across a pool of worker processes.
+The email and name columns are packed once into a shared memory block of UTF-8
+bytes and offsets that every worker maps directly, and each worker writes its
+status codes, scores and verdicts into a shared result block, so rows are never
+pickled in either direction. Workers stay up between jobs and keep their
+compiled detectors, so only the first job with given settings pays for setup.
+"""
+
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bot_rules import BotDetector, BotDetectionConfig
+
+# Every setting of a BotDetectionConfig as sorted (name, value) pairs
+ConfigSnapshot = Tuple[Tuple[str, object], ...]
+
+# Detectors kept per worker, one per distinct configuration
+_MAX_WORKER_DETECTORS = 8
+_worker_detectors: 'OrderedDict[ConfigSnapshot, BotDetector]' = OrderedDict()
+
+# (offsets position, missing mask position, data position, data length) of each column
+ColumnLayout = Optional[Tuple[int, int, int, int]]
+
+
+def _aligned(position: int) -> int:
+    return (position + 7) & ~7
+
+
+class SharedColumns:
+    """Optional string columns packed into one shared memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, size: int, layout: Tuple[ColumnLayout, ...]):
+        self.shm = shm
+        self.size = size
+        self.layout = layout
+
+    @classmethod
+    def create(cls, columns: Sequence[Optional[Sequence[Optional[str]]]]) -> 'SharedColumns':
+        """Pack aligned columns (None for an absent column); non-string cells read back as None."""
+        size = max((len(values) for values in columns if values is not None), default=0)
+        packed = []
+        position = 0
+        layout: List[ColumnLayout] = []
+        for values in columns:
+            if values is None:
+                layout.append(None)
+                continue
+            missing = np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=size)
+            parts = [v.encode('utf-8', 'surrogatepass') if isinstance(v, str) else b'' for v in values]
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, parts), dtype=np.int64, count=size), out=offsets[1:])
+            data = b''.join(parts)
+            offsets_at = _aligned(position)
+            missing_at = offsets_at + offsets.nbytes
+            data_at = missing_at + missing.nbytes
+            position = data_at + len(data)
+            layout.append((offsets_at, missing_at, data_at, len(data)))
+            packed.append((offsets, missing, data))
+
+        shm = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        for (offsets, missing, data), (offsets_at, missing_at, data_at, _) in zip(
+                packed, (entry for entry in layout if entry is not None)):
+            shm.buf[offsets_at:missing_at] = offsets.tobytes()
+            shm.buf[missing_at:data_at] = missing.tobytes()
+            shm.buf[data_at:data_at + len(data)] = data
+        return cls(shm, size, tuple(layout))
+
+    @property
+    def handle(self) -> Tuple[str, int, Tuple[ColumnLayout, ...]]:
+        """Picklable reference that workers pass to attach."""
+        return self.shm.name, self.size, self.layout
+
+    @classmethod
+    def attach(cls, handle: Tuple[str, int, Tuple[ColumnLayout, ...]]) -> 'SharedColumns':
+        name, size, layout = handle
+        return cls(shared_memory.SharedMemory(name=name), size, layout)
+
+    def read(self, column: int, start: int, stop: int) -> Optional[List[Optional[str]]]:
+        """Decode rows [start, stop) of a column, or None if the column is absent."""
+        entry = self.layout[column]
+        if entry is None:
+            return None
+        offsets_at, missing_at, data_at, _ = entry
+        buf = self.shm.buf
+        offsets = np.frombuffer(buf, dtype=np.int64, count=stop - start + 1, offset=offsets_at + 8 * start).tolist()
+        missing = np.frombuffer(buf, dtype=bool, count=stop - start, offset=missing_at + start).tolist()
+        data = bytes(buf[data_at + offsets[0]:data_at + offsets[-1]])
+        base = offsets[0]
+        return [
+            None if absent else data[begin - base:end - base].decode('utf-8', 'surrogatepass')
+            for begin, end, absent in zip(offsets, offsets[1:], missing)
+        ]
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        """Release the block; only the creating process should call this."""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _result_arrays(buf, size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Map (float scores, int8 status codes, boolean verdicts) onto a result block."""
+    scores = np.frombuffer(buf, dtype=np.float64, count=size)
+    status_codes = np.frombuffer(buf, dtype=np.int8, count=size, offset=8 * size)
+    verdicts = np.frombuffer(buf, dtype=bool, count=size, offset=9 * size)
+    return status_codes, scores, verdicts
+
+
+def _result_block_size(size: int) -> int:
+    return max(10 * size, 1)
+
+
+def _write_results(buf, size: int, start: int, stop: int, chunk: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+    # The views into the block are released on return, so it can be closed afterwards
+    for target, values in zip(_result_arrays(buf, size), chunk):
+        target[start:stop] = values
+
+
+def config_snapshot(config: BotDetectionConfig) -> ConfigSnapshot:
+    """
+    Capture every setting of a config, whether set on the instance, a subclass or the class.
+
+    Pickling the config itself would carry only its instance attributes, so a
+    spawned worker would fall back to its own class defaults for the rest.
+    """
+    return tuple((name, getattr(config, name)) for name in dir(config) if name.isupper())
+
+
+def _worker_detector(snapshot: ConfigSnapshot) -> BotDetector:
+    """Return this worker's detector for a configuration snapshot, building it on first use."""
+    detector = _worker_detectors.get(snapshot)
+    if detector is None:
+        config = BotDetectionConfig()
+        for name, value in snapshot:
+            setattr(config, name, value)
+        detector = _worker_detectors[snapshot] = BotDetector(config)
+        while len(_worker_detectors) > _MAX_WORKER_DETECTORS:
+            _worker_detectors.popitem(last=False)
+    _worker_detectors.move_to_end(snapshot)
+    return detector
+
+
+def _score_chunk(snapshot: ConfigSnapshot, columns_handle, results_name: str, start: int, stop: int):
+    """Score rows [start, stop) of the shared columns into the shared result block."""
+    detector = _worker_detector(snapshot)
+    columns = SharedColumns.attach(columns_handle)
+    results = shared_memory.SharedMemory(name=results_name)
+    try:
+        emails, first_names, last_names = (columns.read(i, start, stop) for i in range(3))
+        chunk = detector.score_batch(emails, first_names, last_names, deduplicate=False)
+        _write_results(results.buf, columns.size, start, stop, chunk)
+    finally:
+        columns.close()
+        results.close()
+
+
+class ParallelScorer:
+    """Process pool that scores large batches in chunks with the results of BotDetector.score_batch."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 50_000, min_rows: int = 20_000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Smaller batches are scored in-process; the hand-off would cost more than it saves
+        self.min_rows = min_rows
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use and kept warm between batches."""
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads or event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def score_batch(self, detector: BotDetector, emails: Sequence[Optional[str]],
+                    first_names: Optional[Sequence[Optional[str]]] = None,
+                    last_names: Optional[Sequence[Optional[str]]] = None,
+                    deduplicate: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score a batch with detector's configuration across the worker pool.
+
+        Returns the same (int8 status codes, float scores, boolean verdicts) as
+        detector.score_batch, in input order.
+        """
+        emails = list(emails)
+        first_names = list(first_names) if first_names is not None else None
+        last_names = list(last_names) if last_names is not None else None
+        if deduplicate:
+            codes, first_rows = detector.group_rows(emails, first_names, last_names)
+
+            def pick(values):
+                return [values[i] for i in first_rows] if values is not None else None
+
+            status_codes, scores, verdicts = self.score_batch(
+                detector, pick(emails), pick(first_names), pick(last_names), deduplicate=False
+            )
+            return status_codes[codes], scores[codes], verdicts[codes]
+
+        size = len(emails)
+        if self.workers < 2 or size < self.min_rows:
+            return detector.score_batch(emails, first_names, last_names, deduplicate=False)
+
+        # At least one chunk per worker, but never more than chunk_size rows per task
+        chunk_size = min(self.chunk_size, -(-size // self.workers))
+        snapshot = config_snapshot(detector.config)
+        columns = results = None
+        try:
+            columns = SharedColumns.create([emails, first_names, last_names])
+            results = shared_memory.SharedMemory(create=True, size=_result_block_size(size))
+            futures = []
+            try:
+                for start in range(0, size, chunk_size):
+                    futures.append(self.executor.submit(_score_chunk, snapshot, columns.handle, results.name,
+                                                        start, min(start + chunk_size, size)))
+                for future in futures:
+                    future.result()
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool on the next batch
+                self.shutdown(wait=False)
+                raise
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            return tuple(array.copy() for array in _result_arrays(results.buf, size))
+        finally:
+            if columns is not None:
+                columns.unlink()
+            if results is not None:
+                results.close()
+                results.unlink()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,172 @@
+"""
+Staged batch scoring that overlaps CPU-bound rules with DNS lookups.
+Chunks flow through three stages connected by bounded queues: a scoring
+thread parses, validates and scores each chunk offline, a resolver thread
+looks up the MX records its undecided domains need, and the caller settles
+and writes the results. While chunk N's domains are resolving, chunk N+1 is
+already being scored, so a job takes about max(DNS time, CPU time).
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bot_rules import BotDetector, PendingBatch
+
+Chunk = Tuple[Sequence[Optional[str]], Optional[Sequence[Optional[str]]], Optional[Sequence[Optional[str]]]]
+ChunkResult = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Marks the end of the chunk stream on a queue
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised in a stage to the caller."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ScoringPipeline:
+    """Score a stream of chunks with BotDetector.score_batch results, overlapping scoring and DNS."""
+
+    def __init__(self, detector: BotDetector, chunk_size: int = 10_000, depth: int = 2):
+        self.detector = detector
+        self.chunk_size = chunk_size
+        # Chunks allowed to wait at each hand-off; bounds memory to a few chunks in flight
+        self.depth = depth
+
+    def run(self, chunks: Iterable[Chunk], deduplicate: bool = True) -> Iterator[ChunkResult]:
+        """
+        Yield (int8 status codes, float scores, boolean verdicts) for each
+        (emails, first names, last names) chunk, in input order.
+
+        The chunks iterable is consumed on the scoring thread, so a parser
+        behind it runs in that stage too.
+        """
+        stop = threading.Event()
+        prepared: queue.Queue = queue.Queue(self.depth)
+        resolved: queue.Queue = queue.Queue(self.depth)
+
+        def put(stage_queue: queue.Queue, item) -> bool:
+            # Give up once the caller has stopped reading, rather than block forever
+            while not stop.is_set():
+                try:
+                    stage_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def score_stage():
+            try:
+                for emails, first_names, last_names in chunks:
+                    if not put(prepared, self._prepare(emails, first_names, last_names, deduplicate)):
+                        return
+            except BaseException as e:
+                put(prepared, _Failure(e))
+                return
+            put(prepared, _DONE)
+
+        def resolve_stage():
+            # Up to `depth` chunks resolve at once so one slow lookup does not hold back
+            # the chunks behind it; answers are still forwarded in chunk order
+            in_flight: deque = deque()
+            end = None
+            with ThreadPoolExecutor(max_workers=self.depth) as lookups:
+                while True:
+                    while in_flight and (end is not None or len(in_flight) >= self.depth
+                                         or in_flight[0][2].done()):
+                        codes, batch, lookup = in_flight.popleft()
+                        try:
+                            mx_results = lookup.result()
+                        except BaseException as e:
+                            put(resolved, _Failure(e))
+                            return
+                        if not put(resolved, (codes, batch, mx_results)):
+                            return
+                    if end is not None:
+                        put(resolved, end)
+                        return
+                    try:
+                        item = prepared.get(timeout=0.05)
+                    except queue.Empty:
+                        if stop.is_set():
+                            return
+                        continue
+                    if item is _DONE or isinstance(item, _Failure):
+                        end = item
+                    else:
+                        codes, batch = item
+                        in_flight.append((codes, batch, lookups.submit(self._resolve, batch)))
+
+        threads = [
+            threading.Thread(target=score_stage, name='scoring-pipeline-score', daemon=True),
+            threading.Thread(target=resolve_stage, name='scoring-pipeline-resolve', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = resolved.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                codes, batch, mx_results = item
+                status_codes, scores, verdicts = self.detector.complete_batch(batch, mx_results)
+                if codes is not None:
+                    status_codes, scores, verdicts = status_codes[codes], scores[codes], verdicts[codes]
+                yield status_codes, scores, verdicts
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _resolve(self, batch: PendingBatch) -> Dict[str, bool]:
+        return self.detector.resolve_mx(batch.mx_domains) if batch.to_resolve else {}
+
+    def score_batch(self, emails: Sequence[Optional[str]],
+                    first_names: Optional[Sequence[Optional[str]]] = None,
+                    last_names: Optional[Sequence[Optional[str]]] = None,
+                    deduplicate: bool = True) -> ChunkResult:
+        """Score in-memory columns in chunk_size pieces through the pipeline."""
+        emails = list(emails)
+        results = list(self.run(self._split(emails, first_names, last_names), deduplicate))
+        if not results:
+            return self.detector.score_batch([], deduplicate=False)
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def _prepare(self, emails: Sequence[Optional[str]], first_names: Optional[Sequence[Optional[str]]],
+                 last_names: Optional[Sequence[Optional[str]]], deduplicate: bool):
+        """Score one chunk offline, classifying duplicate rows once when asked to."""
+        emails = list(emails)
+        first_names = list(first_names) if first_names is not None else None
+        last_names = list(last_names) if last_names is not None else None
+        codes = None
+        if deduplicate:
+            codes, first_rows = self.detector.group_rows(emails, first_names, last_names)
+
+            def pick(values):
+                return [values[i] for i in first_rows] if values is not None else None
+
+            emails, first_names, last_names = pick(emails), pick(first_names), pick(last_names)
+        return codes, self.detector.prepare_batch(emails, first_names, last_names)
+
+    def _split(self, emails: List[Optional[str]], first_names: Optional[Sequence[Optional[str]]],
+               last_names: Optional[Sequence[Optional[str]]]) -> Iterator[Chunk]:
+        first_names = list(first_names) if first_names is not None else None
+        last_names = list(last_names) if last_names is not None else None
+        for start in range(0, len(emails), self.chunk_size):
+            window = slice(start, start + self.chunk_size)
+            yield (
+                emails[window],
+                first_names[window] if first_names is not None else None,
+                last_names[window] if last_names is not None else None,
+            )
@@ -11,8 +11,8 @@ from datetime import datetime
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
-from bot_rules import BotDetector, BotDetectionConfig
-from models import ProcessingOptions
+from app.bot_rules import BotDetector, BotDetectionConfig
+from app.models import ProcessingOptions
 
 def demo_basic_email_verification():
     """Demonstrate basic email verification functionality."""
@@ -0,0 +1,323 @@
+"""
+Unit tests for bot_detection.py module.
+Tests CSV-level detection: deduplication, detector reuse, result partitions,
+status columns and summaries, and streamed processing.
+"""
+
+import dataclasses
+import io
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+import app.bot_detection as bot_detection
+from app.bot_detection import (
+    BOT_DTYPE, EMAIL_STATUS_DTYPE, BotDetector, DetectionSettings, RowPartition, get_rules_detector
+)
+from app.models import EmailStatus, ProcessingOptions
+from app.parallel import ParallelScorer
+
+
+# MX lookups are disabled so tests never touch the network
+OFFLINE = ProcessingOptions(enable_mx_check=False)
+
+
+def sample_frame():
+    """Rows with duplicates that differ only in letter case, names, and missing emails."""
+    return pd.DataFrame({
+        'email': ['John.Doe@gmail.com', 'bot@mailinator.com', 'john.doe@gmail.com', None,
+                  'bot@mailinator.com', 'not-an-email', '  ', 'john.doe@gmail.com', 'BOT@mailinator.com'],
+        'first': ['John', None, 'John', 'Ann', None, 'X', None, 'Johnny5', None],
+        'last': ['Doe', None, 'Doe', 'Lee', None, None, None, None, None],
+        'plan': ['pro', 'free', 'pro', 'free', 'free', 'pro', 'free', 'pro', 'free'],
+    }, dtype=str)
+
+
+class TestDeduplication(unittest.TestCase):
+    """Test that duplicate rows are classified once and scattered back to every row."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.detector = BotDetector(OFFLINE)
+        self.df = sample_frame()
+
+    def expected_columns(self, df):
+        """Classify every row on its own, without deduplication."""
+        bots, statuses = [], []
+        for email, first, last in zip(df['email'], df['first'], df['last']):
+            if not isinstance(email, str) or not email.strip():
+                bots.append('UNKNOWN')
+                statuses.append('unknown')
+                continue
+            analysis = self.detector.analyze(email, first if isinstance(first, str) else None,
+                                             last if isinstance(last, str) else None)
+            bots.append('TRUE' if analysis.is_bot else 'FALSE')
+            statuses.append(analysis.status)
+        return bots, statuses
+
+    def test_duplicates_match_row_by_row(self):
+        """Test that every row gets the result it would get if classified alone."""
+        bots, statuses = self.expected_columns(self.df)
+        for vectorized in (True, False):
+            with self.subTest(vectorized=vectorized):
+                _, _, annotated, _ = self.detector.detect_bots(self.df, 'email', 'first', 'last',
+                                                               vectorized=vectorized)
+                self.assertEqual(annotated['BOT'].astype(str).tolist(), bots)
+                self.assertEqual(annotated['EMAIL_STATUS'].astype(str).tolist(), statuses)
+
+    def test_dedup_ratio(self):
+        """Test that dedup_ratio counts rows that repeat an earlier (email, names) tuple."""
+        _, _, _, summary = self.detector.detect_bots(self.df, 'email', 'first', 'last')
+        # 7 rows with email; John.Doe/john.doe with the same names and the three mailinator
+        # rows collapse, leaving 4 distinct tuples
+        self.assertEqual(summary['rows_with_email'], 7)
+        self.assertEqual(summary['dedup_ratio'], round(1 - 4 / 7, 4))
+
+    def test_input_and_order_preserved(self):
+        """Test that the annotated frame keeps the input rows, order and columns."""
+        _, _, annotated, _ = self.detector.detect_bots(self.df, 'email', 'first', 'last')
+        pd.testing.assert_frame_equal(annotated[list(self.df.columns)], self.df)
+        self.assertEqual(list(annotated.columns), list(self.df.columns) + ['BOT', 'EMAIL_STATUS'])
+
+
+class TestDetectorReuse(unittest.TestCase):
+    """Test that requests with the same options share one rules detector."""
+
+    def test_settings_from_options(self):
+        """Test that settings snapshot the options and build the matching config."""
+        options = ProcessingOptions(enable_mx_check=False, treat_invalid_as_bots=False, bot_threshold=1.5)
+        settings = DetectionSettings.from_options(options)
+        self.assertEqual(settings, DetectionSettings.from_options(options.model_copy()))
+        self.assertEqual(hash(settings), hash(DetectionSettings.from_options(options.model_copy())))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.bot_threshold = 2.0
+
+        config = settings.to_config()
+        self.assertFalse(config.ENABLE_MX_CHECK)
+        self.assertFalse(config.TREAT_INVALID_AS_BOTS)
+        self.assertEqual(config.BOT_THRESHOLD, 1.5)
+        self.assertEqual(config.MX_CONCURRENCY, options.mx_concurrency)
+
+    def test_detectors_shared_per_settings(self):
+        """Test that equal options reuse a detector and different options get their own."""
+        first = BotDetector(ProcessingOptions(enable_mx_check=False))
+        second = BotDetector(ProcessingOptions(enable_mx_check=False))
+        stricter = BotDetector(ProcessingOptions(enable_mx_check=False, bot_threshold=0.5))
+
+        self.assertIs(first.bot_rules_detector, second.bot_rules_detector)
+        self.assertIsNot(first.bot_rules_detector, stricter.bot_rules_detector)
+        self.assertIs(get_rules_detector(first.settings), first.bot_rules_detector)
+        self.assertEqual(stricter.bot_rules_detector.config.BOT_THRESHOLD, 0.5)
+        self.assertEqual(first.bot_rules_detector.config.BOT_THRESHOLD, 1.0)
+
+    def test_list_files_from_server_settings(self):
+        """Test that the server's pattern files reach the config and select their own detector."""
+        with tempfile.TemporaryDirectory() as directory:
+            list_files = {}
+            for field, entries in (('bot_localparts_file', 'zzqcrawler'),
+                                   ('disposable_domains_file', 'throwaway-inbox.com'),
+                                   ('role_accounts_file', 'billing')):
+                list_files[field] = os.path.join(directory, f'{field}.txt')
+                with open(list_files[field], 'w', encoding='utf-8') as handle:
+                    handle.write(entries + '\n')
+
+            with patch.dict(bot_detection.LIST_FILES, list_files):
+                settings = DetectionSettings.from_options(OFFLINE)
+                detector = BotDetector(OFFLINE)
+            self.assertEqual(settings.disposable_domains_file, list_files['disposable_domains_file'])
+            self.assertNotEqual(settings, DetectionSettings.from_options(OFFLINE))
+            self.assertIsNot(detector.bot_rules_detector, BotDetector(OFFLINE).bot_rules_detector)
+
+            config = detector.bot_rules_detector.config
+            self.assertEqual(config.BOT_LOCALPARTS_FILE, list_files['bot_localparts_file'])
+            self.assertEqual(config.ROLE_ACCOUNTS_FILE, list_files['role_accounts_file'])
+            self.assertIn('zzqcrawler', detector.bot_rules_detector.bot_localparts)
+            self.assertIn('billing', detector.bot_rules_detector.role_localparts)
+            self.assertTrue(detector.is_bot_email('jane@throwaway-inbox.com'))
+            self.assertFalse(BotDetector(OFFLINE).is_bot_email('jane@throwaway-inbox.com'))
+
+
+class TestRowPartition(unittest.TestCase):
+    """Test the clean and bot row partitions returned by detect_bots."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.detector = BotDetector(OFFLINE)
+        self.df = sample_frame()
+
+    def test_partitions_split_annotated_rows(self):
+        """Test that clean and bot rows partition the annotated frame by the BOT column."""
+        clean, bots, annotated, summary = self.detector.detect_bots(self.df, 'email', 'first', 'last')
+        is_bot = (annotated['BOT'] == 'TRUE').to_numpy()
+
+        self.assertIsInstance(clean, RowPartition)
+        pd.testing.assert_frame_equal(clean.to_frame(), annotated[~is_bot])
+        pd.testing.assert_frame_equal(bots.to_frame(), annotated[is_bot])
+        self.assertEqual((len(clean), len(bots)), (summary['clean_count'], summary['bots_count']))
+        self.assertEqual(list(clean.columns), list(annotated.columns))
+
+        frames = self.detector.detect_bots(self.df, 'email', 'first', 'last', as_frames=True)
+        self.assertIsInstance(frames[0], pd.DataFrame)
+        pd.testing.assert_frame_equal(frames[1], bots.to_frame())
+
+    def test_to_csv_matches_dataframe(self):
+        """Test that chunked writes produce the DataFrame's CSV whatever the chunk size."""
+        frame = pd.DataFrame({'email': [f'user{i}@example.com' for i in range(10)], 'n': range(10)})
+        rows = RowPartition(frame, np.array([8, 1, 3, 4, 9]))
+        expected = frame.take(rows.rows).to_csv(index=False)
+        for chunk_rows in (1, 2, 5, 100):
+            with self.subTest(chunk_rows=chunk_rows):
+                self.assertEqual(rows.to_csv(index=False, chunk_rows=chunk_rows), expected)
+                buffer = io.StringIO()
+                self.assertIsNone(rows.to_csv(buffer, index=False, chunk_rows=chunk_rows))
+                self.assertEqual(buffer.getvalue(), expected)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rows.csv')
+            rows.to_csv(path, index=False, chunk_rows=2)
+            with open(path, encoding='utf-8', newline='') as handle:
+                self.assertEqual(handle.read(), expected)
+
+    def test_empty_partition(self):
+        """Test that an empty partition writes just the header."""
+        frame = pd.DataFrame({'email': ['a@b.com'], 'BOT': ['FALSE']})
+        rows = RowPartition(frame, np.array([], dtype=np.int64))
+        self.assertTrue(rows.empty)
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(rows.to_csv(index=False), frame.iloc[:0].to_csv(index=False))
+
+
+class TestStatusColumns(unittest.TestCase):
+    """Test the Categorical BOT and EMAIL_STATUS columns and the summary counted from them."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.detector = BotDetector(OFFLINE)
+        self.df = sample_frame()
+
+    def test_categorical_columns(self):
+        """Test that both columns are int8-backed Categoricals over the model enums."""
+        _, _, annotated, _ = self.detector.detect_bots(self.df, 'email', 'first', 'last')
+        self.assertEqual(annotated['BOT'].dtype, BOT_DTYPE)
+        self.assertEqual(annotated['EMAIL_STATUS'].dtype, EMAIL_STATUS_DTYPE)
+        self.assertEqual(annotated['BOT'].cat.codes.dtype, np.int8)
+        self.assertEqual(annotated['EMAIL_STATUS'].cat.codes.dtype, np.int8)
+        # Rows without an email are neither bots nor clean
+        self.assertEqual(annotated['BOT'].astype(str).tolist()[3], 'UNKNOWN')
+        self.assertEqual(annotated['EMAIL_STATUS'].astype(str).tolist()[6], 'unknown')
+        # Categoricals write the same CSV as the plain strings
+        plain = annotated.astype({'BOT': object, 'EMAIL_STATUS': object})
+        self.assertEqual(annotated.to_csv(index=False), plain.to_csv(index=False))
+
+    def test_summary_counts(self):
+        """Test that the summary's status counts match the EMAIL_STATUS column."""
+        _, _, annotated, summary = self.detector.detect_bots(self.df, 'email', 'first', 'last')
+        counts = annotated['EMAIL_STATUS'].value_counts()
+        for status in EmailStatus:
+            with self.subTest(status=status.value):
+                self.assertEqual(summary[f'{status.value}_emails'], counts[status.value])
+        self.assertEqual(summary['total_rows'], len(self.df))
+        self.assertEqual(summary['rows_without_email'], 2)
+        self.assertEqual(summary['bots_count'], int((annotated['BOT'] == 'TRUE').sum()))
+        self.assertEqual(summary['clean_count'], len(self.df) - summary['bots_count'])
+        self.assertEqual(sum(summary[f'{status.value}_emails'] for status in EmailStatus), len(self.df))
+
+
+class TestStreamedDetection(unittest.TestCase):
+    """Test that chunked CSV detection writes what in-memory detection returns."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.detector = BotDetector(OFFLINE)
+        self.csv = sample_frame().to_csv(index=False)
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.output_dir)
+
+    def read_outputs(self, paths):
+        """Return the content of each output file by name."""
+        contents = {}
+        for name, path in paths.items():
+            with open(path, encoding='utf-8', newline='') as handle:
+                contents[name] = handle.read()
+        return contents
+
+    def test_chunks_match_in_memory(self):
+        """Test that every chunk size writes the in-memory results with one header per file."""
+        df = pd.read_csv(io.StringIO(self.csv), dtype=str)
+        clean, bots, annotated, summary = self.detector.detect_bots(df, 'email', 'first', 'last')
+        expected = {'clean.csv': clean.to_csv(index=False), 'bots.csv': bots.to_csv(index=False),
+                    'annotated.csv': annotated.to_csv(index=False)}
+
+        for chunk_rows in (1, 2, 4, 100):
+            with self.subTest(chunk_rows=chunk_rows):
+                paths, streamed = self.detector.detect_bots_csv(
+                    io.StringIO(self.csv), 'email', self.output_dir, 'first', 'last',
+                    chunk_rows=chunk_rows, dtype=str
+                )
+                self.assertEqual(self.read_outputs(paths), expected)
+                # Duplicates are only collapsed within a chunk
+                for key in summary:
+                    if key not in ('dedup_ratio', 'timestamp'):
+                        self.assertEqual(streamed[key], summary[key], key)
+
+    def test_workers_score_chunks_in_parallel(self):
+        """Test that chunks scored across worker processes write the single-process results."""
+        paths, summary = self.detector.detect_bots_csv(io.StringIO(self.csv), 'email', self.output_dir,
+                                                       'first', 'last', chunk_rows=4, dtype=str)
+        expected = self.read_outputs(paths)
+
+        scorer = ParallelScorer(workers=2, chunk_size=2, min_rows=0)
+        self.addCleanup(scorer.shutdown)
+        with patch.object(bot_detection, 'get_parallel_scorer', return_value=scorer) as get_scorer, \
+                patch.object(scorer, 'score_batch', wraps=scorer.score_batch) as score_batch:
+            paths, streamed = self.detector.detect_bots_csv(io.StringIO(self.csv), 'email', self.output_dir,
+                                                            'first', 'last', chunk_rows=4, workers=2, dtype=str)
+        get_scorer.assert_called_once_with(2)
+        self.assertEqual(score_batch.call_count, 3)
+        self.assertEqual(self.read_outputs(paths), expected)
+        summary.pop('timestamp')
+        streamed.pop('timestamp')
+        self.assertEqual(streamed, summary)
+
+    def test_progress_reports_rows_written(self):
+        """Test that progress is called after each chunk with the running row count."""
+        calls = []
+        self.detector.detect_bots_csv(io.StringIO(self.csv), 'email', self.output_dir, 'first', 'last',
+                                      chunk_rows=4, progress=calls.append, dtype=str)
+        self.assertEqual(calls, [4, 8, 9])
+
+    def test_missing_email_column(self):
+        """Test that a missing email column raises ValueError."""
+        with self.assertRaises(ValueError):
+            self.detector.detect_bots_csv(io.StringIO(self.csv), 'mail', self.output_dir, chunk_rows=4, dtype=str)
+
+
+if __name__ == '__main__':
+    # Create test suite
+    test_suite = unittest.TestSuite()
+    
+    # Add test classes
+    test_suite.addTest(unittest.makeSuite(TestDeduplication))
+    test_suite.addTest(unittest.makeSuite(TestDetectorReuse))
+    test_suite.addTest(unittest.makeSuite(TestRowPartition))
+    test_suite.addTest(unittest.makeSuite(TestStatusColumns))
+    test_suite.addTest(unittest.makeSuite(TestStreamedDetection))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(test_suite)
+    
+    # Exit with appropriate code
+    sys.exit(not result.wasSuccessful())
@@ -3,6 +3,11 @@ Unit tests for bot_rules.py module.
 Tests all bot detection methods, scoring logic, and edge cases.
 """
 
+import asyncio
+import random
+import string
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch
 import sys
@@ -11,7 +16,21 @@ import os
 # Add the app directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app.bot_rules import BotDetector, BotDetectionConfig
+import dns.message
+import dns.name
+import dns.rcode
+import dns.resolver
+import dns.rrset
+from email_validator import validate_email, EmailNotValidError
+
+from app.bot_rules import (
+    BotDetector, BotDetectionConfig, EmailAnalysis, EMAIL_STATUSES, extract_local_part_features
+)
+from app.email_syntax import ascii_normalize, normalize_email
+from app.matchers import AhoCorasick, DomainSuffixSet, LookupSet
+from app.domain_store import DomainStatusStore
+from app.mx_cache import MXCache
+from app.pipeline import ScoringPipeline
 
 
 class TestBotDetectionConfig(unittest.TestCase):
@@ -247,6 +266,791 @@ class TestBotDetector(unittest.TestCase):
         self.assertAlmostEqual(details['score'], self.detector.config.ROLE_ACCOUNT_WEIGHT, places=1)
 
 
+class TestAhoCorasick(unittest.TestCase):
+    """Test the multi-pattern indicator matcher."""
+    
+    def test_finds_overlapping_patterns(self):
+        """Test that overlapping and nested patterns are all reported."""
+        matcher = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual(sorted(matcher.find_all('ushers')), ['he', 'hers', 'she'])
+        self.assertFalse(matcher.search('xyz'))
+    
+    def test_matches_substring_semantics(self):
+        """Test agreement with plain substring checks over the default indicators."""
+        detector = BotDetector()
+        for local_part in ['john', 'noreply', 'testbot99', 'mailroom', 'xq7k9m2n4p8r', 'anonymous1']:
+            with self.subTest(local_part):
+                expected = {i for i in detector.bot_localparts if i in local_part}
+                self.assertEqual(set(detector._match_bot_indicators(local_part)), expected)
+    
+    def test_indicators_loaded_from_file(self):
+        """Test that extra indicators can be loaded from a pattern file."""
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# extra indicators\nscraper\n\nCrawler\n')
+        self.addCleanup(os.unlink, f.name)
+        
+        config = BotDetectionConfig()
+        config.BOT_LOCALPARTS_FILE = f.name
+        detector = BotDetector(config)
+        
+        self.assertTrue(detector._is_obvious_bot_localpart('webcrawler7'))
+        self.assertEqual(detector._match_bot_indicators('scraper'), ['scraper'])
+        self.assertFalse(detector._is_obvious_bot_localpart('jane.doe'))
+
+
+class TestRoleAccountLookup(unittest.TestCase):
+    """Test set-based role account detection."""
+    
+    def test_lookup_set_wildcards(self):
+        """Test exact entries and the combined wildcard fallback."""
+        roles = LookupSet(['Admin', 'alerts-*', 'ops?', ''])
+        self.assertIn('admin', roles)
+        self.assertIn('alerts-eu', roles)
+        self.assertIn('ops1', roles)
+        self.assertNotIn('ops12', roles)
+        self.assertNotIn('administrator', roles)
+        self.assertEqual(len(roles), 3)
+    
+    def test_role_localpart_is_exact(self):
+        """Test that role detection matches the whole local-part only."""
+        detector = BotDetector()
+        self.assertTrue(detector._is_role_account('Sales@Company.com'))
+        self.assertTrue(detector._is_role_account('no-reply@company.com'))
+        self.assertFalse(detector._is_role_account('salesforce@company.com'))
+        self.assertFalse(detector._is_role_account('john.admin@company.com'))
+        self.assertFalse(detector._is_role_account('admin'))
+    
+    def test_external_role_list(self):
+        """Test replacing the role list with an externally supplied one."""
+        detector = BotDetector()
+        detector.set_role_accounts(['billing', 'team-*'])
+        self.assertTrue(detector._is_role_account('billing@company.com'))
+        self.assertTrue(detector._is_role_account('team-berlin@company.com'))
+        self.assertFalse(detector._is_role_account('admin@company.com'))
+
+
+class TestDisposableDomainIndex(unittest.TestCase):
+    """Test the compact disposable domain index."""
+    
+    def test_suffix_matching(self):
+        """Test that subdomains match at label boundaries only."""
+        domains = DomainSuffixSet(['Mailinator.com', 'yopmail.fr.', '', 'mailinator.com'])
+        self.assertEqual(len(domains), 2)
+        self.assertIn('mailinator.com', domains)
+        self.assertIn('x.MAILINATOR.com', domains)
+        self.assertIn('a.b.yopmail.fr', domains)
+        self.assertEqual(domains.match('inbox.mailinator.com'), 'mailinator.com')
+        self.assertNotIn('notmailinator.com', domains)
+        self.assertNotIn('mailinator.com.evil.net', domains)
+        self.assertNotIn('com', domains)
+        self.assertNotIn('', domains)
+    
+    def test_detector_loads_domain_file(self):
+        """Test extending the built-in list from a file of disposable domains."""
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# public disposable list\nburner.example\n\nTrash-Box.io  # comment\n')
+        self.addCleanup(os.unlink, f.name)
+        config = BotDetectionConfig()
+        config.DISPOSABLE_DOMAINS_FILE = f.name
+        detector = BotDetector(config)
+        
+        self.assertTrue(detector._is_disposable_domain('burner.example'))
+        self.assertTrue(detector._is_disposable_domain('eu.trash-box.io'))
+        self.assertTrue(detector._is_disposable_domain('x.mailinator.com'))
+        self.assertFalse(detector._is_disposable_domain('gmail.com'))
+        self.assertFalse(BotDetector()._is_disposable_domain('burner.example'))
+        
+        scores, _ = detector.score_columns(['user@x.burner.example', 'user@gmail.com'])
+        self.assertEqual(scores.tolist(), [config.DISPOSABLE_DOMAIN_WEIGHT, 0.0])
+
+
+class TestLocalPartFeatures(unittest.TestCase):
+    """Test the single-pass local-part feature extractor."""
+    
+    def test_feature_counts(self):
+        """Test character-class counts and the longest consonant run."""
+        features = extract_local_part_features('Xq7k.9Ae-strngth')
+        self.assertEqual(features.length, 16)
+        self.assertEqual(features.digits, 2)
+        self.assertEqual(features.specials, 2)
+        self.assertEqual(features.vowels, 2)
+        self.assertEqual(features.max_consonant_run, 7)
+    
+    def test_features_are_memoized(self):
+        """Test that repeated local-parts reuse the same feature record."""
+        first = extract_local_part_features('jane.doe')
+        self.assertIs(extract_local_part_features('jane.doe'), first)
+        with self.assertRaises(AttributeError):
+            first.extra = 1
+    
+    def test_scoring_scans_once(self):
+        """Test that scoring a row extracts features only once."""
+        detector = BotDetector()
+        with patch('app.bot_rules.extract_local_part_features',
+                   wraps=extract_local_part_features.__wrapped__) as extract:
+            detector._calculate_bot_score('xq7k9m2n4p8r@company.com', None, None)
+        self.assertEqual(extract.call_count, 1)
+
+
+class TestColumnScoring(unittest.TestCase):
+    """Test column-wide scoring against the per-row rules."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.detector = BotDetector()
+    
+    def test_matches_row_scoring(self):
+        """Test that score_columns agrees with _calculate_bot_score row by row."""
+        rows = [
+            ('john.doe@gmail.com', 'John', 'Doe'),
+            ('bot@mailinator.com', None, None),
+            ('Admin@Company.com', 'Admin', 'User'),
+            ('xq7k9m2n4p8r@company.com', None, None),
+            ('abc123def456@company.com', '', ''),
+            ('user!#$%&*@company.com', 'J', None),
+            ('Mary.Jane@X.CO', 'Mary-Jane', "O'Neil"),
+            ('qwertyuiopasdfghjkl@company.com', 'A' * 25, 'Doe'),
+            ('josé.garcía@empresa.es', 'José', 'García'),
+            ('no-reply@temp-mail.org', 'News', 'Letter'),
+        ]
+        emails, first_names, last_names = zip(*rows)
+        scores, verdicts = self.detector.score_columns(emails, first_names, last_names)
+        
+        for i, (email, first_name, last_name) in enumerate(rows):
+            with self.subTest(email):
+                expected = self.detector._calculate_bot_score(email, first_name, last_name)
+                self.assertAlmostEqual(scores[i], expected)
+                self.assertEqual(verdicts[i], expected >= self.detector.config.BOT_THRESHOLD)
+    
+    def test_padded_and_mixed_case_local_parts(self):
+        """Test that whitespace and letter case around role local-parts score as in the per-row rules."""
+        self.detector.config.ENABLE_MX_CHECK = False
+        self.detector.set_role_accounts(['admin', 'support', 'alerts-*'])
+        emails = [' admin@example.com', 'ADMIN@Example.com', 'Admin @example.com', 'admin\t@example.com',
+                  '\x0bSupport@EXAMPLE.org', 'alerts-EU @example.com', '  @example.com', 'sUpPoRt@example.com',
+                  ' ', '']
+        scores, _ = self.detector.score_columns(emails)
+        for email, score in zip(emails, scores):
+            with self.subTest(email=email):
+                self.assertAlmostEqual(score, self.detector._calculate_bot_score(email, None, None))
+                analysis = self.detector.analyze(email, full=True)
+                if analysis.normalized is not None:
+                    self.assertAlmostEqual(self.detector.score_columns([analysis.normalized])[0][0],
+                                           analysis.score)
+    
+    def test_domain_rules_run_once_per_domain(self):
+        """Test that domain-level rules are evaluated per unique domain, not per row."""
+        emails = [f'user{i}@{domain}' for i in range(300) for domain in ('gmail.com', 'mailinator.com', 'Company.COM')]
+        
+        with patch.object(self.detector, '_is_disposable_domain',
+                          wraps=self.detector._is_disposable_domain) as is_disposable:
+            scores, _ = self.detector.score_columns(emails)
+        
+        self.assertEqual(is_disposable.call_count, 3)
+        self.assertEqual(scores[1], self.detector.config.DISPOSABLE_DOMAIN_WEIGHT)
+        
+        codes, domains = self.detector.factorize_domains(['a.com', 'b.com', 'a.com'])
+        self.assertEqual(codes.tolist(), [0, 1, 0])
+        self.assertEqual(domains, ['a.com', 'b.com'])
+    
+    def test_wildcard_roles_and_missing_columns(self):
+        """Test wildcard role entries and scoring without name columns."""
+        self.detector.set_role_accounts(['alerts-*'])
+        scores, _ = self.detector.score_columns(['alerts-eu@company.com', 'alerts@company.com'])
+        self.assertAlmostEqual(scores[0], self.detector.config.ROLE_ACCOUNT_WEIGHT)
+        self.assertAlmostEqual(scores[1], 0.0)
+    
+    def test_empty_column(self):
+        """Test scoring an empty column."""
+        scores, verdicts = self.detector.score_columns([])
+        self.assertEqual(len(scores), 0)
+        self.assertEqual(len(verdicts), 0)
+
+
+class TestRulePipeline(unittest.TestCase):
+    """Test the cost-ordered, short-circuiting rule pipeline."""
+    
+    EMAILS = [
+        ('bot@mailinator.com', None, None),
+        ('john.doe@gmail.com', 'John', 'Doe'),
+        ('admin@company.com', 'Admin', 'User'),
+        ('xq7k9m2n4p8r@company.com', None, None),
+        ('abc123def456@company.com', '', ''),
+        ('support@temp-mail.org', 'Help', 'Desk'),
+        ('j.smith@company.com', 'J', 'Smith'),
+    ]
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resolver = FakeResolver({
+            'mailinator.com': FakeAnswer(1, 300),
+            'gmail.com': FakeAnswer(1, 300),
+            'company.com': dns.resolver.NoAnswer(),
+            'temp-mail.org': FakeAnswer(1, 300),
+        })
+        self.detector = BotDetector(mx_cache=MXCache(
+            resolver=self.resolver, async_resolver=FakeAsyncResolver(self.resolver)
+        ))
+        patcher = patch('app.email_syntax.validate_email', side_effect=validate_syntax_only)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_rules_ordered_by_cost(self):
+        """Test that lookups run before scans."""
+        costs = [rule.cost for rule in self.detector.rules]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual([rule.name for rule in self.detector.rules][:2], ['disposable_domain', 'role_account'])
+    
+    def test_short_circuit_keeps_verdicts(self):
+        """Test that stopping early never changes a verdict."""
+        for email, first_name, last_name in self.EMAILS:
+            with self.subTest(email):
+                short_score, _ = self.detector._evaluate_rules(email, first_name, last_name, full=False)
+                full_score, _ = self.detector._evaluate_rules(email, first_name, last_name)
+                threshold = self.detector.config.BOT_THRESHOLD
+                self.assertEqual(short_score >= threshold, full_score >= threshold)
+        
+        _, rules = self.detector._evaluate_rules('bot@mailinator.com', None, None, full=False)
+        self.assertEqual(rules, {'disposable_domain': self.detector.config.DISPOSABLE_DOMAIN_WEIGHT})
+    
+    def test_mx_skipped_when_verdict_settled(self):
+        """Test that MX runs only for emails whose verdict it could still flip."""
+        bot = self.detector.analyze('bot@mailinator.com')
+        human = self.detector.analyze('john.doe@gmail.com', 'John', 'Doe')
+        
+        self.assertTrue(bot.is_bot)
+        self.assertFalse(bot.mx_checked)
+        self.assertEqual(bot.status, 'unchecked')
+        self.assertTrue(human.mx_checked)
+        self.assertEqual(human.status, 'valid')
+        self.assertEqual(self.resolver.queries, ['gmail.com'])
+        
+        self.detector.config.TREAT_INVALID_AS_BOTS = False
+        human = self.detector.analyze('j.smith@company.com', 'J', 'Smith')
+        self.assertFalse(human.mx_checked)
+        self.assertEqual(human.status, 'unchecked')
+        self.assertEqual(self.detector.analyze('bot@mailinator.com').status, 'valid')
+        self.assertEqual(self.resolver.queries, ['gmail.com', 'mailinator.com'])
+    
+    def test_full_analysis_checks_everything(self):
+        """Test that full analysis and details run every rule and the MX stage."""
+        analysis = self.detector.analyze('bot@mailinator.com', full=True)
+        self.assertTrue(analysis.mx_checked)
+        self.assertIn('obvious_bot_localpart', analysis.rules)
+        
+        details = self.detector.get_detection_details('support@temp-mail.org', 'Help', 'Desk')
+        self.assertIn('role_account', details['details']['rules'])
+        self.assertIn('obvious_bot_localpart', details['details']['checks'])
+    
+    def test_batch_and_rows_agree(self):
+        """Test that batch scoring and row analysis agree with MX checks enabled."""
+        emails, first_names, last_names = zip(*self.EMAILS)
+        status_codes, _, verdicts = self.detector.score_batch(emails, first_names, last_names)
+        analyses = self.detector.analyze_many(emails, first_names, last_names)
+        
+        self.assertEqual([EMAIL_STATUSES[code] for code in status_codes], [a.status for a in analyses])
+        self.assertEqual(verdicts.tolist(), [a.is_bot for a in analyses])
+        self.assertIn('no_mx', [a.status for a in analyses])
+        self.assertIn('unchecked', [a.status for a in analyses])
+    
+    def test_unchecked_emails_are_scored(self):
+        """Test that skipping MX reports unchecked, not valid, and keeps the rule verdict."""
+        status_codes, scores, verdicts = self.detector.score_batch(['bot@mailinator.com', 'john.doe@gmail.com'],
+                                                                   ['', 'John'], ['', 'Doe'])
+        self.assertEqual([EMAIL_STATUSES[code] for code in status_codes], ['unchecked', 'valid'])
+        self.assertGreater(scores[0], 0)
+        self.assertEqual(verdicts.tolist(), [True, False])
+        
+        analysis = self.detector.analyze('support@temp-mail.org', 'Help', 'Desk')
+        details = self.detector.get_detection_details('support@temp-mail.org', 'Help', 'Desk', analysis)
+        self.assertEqual(details['email_status'], 'unchecked')
+        self.assertIn('role_account', details['details']['rules'])
+        
+        self.detector.config.ENABLE_MX_CHECK = False
+        self.assertEqual(self.detector.analyze('bot@mailinator.com').status, 'valid')
+
+
+def validate_syntax_only(email, **kwargs):
+    """Validate without deliverability lookups so tests never touch the network."""
+    kwargs['check_deliverability'] = False
+    return validate_email(email, **kwargs)
+
+
+def reference_normalize(email):
+    """Normalize through email_validator alone, or None if it rejects the address."""
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
+
+
+def syntax_corpus(count=5000, seed=7):
+    """Generate addresses around the edges of the ASCII fast path's grammar."""
+    rng = random.Random(seed)
+    local_chars = string.ascii_letters + string.digits + "._-+!#$%&'*/=?^`{|}~\\\" @,;é"
+    domain_chars = string.ascii_letters + string.digits + '.-_ é'
+    tlds = ['com', 'CO', 'io', 'x1', '1x', 'local', 'test', 'onion', 'arpa', 'xn--p1ai',
+            'localhost', 'a' * 63, 'b' * 64, 'de-', '-de', 'org.']
+    locals_ = ['john.smith', 'POSTMASTER', 'Info', 'a' * 64, 'a' * 65, '.a', 'a.', 'a..b',
+               '"quoted"', 'jöhn', '', 'a b']
+    domains = ['gmail.com', 'Example.COM', 'ab--cd.com', 'a--b.com', 'xn--bcher-kva.ch',
+               'münchen.de', 'mail.' + 'c' * 63 + '.com', 'x.' + 'd' * 64 + '.com',
+               '[127.0.0.1]', 'example', '-a.com', 'a-.com', 'a.b.c.d.e.co', 'foo.test',
+               '.'.join(['abcdefghi'] * 26) + '.com']
+    corpus = [f"{local}@{domain}" for local in locals_ for domain in domains]
+    corpus += [f"user@host.{tld}" for tld in tlds]
+    corpus += ['', '@', 'a@', '@b.com', 'a@@b.com', 'a@b@c.com', ' a@b.com', 'a@b.com ', 'a@b.com\n']
+    for _ in range(count):
+        local = ''.join(rng.choice(local_chars) for _ in range(rng.randint(0, 12)))
+        labels = [''.join(rng.choice(domain_chars) for _ in range(rng.randint(0, 8)))
+                  for _ in range(rng.randint(1, 3))]
+        corpus.append(f"{local}@{'.'.join(labels)}.{rng.choice(tlds)}")
+    return corpus
+
+
+class TestEmailSyntax(unittest.TestCase):
+    """Differential tests of the ASCII fast path against email_validator."""
+    
+    def test_fast_path_matches_validator(self):
+        """Test that every address the fast path decides normalizes as email_validator does."""
+        decided = 0
+        for email in syntax_corpus():
+            normalized = ascii_normalize(email)
+            if normalized is not None:
+                decided += 1
+                with self.subTest(email=email):
+                    self.assertEqual(normalized, reference_normalize(email))
+        self.assertGreater(decided, 400)
+    
+    def test_normalize_email_matches_validator(self):
+        """Test that fast path plus fallback agree with email_validator on verdict and output."""
+        for email in syntax_corpus():
+            with self.subTest(email=email):
+                self.assertEqual(normalize_email(email), reference_normalize(email))
+    
+    def test_common_addresses_skip_validator(self):
+        """Test that plain ASCII addresses never reach the full validator."""
+        emails = ['Jane.Doe@Company.COM', 'info@example.org', "o'brien+tag@mail.co.uk", 'a1@b2.io']
+        with patch('app.email_syntax.validate_email') as validate:
+            normalized = [normalize_email(email) for email in emails]
+        
+        validate.assert_not_called()
+        self.assertEqual(normalized, [
+            'Jane.Doe@company.com', 'info@example.org', "o'brien+tag@mail.co.uk", 'a1@b2.io'
+        ])
+    
+    def test_edge_cases_fall_back(self):
+        """Test that internationalized, Punycode and special-use addresses defer to the validator."""
+        for email in ['josé@empresa.es', 'user@xn--bcher-kva.ch', 'user@mail.local', 'a@b--c.com']:
+            with self.subTest(email=email):
+                self.assertIsNone(ascii_normalize(email))
+        self.assertEqual(normalize_email('user@xn--bcher-kva.ch'), 'user@bücher.ch')
+        self.assertIsNone(normalize_email('user@mail.local'))
+
+
+class TestEmailAnalysis(unittest.TestCase):
+    """Test the single-pass email analysis."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        config = BotDetectionConfig()
+        config.ENABLE_MX_CHECK = False
+        self.detector = BotDetector(config)
+    
+    def test_analysis_fields(self):
+        """Test normalized address, status, score and fired rules."""
+        with patch('app.email_syntax.validate_email', side_effect=validate_syntax_only):
+            analysis = self.detector.analyze('Bot@Mailinator.COM', full=True)
+        
+        self.assertIsInstance(analysis, EmailAnalysis)
+        self.assertEqual(analysis.normalized, 'Bot@mailinator.com')
+        self.assertEqual(analysis.status, 'valid')
+        self.assertTrue(analysis.is_bot)
+        self.assertEqual(set(analysis.rules), {'disposable_domain', 'obvious_bot_localpart'})
+        self.assertAlmostEqual(analysis.score, sum(analysis.rules.values()))
+    
+    def test_validates_once(self):
+        """Test that analyzing an email validates it exactly once."""
+        with patch('app.bot_rules.normalize_email', wraps=normalize_email) as validate:
+            analysis = self.detector.analyze('jane.doe@company.com', 'Jane', 'Doe', full=True)
+            self.detector.get_detection_details('jane.doe@company.com', 'Jane', 'Doe', analysis)
+        
+        self.assertEqual(validate.call_count, 1)
+        self.assertFalse(analysis.is_bot)
+        self.assertEqual(analysis.rules, {'human_names': self.detector.config.HUMAN_NAMES_WEIGHT})
+    
+    def test_invalid_and_empty(self):
+        """Test statuses for invalid and empty input."""
+        with patch('app.email_syntax.validate_email', side_effect=validate_syntax_only):
+            invalid = self.detector.analyze('invalid-email')
+        self.assertEqual(invalid.status, 'invalid_syntax')
+        self.assertIsNone(invalid.normalized)
+        self.assertTrue(invalid.is_bot)
+        
+        empty = self.detector.analyze('')
+        self.assertEqual(empty.status, 'unknown')
+        self.assertFalse(empty.is_bot)
+    
+    def test_syntax_check_skips_deliverability(self):
+        """Test that syntax validation never asks email_validator to resolve DNS."""
+        with patch('app.email_syntax.validate_email', side_effect=validate_syntax_only) as validate:
+            self.detector.analyze('josé.garcía@empresa.es')
+        
+        self.assertIs(validate.call_args.kwargs['check_deliverability'], False)
+    
+    def test_syntax_check_disabled(self):
+        """Test that disabling the syntax check only splits the address."""
+        self.detector.config.ENABLE_SYNTAX_CHECK = False
+        
+        with patch('app.bot_rules.normalize_email') as validate:
+            analysis = self.detector.analyze(' Jane..Doe@Company.COM ')
+            invalid = self.detector.analyze('no-at-sign')
+        
+        validate.assert_not_called()
+        self.assertEqual(analysis.status, 'valid')
+        self.assertEqual(analysis.normalized, 'Jane..Doe@company.com')
+        self.assertEqual(invalid.status, 'invalid_syntax')
+    
+    def test_mx_results_match_mixed_case_domains(self):
+        """Test that every MX stage finds a mixed-case domain in a lowercase resolve_mx map."""
+        self.detector.config.ENABLE_MX_CHECK = True
+        mx_results = {'example.com': False}
+        # Keep the domain's case, as a normalizer that does not lowercase it would
+        with patch.object(self.detector, '_check_syntax', side_effect=str.strip), \
+                patch.object(self.detector, '_has_mx_record', side_effect=AssertionError('DNS lookup')), \
+                patch.object(self.detector, 'resolve_mx', return_value=mx_results):
+            analysis = self.detector.analyze('jane@Example.COM', 'Jane', 'Doe', mx_results=mx_results)
+            status, normalized = self.detector.check_email('jane@Example.COM', mx_results)
+            many = self.detector.analyze_many(['jane@Example.COM'], ['Jane'], ['Doe'])
+            batch = self.detector.prepare_batch(['jane@Example.COM'], ['Jane'], ['Doe'])
+            status_codes, _, verdicts = self.detector.complete_batch(batch, mx_results)
+        
+        self.assertEqual(normalized, 'jane@Example.COM')
+        self.assertEqual((analysis.status, status, many[0].status), ('no_mx', 'no_mx', 'no_mx'))
+        self.assertEqual(EMAIL_STATUSES[status_codes[0]], 'no_mx')
+        self.assertTrue(verdicts[0])
+
+
+class TestBatchScoring(unittest.TestCase):
+    """Test the batch entry point against per-email analysis."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        config = BotDetectionConfig()
+        config.ENABLE_MX_CHECK = False
+        self.detector = BotDetector(config)
+    
+    def test_matches_analyze(self):
+        """Test that statuses, scores and verdicts agree with analyze row by row."""
+        rows = [
+            ('john.doe@gmail.com', 'John', 'Doe'),
+            ('JOHN.DOE@gmail.com', 'John', 'Doe'),
+            ('bot@mailinator.com', None, None),
+            ('invalid-email', 'A', 'B'),
+            ('', None, None),
+            (None, 'X', 'Y'),
+            ('xq7k9m2n4p8r@company.com', '', None),
+            ('josé.garcía@empresa.es', 'José', 'García'),
+        ]
+        emails, first_names, last_names = zip(*rows)
+        with patch('app.email_syntax.validate_email', side_effect=validate_syntax_only):
+            status_codes, scores, verdicts = self.detector.score_batch(emails, first_names, last_names)
+            expected = [self.detector.analyze(*row, full=True) for row in rows]
+        
+        self.assertEqual(status_codes.dtype, 'int8')
+        for i, analysis in enumerate(expected):
+            with self.subTest(rows[i][0]):
+                self.assertEqual(EMAIL_STATUSES[status_codes[i]], analysis.status)
+                self.assertAlmostEqual(scores[i], analysis.score)
+                self.assertEqual(verdicts[i], analysis.is_bot)
+    
+    def test_duplicates_classified_once(self):
+        """Test that duplicate rows are validated once and results scattered back."""
+        emails = ['Jane@Company.com', 'jane@company.com', 'bot@mailinator.com'] * 100
+        with patch('app.bot_rules.normalize_email', wraps=normalize_email) as validate:
+            status_codes, _, verdicts = self.detector.score_batch(emails)
+        
+        self.assertEqual(validate.call_count, 2)
+        self.assertEqual(len(status_codes), 300)
+        self.assertEqual(verdicts.tolist(), [False, False, True] * 100)
+        
+        codes, first_rows = self.detector.group_rows(emails[:3], ['A', 'A', 'A'], ['B', 'C', 'B'])
+        self.assertEqual(codes.tolist(), [0, 1, 2])
+        self.assertEqual(first_rows.tolist(), [0, 1, 2])
+
+
+class FakeResolver:
+    """Resolver stub answering from a table of domain -> answer or exception."""
+    
+    def __init__(self, answers):
+        self.answers = answers
+        self.queries = []
+    
+    def resolve(self, domain, rdtype, lifetime=None):
+        self.queries.append(domain)
+        answer = self.answers[domain]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class FakeAsyncResolver:
+    """Async resolver stub recording the peak number of queries in flight."""
+    
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.in_flight = 0
+        self.peak = 0
+    
+    async def resolve(self, domain, rdtype, lifetime=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self.resolver.resolve(domain, rdtype, lifetime)
+        finally:
+            self.in_flight -= 1
+
+
+class FakeAnswer:
+    """Minimal stand-in for dns.resolver.Answer."""
+    
+    def __init__(self, count, ttl):
+        self.count = count
+        self.rrset = type('RRset', (), {'ttl': ttl})()
+    
+    def __len__(self):
+        return self.count
+
+
+def negative_response(domain, soa_ttl, soa_minimum):
+    """Build an empty response carrying the zone SOA in its authority section."""
+    response = dns.message.make_response(dns.message.make_query(domain, 'MX'))
+    response.authority.append(dns.rrset.from_text(
+        domain, soa_ttl, 'IN', 'SOA', f'ns.{domain}. admin.{domain}. 1 7200 900 1209600 {soa_minimum}'
+    ))
+    return response
+
+
+class TestScoringPipeline(unittest.TestCase):
+    """Test staged chunk scoring with MX lookups overlapping the rules."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resolver = FakeResolver({
+            'gmail.com': FakeAnswer(1, 300),
+            'company.com': dns.resolver.NoAnswer(),
+            'mailinator.com': FakeAnswer(1, 300),
+            'empresa.es': FakeAnswer(1, 300),
+        })
+        self.detector = BotDetector(mx_cache=MXCache(
+            resolver=self.resolver, async_resolver=FakeAsyncResolver(self.resolver)
+        ))
+        self.pipeline = ScoringPipeline(self.detector, chunk_size=3)
+        patcher = patch('app.email_syntax.validate_email', side_effect=validate_syntax_only)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_matches_score_batch(self):
+        """Test that chunked results reassemble to the single-batch results."""
+        emails = ['john.doe@gmail.com', 'JOHN.DOE@gmail.com', 'jane@company.com', 'bot@mailinator.com',
+                  None, 'invalid-email', 'josé.garcía@empresa.es', 'jane@company.com', '']
+        first_names = ['John', 'John', 'Jane', None, 'X', 'A', 'José', 'Jane', None]
+        expected = self.detector.score_batch(emails, first_names)
+        result = self.pipeline.score_batch(emails, first_names)
+        
+        for name, want, got in zip(('status codes', 'scores', 'verdicts'), expected, result):
+            with self.subTest(name):
+                self.assertEqual(got.tolist(), want.tolist())
+        self.assertEqual(EMAIL_STATUSES[result[0][2]], 'no_mx')
+    
+    def test_chunks_in_order(self):
+        """Test that run yields one result per chunk in input order."""
+        chunks = [([f'user{i}@gmail.com'] * (i + 1), None, None) for i in range(5)]
+        results = list(self.pipeline.run(iter(chunks)))
+        
+        self.assertEqual([len(status_codes) for status_codes, _, _ in results], [1, 2, 3, 4, 5])
+        self.assertTrue(all(EMAIL_STATUSES[code] == 'valid' for codes, _, _ in results for code in codes))
+        # Chunks resolving at the same time may both miss the cache for a domain
+        self.assertEqual(set(self.resolver.queries), {'gmail.com'})
+    
+    def test_stage_errors_propagate(self):
+        """Test that an error while producing chunks reaches the caller."""
+        def chunks():
+            yield ['a@gmail.com'], None, None
+            raise ValueError('bad chunk')
+        
+        results = self.pipeline.run(chunks())
+        self.assertEqual(len(next(results)[0]), 1)
+        with self.assertRaisesRegex(ValueError, 'bad chunk'):
+            next(results)
+    
+    def test_early_close_stops_stages(self):
+        """Test that abandoning the results stops the stage threads."""
+        chunks = (([f'user{i}@gmail.com'], None, None) for i in range(1000))
+        results = self.pipeline.run(chunks)
+        next(results)
+        results.close()
+        
+        self.assertFalse(any(t.name.startswith('scoring-pipeline') for t in threading.enumerate()))
+
+
+class TestMXCache(unittest.TestCase):
+    """Test the TTL-aware MX lookup cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.now = 0.0
+        nx_name = dns.name.from_text('missing.example')
+        nx_response = negative_response('missing.example', 3600, 60)
+        nx_response.set_rcode(dns.rcode.NXDOMAIN)
+        self.resolver = FakeResolver({
+            'gmail.com': FakeAnswer(5, 300),
+            'missing.example': dns.resolver.NXDOMAIN(qnames=[nx_name], responses={nx_name: nx_response}),
+            'nomx.example': dns.resolver.NoAnswer(response=negative_response('nomx.example', 30, 600)),
+            'slow.example': dns.resolver.LifetimeTimeout(timeout=1.0, errors=[]),
+        })
+        self.cache = MXCache(max_entries=2, resolver=self.resolver, clock=lambda: self.now)
+    
+    def test_repeated_domain_resolves_once(self):
+        """Test that only the first lookup of a domain reaches DNS."""
+        results = [self.cache.has_mx('gmail.com') for _ in range(100)]
+        
+        self.assertTrue(all(results))
+        self.assertEqual(self.resolver.queries, ['gmail.com'])
+        self.assertEqual(self.cache.stats()['hits'], 99)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+    
+    def test_record_ttl_honored(self):
+        """Test that entries expire after the record TTL."""
+        self.cache.has_mx('gmail.com')
+        self.now = 299.0
+        self.cache.has_mx('GMAIL.com')
+        self.now = 300.0
+        self.cache.has_mx('gmail.com')
+        
+        self.assertEqual(self.resolver.queries, ['gmail.com', 'gmail.com'])
+    
+    def test_negative_caching_uses_soa_minimum(self):
+        """Test that NXDOMAIN and NoAnswer are cached for min(SOA TTL, SOA minimum)."""
+        self.assertFalse(self.cache.has_mx('missing.example'))
+        self.assertFalse(self.cache.has_mx('nomx.example'))
+        
+        self.now = 29.0
+        self.assertFalse(self.cache.has_mx('missing.example'))
+        self.assertFalse(self.cache.has_mx('nomx.example'))
+        self.assertEqual(len(self.resolver.queries), 2)
+        
+        self.now = 30.0
+        self.cache.has_mx('nomx.example')
+        self.now = 60.0
+        self.cache.has_mx('missing.example')
+        self.assertEqual(len(self.resolver.queries), 4)
+    
+    def test_timeouts_not_cached(self):
+        """Test that transient failures are retried on the next lookup."""
+        self.assertFalse(self.cache.has_mx('slow.example'))
+        self.assertFalse(self.cache.has_mx('slow.example'))
+        
+        self.assertEqual(self.resolver.queries, ['slow.example', 'slow.example'])
+        self.assertEqual(len(self.cache), 0)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used domain is evicted first."""
+        self.cache.has_mx('gmail.com')
+        self.cache.has_mx('missing.example')
+        self.cache.has_mx('gmail.com')
+        self.cache.has_mx('nomx.example')
+        
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertIsNotNone(self.cache.get('gmail.com'))
+        self.assertIsNone(self.cache.get('missing.example'))
+    
+    def test_detector_uses_cache(self):
+        """Test that the detector routes MX checks through its cache."""
+        detector = BotDetector(mx_cache=self.cache)
+        
+        with patch('app.email_syntax.validate_email', side_effect=validate_syntax_only):
+            statuses = [detector.get_email_status(f'user{i}@gmail.com') for i in range(10)]
+        
+        self.assertEqual(statuses, ['valid'] * 10)
+        self.assertEqual(self.resolver.queries, ['gmail.com'])
+    
+    def test_resolve_many_bounded_concurrency(self):
+        """Test that a batch resolves each unique domain once under the in-flight limit."""
+        answers = {f'domain{i}.com': FakeAnswer(1, 300) for i in range(20)}
+        answers['slow.example'] = self.resolver.answers['slow.example']
+        async_resolver = FakeAsyncResolver(FakeResolver(answers))
+        cache = MXCache(resolver=self.resolver, async_resolver=async_resolver)
+        domains = [f'DOMAIN{i % 20}.com' for i in range(200)] + ['slow.example']
+        
+        results = cache.resolve_many(domains, timeout=1.0, concurrency=4)
+        
+        self.assertEqual(len(async_resolver.resolver.queries), 21)
+        self.assertEqual(async_resolver.peak, 4)
+        self.assertTrue(results['domain7.com'])
+        self.assertFalse(results['slow.example'])
+        self.assertEqual(self.resolver.queries, [])
+        
+        # Cached domains are answered without another query
+        cache.resolve_many(['domain1.com', 'domain2.com'])
+        self.assertEqual(len(async_resolver.resolver.queries), 21)
+    
+    def test_resolve_many_inside_running_loop(self):
+        """Test that batch resolution works when called from async code."""
+        cache = MXCache(async_resolver=FakeAsyncResolver(self.resolver))
+        
+        async def handler():
+            return cache.resolve_many(['gmail.com', 'nomx.example'])
+        
+        self.assertEqual(asyncio.run(handler()), {'gmail.com': True, 'nomx.example': False})
+
+
+class TestDomainStatusStore(unittest.TestCase):
+    """Test the on-disk domain status store shared by worker processes."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'cache', 'domains.sqlite3')
+        self.now = 1_000_000.0
+        self.store = DomainStatusStore(self.path, clock=lambda: self.now)
+    
+    def test_round_trip_and_expiry(self):
+        """Test that stored results are returned until they expire."""
+        self.store.put_many([('gmail.com', True, 300), ('dead.example', False, 60), ('skip.example', False, 0)])
+        
+        found = self.store.get_many(['gmail.com', 'dead.example', 'skip.example', 'other.com'])
+        self.assertEqual(found, {'gmail.com': (True, 300.0), 'dead.example': (False, 60.0)})
+        
+        self.now += 100
+        self.assertEqual(self.store.get_many(['gmail.com', 'dead.example']), {'gmail.com': (True, 200.0)})
+        self.assertEqual(self.store.prune(), 1)
+        self.assertEqual(len(self.store), 1)
+    
+    def test_shared_between_instances(self):
+        """Test that another connection to the same file sees the results (e.g. another worker)."""
+        self.store.put_many([('gmail.com', True, 300)])
+        other = DomainStatusStore(self.path, clock=lambda: self.now)
+        
+        self.assertEqual(other.get_many(['gmail.com']), {'gmail.com': (True, 300.0)})
+    
+    def test_warm_restart_skips_dns(self):
+        """Test that a fresh in-memory cache is served from the store without DNS."""
+        resolver = FakeResolver({'gmail.com': FakeAnswer(5, 300)})
+        MXCache(resolver=resolver, store=self.store).has_mx('gmail.com')
+        
+        restarted = MXCache(resolver=resolver, async_resolver=FakeAsyncResolver(resolver), store=self.store)
+        self.assertTrue(restarted.has_mx('gmail.com'))
+        restarted.clear()
+        self.assertEqual(restarted.resolve_many(['gmail.com']), {'gmail.com': True})
+        
+        self.assertEqual(resolver.queries, ['gmail.com'])
+        self.assertEqual(restarted.stats()['store_hits'], 1)
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests for the bot detection system."""
     
@@ -285,6 +1089,18 @@ if __name__ == '__main__':
     # Add test classes
     test_suite.addTest(unittest.makeSuite(TestBotDetectionConfig))
     test_suite.addTest(unittest.makeSuite(TestBotDetector))
+    test_suite.addTest(unittest.makeSuite(TestAhoCorasick))
+    test_suite.addTest(unittest.makeSuite(TestRoleAccountLookup))
+    test_suite.addTest(unittest.makeSuite(TestDisposableDomainIndex))
+    test_suite.addTest(unittest.makeSuite(TestLocalPartFeatures))
+    test_suite.addTest(unittest.makeSuite(TestColumnScoring))
+    test_suite.addTest(unittest.makeSuite(TestEmailSyntax))
+    test_suite.addTest(unittest.makeSuite(TestEmailAnalysis))
+    test_suite.addTest(unittest.makeSuite(TestBatchScoring))
+    test_suite.addTest(unittest.makeSuite(TestRulePipeline))
+    test_suite.addTest(unittest.makeSuite(TestScoringPipeline))
+    test_suite.addTest(unittest.makeSuite(TestMXCache))
+    test_suite.addTest(unittest.makeSuite(TestDomainStatusStore))
     test_suite.addTest(unittest.makeSuite(TestIntegration))
     
     # Run tests
@@ -0,0 +1,66 @@
+"""
+Unit tests for csv_format.py module.
+Tests encoding and delimiter detection for uploaded CSV files.
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.csv_format import CsvFormat, detect_file_format, detect_format
+
+
+class TestCsvFormat(unittest.TestCase):
+    """Test encoding and delimiter detection from a file prefix."""
+    
+    def test_encodings_in_order(self):
+        """Test that UTF-8 wins, cp1252 is reached before latin-1, and latin-1 takes the rest."""
+        self.assertEqual(detect_format('email,first\na@b.com,José\n'.encode('utf-8')).encoding, 'utf-8')
+        self.assertEqual(detect_format('email,first\na@b.com,“José”\n'.encode('cp1252')).encoding, 'cp1252')
+        # 0x81 is undefined in cp1252
+        self.assertEqual(detect_format(b'email,first\na@b.com,\x81\n').encoding, 'latin-1')
+        self.assertEqual(detect_format(b'\xef\xbb\xbfemail\na@b.com\n').encoding, 'utf-8-sig')
+    
+    def test_split_character_at_sample_end(self):
+        """Test that a prefix cut inside a UTF-8 character is still UTF-8 unless it is the whole file."""
+        sample = 'email,first\na@b.com,José'.encode('utf-8')[:-1]
+        self.assertEqual(detect_format(sample).encoding, 'utf-8')
+        self.assertEqual(detect_format(sample, final=True).encoding, 'cp1252')
+    
+    def test_delimiters(self):
+        """Test that the delimiter is sniffed from whole lines, defaulting to a comma."""
+        for delimiter in [',', ';', '\t', '|']:
+            with self.subTest(delimiter=delimiter):
+                rows = [['email', 'first', 'last']] + [[f'u{i}@b.com', 'Ann', 'Lee'] for i in range(20)]
+                text = '\n'.join(delimiter.join(row) for row in rows) + '\nu99@b.c'
+                self.assertEqual(detect_format(text.encode('utf-8')).delimiter, delimiter)
+        self.assertEqual(detect_format(b'email\na@b.com\nc@d.com\n').delimiter, ',')
+    
+    def test_fallbacks_after_prefix(self):
+        """Test that codecs the prefix did not rule out are kept to retry a file that fails later."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'upload.csv')
+            with open(path, 'wb') as handle:
+                handle.write(b'email;first\n' + b'a@b.com;Ann\n' * 100 + 'c@d.com;Renée\n'.encode('cp1252'))
+            csv_format = detect_file_format(path, sample_bytes=256)
+        self.assertEqual(csv_format, CsvFormat('utf-8', ';', ('cp1252', 'latin-1')))
+        self.assertEqual(csv_format.encodings, ('utf-8', 'cp1252', 'latin-1'))
+
+
+if __name__ == '__main__':
+    # Create test suite
+    test_suite = unittest.TestSuite()
+    
+    # Add test classes
+    test_suite.addTest(unittest.makeSuite(TestCsvFormat))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(test_suite)
+    
+    # Exit with appropriate code
+    sys.exit(not result.wasSuccessful())
@@ -0,0 +1,128 @@
+"""
+Unit tests for jobs.py module.
+Tests the persistent queue of background processing jobs.
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.jobs import JobStore, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+
+
+class TestJobStore(unittest.TestCase):
+    """Test the on-disk queue of background processing jobs."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'jobs', 'jobs.sqlite3')
+        self.now = 1_000_000.0
+        self.store = JobStore(self.path, stale_after=60, max_attempts=2, clock=lambda: self.now)
+    
+    def test_claim_in_order_and_once(self):
+        """Test that jobs are claimed oldest first and never handed out twice."""
+        first = self.store.create('u1', 'a.csv', '/jobs/a', {'mapping': {'email': 'email'}})
+        self.now += 1
+        second = self.store.create('u2', 'b.csv', '/jobs/b', {})
+        
+        claimed = self.store.claim()
+        self.assertEqual((claimed['id'], claimed['state'], claimed['attempts']), (first, JOB_RUNNING, 1))
+        self.assertEqual(claimed['params'], {'mapping': {'email': 'email'}})
+        # A second process sees the claim through the shared file
+        other = JobStore(self.path, clock=lambda: self.now)
+        self.assertEqual(other.claim()['id'], second)
+        self.assertIsNone(self.store.claim())
+    
+    def test_progress_and_outcomes(self):
+        """Test that progress, results and errors are visible to status polls."""
+        done = self.store.create('u1', 'a.csv', '/jobs/a', {})
+        broken = self.store.create('u1', 'b.csv', '/jobs/b', {})
+        self.store.claim()
+        self.store.claim()
+        self.assertTrue(self.store.progress(done, 1, 100_000))
+        self.assertEqual(self.store.get(done)['rows_processed'], 100_000)
+        
+        self.assertTrue(self.store.finish(done, 1, {'zip_url': 'https://example.com/a.zip'}))
+        self.assertTrue(self.store.fail(broken, 1, 'Missing required columns: email'))
+        
+        self.assertEqual(self.store.get(done)['state'], JOB_SUCCEEDED)
+        self.assertEqual(self.store.get(done)['result'], {'zip_url': 'https://example.com/a.zip'})
+        self.assertEqual(self.store.get(broken)['state'], JOB_FAILED)
+        self.assertEqual(self.store.get(broken)['error'], 'Missing required columns: email')
+        self.assertIsNone(self.store.get('missing'))
+    
+    def test_stale_jobs_are_reclaimed_then_failed(self):
+        """Test that a job whose worker stopped is retried up to max_attempts."""
+        job_id = self.store.create('u1', 'a.csv', '/jobs/a', {})
+        self.store.claim()
+        self.now += 30
+        self.store.progress(job_id, 1, 10)
+        self.now += 30
+        self.assertTrue(self.store.heartbeat(job_id, 1))
+        self.now += 59
+        self.assertIsNone(self.store.claim())
+        
+        self.now += 2
+        reclaimed = self.store.claim()
+        self.assertEqual((reclaimed['id'], reclaimed['attempts'], reclaimed['rows_processed']), (job_id, 2, 0))
+        
+        self.now += 61
+        self.assertIsNone(self.store.claim())
+        self.assertEqual(self.store.get(job_id)['state'], JOB_FAILED)
+    
+    def test_lost_claim_is_ignored(self):
+        """Test that a worker whose job was reclaimed can no longer update or settle it."""
+        job_id = self.store.create('u1', 'a.csv', '/jobs/a', {})
+        self.assertEqual(self.store.claim()['attempts'], 1)
+        self.now += 61
+        self.assertEqual(self.store.claim()['attempts'], 2)
+        
+        # The first worker wakes up with its old attempt number
+        self.assertFalse(self.store.heartbeat(job_id, 1))
+        self.assertFalse(self.store.progress(job_id, 1, 500))
+        self.assertFalse(self.store.fail(job_id, 1, 'Processing stopped'))
+        self.assertFalse(self.store.release(job_id, 1))
+        job = self.store.get(job_id)
+        self.assertEqual((job['state'], job['rows_processed'], job['error']), (JOB_RUNNING, 0, None))
+        
+        self.assertTrue(self.store.progress(job_id, 2, 500))
+        self.assertTrue(self.store.finish(job_id, 2, {'zip_url': 'https://example.com/a.zip'}))
+        # Settled jobs take no further updates from any attempt
+        self.assertFalse(self.store.fail(job_id, 2, 'late'))
+        self.assertFalse(self.store.heartbeat(job_id, 2))
+        self.assertEqual(self.store.get(job_id)['state'], JOB_SUCCEEDED)
+    
+    def test_release_and_prune(self):
+        """Test that released jobs are queued again and old finished jobs are removed."""
+        job_id = self.store.create('u1', 'a.csv', '/jobs/a', {})
+        self.store.claim()
+        self.assertTrue(self.store.release(job_id, 1))
+        self.assertEqual(self.store.get(job_id)['state'], JOB_QUEUED)
+        self.assertEqual(self.store.claim()['id'], job_id)
+        
+        self.store.finish(job_id, 2, {})
+        self.now += self.store.retention - 1
+        self.assertEqual(self.store.prune(), 0)
+        self.now += 1
+        self.assertEqual(self.store.prune(), 1)
+
+
+if __name__ == '__main__':
+    # Create test suite
+    test_suite = unittest.TestSuite()
+    
+    # Add test classes
+    test_suite.addTest(unittest.makeSuite(TestJobStore))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(test_suite)
+    
+    # Exit with appropriate code
+    sys.exit(not result.wasSuccessful())
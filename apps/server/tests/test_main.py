@@ -0,0 +1,305 @@
+"""
+Unit tests for main.py module.
+Tests upload handling and the background job workers without Supabase or Stripe.
+"""
+
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+import jwt
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# The services connect on import; nothing is sent since every call is patched below
+os.environ.setdefault('SUPABASE_URL', 'http://localhost:54321')
+os.environ.setdefault('SUPABASE_SERVICE_ROLE_KEY', 'test.service.key')
+os.environ.setdefault('JOB_DIR', tempfile.mkdtemp(prefix='bot-cleaner-test-jobs-'))
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.jobs import JobStore, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+from app.models import ColumnMapping, ProcessingOptions
+
+UPLOAD = 'email,first\nann@example.com,Ann\nbob@example.com,Bob\ncy@example.com,Cy\n'
+
+
+def users_table(credits_balance: int) -> MagicMock:
+    """Return a Supabase client whose users table holds one user with this balance."""
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.eq.return_value
+    query.execute.return_value.data = [{'credits_balance': credits_balance}]
+    return client
+
+
+class TestCreditCheck(unittest.TestCase):
+    """Test that uploads are checked against the user's balance before detection."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.upload_path = os.path.join(self.tmpdir.name, 'upload.csv')
+        with open(self.upload_path, 'w', encoding='utf-8') as upload:
+            upload.write(UPLOAD)
+
+    def process(self, credits_balance: int):
+        """Process the upload for a user with credits_balance credits, detection patched out."""
+        detected = HTTPException(status_code=418, detail="detection ran")
+        with patch.object(main, 'supabase_client', users_table(credits_balance)), \
+                patch.object(main, 'detect_upload', side_effect=detected) as detect_upload:
+            with self.assertRaises(HTTPException) as raised:
+                asyncio.run(main.process_upload(
+                    'u1', 'upload.csv', self.upload_path, self.tmpdir.name,
+                    ColumnMapping(email='email', firstName='first'), ProcessingOptions(enable_mx_check=False)
+                ))
+        return raised.exception, detect_upload
+
+    def test_count_upload_rows(self):
+        """Test that rows are counted like detection reads them, skipping malformed lines."""
+        with open(self.upload_path, 'a', encoding='utf-8') as upload:
+            upload.write('dee@example.com,Dee,extra,fields\n"eve\n@example.com",Eve\n')
+        self.assertEqual(main.count_upload_rows(self.upload_path, ColumnMapping(email='email')), 4)
+
+    def test_underfunded_upload_refused_before_detection(self):
+        """Test that a balance below the row count is refused without classifying any row."""
+        error, detect_upload = self.process(credits_balance=2)
+        self.assertEqual(error.status_code, 402)
+        self.assertIn('3 credits', error.detail)
+        detect_upload.assert_not_called()
+
+    def test_funded_upload_is_detected(self):
+        """Test that a balance covering every row goes on to detection."""
+        error, detect_upload = self.process(credits_balance=3)
+        self.assertEqual(error.status_code, 418)
+        detect_upload.assert_called_once()
+
+
+class TestJobWorkers(unittest.TestCase):
+    """Test how job workers run claimed jobs and settle, release or give them up."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.now = 1_000_000.0
+        self.path = os.path.join(self.tmpdir.name, 'jobs.sqlite3')
+        self.store = JobStore(self.path, stale_after=60, clock=lambda: self.now)
+        for patcher in (patch.object(main, 'job_store', self.store),
+                        patch.object(main, 'JOB_HEARTBEAT_SECONDS', 0.01),
+                        patch.object(main, 'JOB_POLL_SECONDS', 0.01)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def queue_job(self) -> str:
+        """Queue a job for the three-row upload in a directory of its own."""
+        work_dir = tempfile.mkdtemp(dir=self.tmpdir.name)
+        with open(os.path.join(work_dir, 'upload.csv'), 'w', encoding='utf-8') as upload:
+            upload.write(UPLOAD)
+        return self.store.create('u1', 'upload.csv', work_dir, {
+            'mapping': {'email': 'email', 'firstName': 'first'},
+            'options': {'enable_mx_check': False}
+        })
+
+    def steal(self, job_id: str):
+        """Let another worker reclaim the job as if this worker had stopped beating."""
+        self.now += 120
+        other = JobStore(self.path, stale_after=60, clock=lambda: self.now)
+        self.assertEqual(other.claim()['id'], job_id)
+
+    def run_blocked_job(self, interrupt):
+        """Run a claimed job whose processing waits until interrupt(job, task) ends it."""
+        job = self.store.claim()
+        cancelled = []
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def process_upload(*args, **kwargs):
+                started.set()
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    cancelled.append(job['id'])
+                    raise
+
+            with patch.object(main, 'process_upload', process_upload):
+                task = asyncio.create_task(main.run_job(job))
+                await started.wait()
+                interrupt(job, task)
+                await asyncio.wait_for(task, 5)
+
+        return job, cancelled, scenario
+
+    def test_succeeded_job_recorded_and_removed(self):
+        """Test that a finished job stores its result and that each attempt writes apart."""
+        job_id = self.queue_job()
+        job = self.store.claim()
+        result = {'success': True, 'run_id': 'run-1', 'zip_url': 'https://files/run-1.zip', 'summary': {}}
+        process_upload = AsyncMock(return_value=result)
+        with patch.object(main, 'process_upload', process_upload):
+            asyncio.run(main.run_job(job))
+
+        args = process_upload.call_args.args
+        self.assertEqual(args[2], os.path.join(job['work_dir'], 'upload.csv'))
+        self.assertEqual(args[3], os.path.join(job['work_dir'], 'attempt-1'))
+        stored = self.store.get(job_id)
+        self.assertEqual((stored['state'], stored['result']), (JOB_SUCCEEDED, result))
+        self.assertFalse(os.path.exists(job['work_dir']))
+
+    def test_failure_recorded(self):
+        """Test that a refused upload fails the job with the error a request would get."""
+        job_id = self.queue_job()
+        job = self.store.claim()
+        refused = HTTPException(status_code=400, detail="Missing required columns: email")
+        with patch.object(main, 'process_upload', AsyncMock(side_effect=refused)):
+            asyncio.run(main.run_job(job))
+
+        stored = self.store.get(job_id)
+        self.assertEqual((stored['state'], stored['error']), (JOB_FAILED, refused.detail))
+        self.assertFalse(os.path.exists(job['work_dir']))
+
+    def test_lost_claim_cancels_processing(self):
+        """Test that a heartbeat finding the job reclaimed stops processing and leaves its files."""
+        job_id = self.queue_job()
+        job, cancelled, scenario = self.run_blocked_job(lambda job, task: self.steal(job['id']))
+        asyncio.run(scenario())
+
+        self.assertEqual(cancelled, [job_id])
+        stored = self.store.get(job_id)
+        self.assertEqual((stored['state'], stored['attempts']), (JOB_RUNNING, 2))
+        self.assertTrue(os.path.exists(os.path.join(job['work_dir'], 'upload.csv')))
+
+    def test_released_on_shutdown(self):
+        """Test that a job cancelled by the server stopping goes back to the queue."""
+        job_id = self.queue_job()
+        job, cancelled, scenario = self.run_blocked_job(lambda job, task: task.cancel())
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(scenario())
+
+        self.assertEqual(cancelled, [job_id])
+        self.assertEqual(self.store.get(job_id)['state'], JOB_QUEUED)
+        self.assertTrue(os.path.exists(os.path.join(job['work_dir'], 'upload.csv')))
+
+    def test_lost_claim_is_never_charged(self):
+        """Test that a claim lost while the ZIP uploads stops the job before it is recorded or charged."""
+        job_id = self.queue_job()
+        job = self.store.claim()
+
+        async def upload_file_to_storage(**kwargs):
+            self.steal(job_id)
+            return 'https://files/' + kwargs['file_path']
+
+        save_run = AsyncMock(return_value='run-1')
+        deduct_credits = AsyncMock(return_value=True)
+        with patch.object(main, 'supabase_client', users_table(10)), \
+                patch.object(main.supabase_service, 'upload_file_to_storage', upload_file_to_storage), \
+                patch.object(main.supabase_service, 'save_run_to_database', save_run), \
+                patch.object(main.stripe_service, 'deduct_credits', deduct_credits):
+            asyncio.run(main.run_job(job))
+
+        save_run.assert_not_awaited()
+        deduct_credits.assert_not_awaited()
+        stored = self.store.get(job_id)
+        self.assertEqual((stored['state'], stored['attempts']), (JOB_RUNNING, 2))
+
+    def test_worker_runs_jobs_past_failures(self):
+        """Test that a worker claims queued jobs in order and survives one that raises."""
+        first, second = self.queue_job(), self.queue_job()
+        ran = []
+
+        async def run_job(job):
+            ran.append(job['id'])
+            if len(ran) == 1:
+                raise RuntimeError("worker bug")
+
+        async def scenario():
+            with patch.object(main, 'run_job', run_job), \
+                    patch.object(main, 'job_available', asyncio.Event()):
+                worker = asyncio.create_task(main.job_worker())
+                while len(ran) < 2:
+                    await asyncio.sleep(0.01)
+                worker.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await worker
+
+        asyncio.run(scenario())
+        self.assertEqual(ran, [first, second])
+
+
+class TestJobStatus(unittest.TestCase):
+    """Test the job status endpoint."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = JobStore(os.path.join(self.tmpdir.name, 'jobs.sqlite3'))
+        patcher = patch.object(main, 'job_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Without the context manager the startup hook, and with it the job workers, never runs
+        self.client = TestClient(main.app)
+
+    def get_job(self, job_id: str, user_id: str = 'u1'):
+        """Request a job's status as user_id."""
+        token = jwt.encode({'sub': user_id}, 'secret', algorithm='HS256')
+        return self.client.get(f'/jobs/{job_id}', headers={'Authorization': f'Bearer {token}'})
+
+    def test_running_job(self):
+        """Test that a running job reports its progress and timestamps only."""
+        job_id = self.store.create('u1', 'upload.csv', self.tmpdir.name, {})
+        job = self.store.claim()
+        self.store.progress(job_id, job['attempts'], 200_000)
+
+        response = self.get_job(job_id)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body), {'job_id', 'state', 'rows_processed', 'created_at', 'updated_at'})
+        self.assertEqual((body['job_id'], body['state'], body['rows_processed']), (job_id, JOB_RUNNING, 200_000))
+        self.assertTrue(body['created_at'].endswith('Z'))
+
+    def test_settled_jobs(self):
+        """Test that succeeded jobs add the inline response and failed jobs their error."""
+        result = {'success': True, 'run_id': 'run-1', 'zip_url': 'https://files/run-1.zip',
+                  'summary': {'total_rows': 3}}
+        succeeded = self.store.create('u1', 'a.csv', self.tmpdir.name, {})
+        self.store.finish(succeeded, self.store.claim()['attempts'], result)
+        failed = self.store.create('u1', 'b.csv', self.tmpdir.name, {})
+        self.store.fail(failed, self.store.claim()['attempts'], "CSV file is empty")
+
+        body = self.get_job(succeeded).json()
+        self.assertEqual(body['state'], JOB_SUCCEEDED)
+        self.assertEqual({key: body[key] for key in result}, result)
+        body = self.get_job(failed).json()
+        self.assertEqual((body['state'], body['error']), (JOB_FAILED, "CSV file is empty"))
+        self.assertNotIn('zip_url', body)
+
+    def test_other_users_job_not_found(self):
+        """Test that a job is hidden from everyone but its owner."""
+        job_id = self.store.create('u1', 'upload.csv', self.tmpdir.name, {})
+        self.assertEqual(self.get_job(job_id, user_id='u2').status_code, 404)
+        self.assertEqual(self.get_job('missing').status_code, 404)
+
+
+if __name__ == '__main__':
+    # Create test suite
+    test_suite = unittest.TestSuite()
+
+    # Add test classes
+    test_suite.addTest(unittest.makeSuite(TestCreditCheck))
+    test_suite.addTest(unittest.makeSuite(TestJobWorkers))
+    test_suite.addTest(unittest.makeSuite(TestJobStatus))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(test_suite)
+
+    # Exit with appropriate code
+    sys.exit(not result.wasSuccessful())
@@ -0,0 +1,140 @@
+"""
+Unit tests for parallel.py module.
+Tests chunked scoring in worker processes and the shared-memory column buffers.
+"""
+
+import signal
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from unittest.mock import patch
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.bot_rules import BotDetector, BotDetectionConfig
+from app.parallel import ParallelScorer, SharedColumns, config_snapshot
+
+
+class TestParallelScoring(unittest.TestCase):
+    """Test chunked scoring across worker processes."""
+    
+    @classmethod
+    def setUpClass(cls):
+        config = BotDetectionConfig()
+        config.ENABLE_MX_CHECK = False
+        cls.detector = BotDetector(config)
+        cls.scorer = ParallelScorer(workers=2, chunk_size=40, min_rows=0)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.scorer.shutdown()
+    
+    def test_shared_columns_round_trip(self):
+        """Test that packed columns decode back to the original values."""
+        emails = ['a@b.com', '', None, 'josé@empresa.es', 12, 'x' * 300]
+        columns = SharedColumns.create([emails, None, ['Ann'] * 6])
+        try:
+            self.assertEqual(columns.read(0, 0, 6), ['a@b.com', '', None, 'josé@empresa.es', None, 'x' * 300])
+            self.assertEqual(columns.read(0, 3, 5), ['josé@empresa.es', None])
+            self.assertIsNone(columns.read(1, 0, 6))
+            self.assertEqual(columns.read(2, 4, 6), ['Ann', 'Ann'])
+        finally:
+            columns.unlink()
+    
+    def test_matches_serial_scoring(self):
+        """Test that chunks scored in workers reassemble to the in-process results in order."""
+        emails = [f'user{i}@gmail.com' for i in range(100)] + ['bot@mailinator.com', None, 'invalid-email',
+                                                               'josé.garcía@empresa.es', 'xq7k9m2n4p8r@corp.io'] * 20
+        first_names = [None if i % 7 else 'Jane' for i in range(len(emails))]
+        expected = self.detector.score_batch(emails, first_names, None, deduplicate=False)
+        result = self.scorer.score_batch(self.detector, emails, first_names, None, deduplicate=False)
+        
+        for name, want, got in zip(('status codes', 'scores', 'verdicts'), expected, result):
+            with self.subTest(name):
+                self.assertEqual(got.dtype, want.dtype)
+                self.assertEqual(got.tolist(), want.tolist())
+    
+    def test_class_level_settings_reach_workers(self):
+        """Test that settings changed on the config class or a subclass are scored with in workers."""
+        class Lenient(BotDetectionConfig):
+            DISPOSABLE_DOMAIN_WEIGHT = 0.0
+        
+        emails = ['bot@mailinator.com', 'jane@mailinator.com', 'xq7k9m2n4p8r@corp.io'] * 30
+        with patch.object(BotDetectionConfig, 'ENABLE_MX_CHECK', False), \
+                patch.object(BotDetectionConfig, 'BOT_THRESHOLD', 0.5):
+            detector = BotDetector(Lenient())
+            snapshot = dict(config_snapshot(detector.config))
+            self.assertEqual((snapshot['DISPOSABLE_DOMAIN_WEIGHT'], snapshot['BOT_THRESHOLD']), (0.0, 0.5))
+            self.assertFalse(snapshot['ENABLE_MX_CHECK'])
+            
+            expected = detector.score_batch(emails, deduplicate=False)
+            result = self.scorer.score_batch(detector, emails, deduplicate=False)
+        
+        self.assertFalse(expected[2][1])
+        for name, want, got in zip(('status codes', 'scores', 'verdicts'), expected, result):
+            with self.subTest(name):
+                self.assertEqual(got.tolist(), want.tolist())
+    
+    def test_broken_pool_is_replaced(self):
+        """Test that a pool whose worker died is dropped and rebuilt for the next batch."""
+        scorer = ParallelScorer(workers=2, chunk_size=40, min_rows=0)
+        self.addCleanup(scorer.shutdown)
+        emails = [f'user{i}@gmail.com' for i in range(100)]
+        expected = self.detector.score_batch(emails, deduplicate=False)
+        scorer.score_batch(self.detector, emails, deduplicate=False)
+        
+        for process in list(scorer.executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+        with self.assertRaises(BrokenProcessPool):
+            scorer.score_batch(self.detector, emails, deduplicate=False)
+        self.assertIsNone(scorer._executor)
+        
+        result = scorer.score_batch(self.detector, emails, deduplicate=False)
+        self.assertEqual(result[1].tolist(), expected[1].tolist())
+    
+    def test_shared_blocks_released_when_allocation_fails(self):
+        """Test that the packed columns are unlinked if the result block cannot be allocated."""
+        created = []
+        real_shared_memory = shared_memory.SharedMemory
+        
+        def allocate(*args, **kwargs):
+            if created:
+                raise OSError('No space left on device')
+            block = real_shared_memory(*args, **kwargs)
+            created.append(block.name)
+            return block
+        
+        with patch('app.parallel.shared_memory.SharedMemory', side_effect=allocate):
+            with self.assertRaises(OSError):
+                self.scorer.score_batch(self.detector, ['a@b.com'] * 50, deduplicate=False)
+        
+        self.assertEqual(len(created), 1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=created[0])
+    
+    def test_small_batches_stay_in_process(self):
+        """Test that batches below min_rows never start the pool."""
+        scorer = ParallelScorer(workers=2, min_rows=1000)
+        status_codes, _, verdicts = scorer.score_batch(self.detector, ['bot@mailinator.com'] * 3)
+        
+        self.assertIsNone(scorer._executor)
+        self.assertEqual(verdicts.tolist(), [True] * 3)
+
+
+if __name__ == '__main__':
+    # Create test suite
+    test_suite = unittest.TestSuite()
+    
+    # Add test classes
+    test_suite.addTest(unittest.makeSuite(TestParallelScoring))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(test_suite)
+    
+    # Exit with appropriate code
+    sys.exit(not result.wasSuccessful())
@@ -5,19 +5,21 @@ import pandas as pd
 from typing import Dict, Optional
 from fastapi.responses import StreamingResponse
 
+from app.bot_detection import Rows, RowPartition
+
 class ZipGenerator:
     """Generate ZIP files containing processed CSV data and summary."""
     
     @staticmethod
-    def create_zip_response(clean_df: pd.DataFrame, bots_df: pd.DataFrame, 
+    def create_zip_response(clean_df: Rows, bots_df: Rows, 
                           annotated_df: pd.DataFrame, summary: Dict, 
                           filename: str) -> StreamingResponse:
         """
         Create a streaming ZIP response with processed CSV files and summary.
         
         Args:
-            clean_df: DataFrame with clean (non-bot) data
-            bots_df: DataFrame with bot data only
+            clean_df: DataFrame or RowPartition with clean (non-bot) data
+            bots_df: DataFrame or RowPartition with bot data only
             annotated_df: DataFrame with original data plus BOT column
             summary: Summary statistics dictionary
             filename: Original filename for the ZIP
@@ -65,12 +67,14 @@ class ZipGenerator:
         return response
     
     @staticmethod
-    def validate_dataframes(clean_df: pd.DataFrame, bots_df: pd.DataFrame, 
+    def validate_dataframes(clean_df: Rows, bots_df: Rows,
                            annotated_df: pd.DataFrame) -> bool:
         """Validate that the dataframes are properly formatted."""
         try:
-            # Check if all are DataFrames
-            if not all(isinstance(df, pd.DataFrame) for df in [clean_df, bots_df, annotated_df]):
+            # Check if all are DataFrames; clean and bot rows may also be partitions of one
+            if not all(isinstance(df, (pd.DataFrame, RowPartition)) for df in [clean_df, bots_df]):
+                return False
+            if not isinstance(annotated_df, pd.DataFrame):
                 return False
             
             # Check if annotated_df has BOT column
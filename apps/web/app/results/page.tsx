@@ -29,6 +29,10 @@ interface ProcessingState {
   zipBlob?: Blob;
 }
 
+// Background job polling interval and the longest the page waits for a job
+const JOB_POLL_MS = 2000;
+const JOB_MAX_WAIT_MS = 60 * 60 * 1000;
+
 export default function ResultsPage() {
   const router = useRouter();
   const searchParams = useSearchParams();
@@ -55,11 +59,60 @@ export default function ResultsPage() {
     // Get advanced options (optional)
     const options = searchParams.get('options');
 
-    // Start processing automatically
-    startProcessing(mapping, options);
+    // Start processing automatically; polling stops when the page is left
+    const controller = new AbortController();
+    startProcessing(mapping, options, controller.signal);
+    return () => controller.abort();
   }, [csvData, searchParams, router]);
 
-  const startProcessing = async (mappingParam: string, optionsParam?: string | null) => {
+  // Waits ms milliseconds, rejecting early if signal is aborted
+  const sleep = (ms: number, signal: AbortSignal) => new Promise<void>((resolve, reject) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener('abort', () => {
+      clearTimeout(timer);
+      reject(signal.reason);
+    }, { once: true });
+  });
+
+  // Large files are processed as a background job; poll it until it finishes or
+  // JOB_MAX_WAIT_MS passes
+  const waitForJob = async (serverUrl: string, jobId: string, accessToken: string, signal: AbortSignal) => {
+    const totalRows = csvData?.rows?.length || 0;
+    const deadline = Date.now() + JOB_MAX_WAIT_MS;
+    while (Date.now() < deadline) {
+      await sleep(JOB_POLL_MS, signal);
+
+      const response = await fetch(`${serverUrl}/jobs/${jobId}`, {
+        headers: {
+          'Authorization': `Bearer ${accessToken}`
+        },
+        signal
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || errorData.error || `HTTP ${response.status}`);
+      }
+
+      const job = await response.json();
+      if (job.state === 'succeeded') {
+        return job;
+      }
+      if (job.state === 'failed') {
+        throw new Error(job.error || 'Processing failed');
+      }
+
+      if (totalRows > 0) {
+        setProcessingState(prev => ({
+          ...prev,
+          progress: Math.min(75, 30 + Math.round(45 * job.rows_processed / totalRows))
+        }));
+      }
+    }
+    throw new Error('Processing is taking longer than expected. Please try again later.');
+  };
+
+  const startProcessing = async (mappingParam: string, optionsParam: string | null, signal: AbortSignal) => {
     try {
       setProcessingState({
         status: 'uploading',
@@ -135,13 +188,16 @@ export default function ResultsPage() {
         throw new Error(errorData.detail || errorData.error || `HTTP ${response.status}`);
       }
 
+      // Get the JSON response
+      let result = await response.json();
+      if (response.status === 202) {
+        result = await waitForJob(serverUrl, result.job_id, session.access_token, signal);
+      }
+
       setProcessingState(prev => ({
         ...prev,
         progress: 80
       }));
-
-      // Get the JSON response
-      const result = await response.json();
       
       if (!result.success) {
         throw new Error('Processing failed');
@@ -163,6 +219,10 @@ export default function ResultsPage() {
       await saveRunToHistory(result.summary, advancedOptions, zipBlob);
 
     } catch (error) {
+      if (signal.aborted) {
+        // The page was left or re-rendered with new inputs; nothing to report
+        return;
+      }
       console.error('Processing error:', error);
       setProcessingState({
         status: 'error',